@@ -0,0 +1,179 @@
+"""
+    A stand in for the LED arduino on a pseudo terminal, for testing without
+    the hardware (*nix only)
+
+    Bytes are delayed by the time they take on a 9600 baud link, and read one
+    per animation frame into a 64 byte receive buffer like main.ino, so
+    anything sent faster than the arduino can keep up with is lost.
+
+    Usage:
+        python fake_arduino.py            then  python tester.py <printed path>
+        python fake_arduino.py --bench    measures the robot's LEDManager
+"""
+
+import argparse
+import collections
+import os
+import random
+import sys
+import threading
+import time
+import tty
+
+ROBOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "robot"))
+
+# Bytes the arduino can hold before it reads them
+RX_BUFFER = 64
+# Time taken by one animation frame, the fader patterns delay 30ms
+FRAME_TIME = 0.03
+
+
+class FakeArduino:
+    def __init__(self, baud=9600, frame_time=FRAME_TIME, verbose=False):
+        self.byte_time = 10 / baud  # 8 data bits, a start and a stop bit
+        self.frame_time = frame_time
+        self.verbose = verbose
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.path = os.ttyname(self.slave)
+
+        # (arrival time, byte)
+        self.rx = collections.deque()
+        self.lock = threading.Lock()
+        self.line_free = 0.0
+        self.received = 0
+        self.lost = 0
+        self.mode = 0
+        # (time the pattern was applied, mode)
+        self.applied = []
+        self.running = True
+
+        self.threads = [
+            threading.Thread(target=self.listen, daemon=True),
+            threading.Thread(target=self.loop, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def listen(self):
+        while self.running:
+            try:
+                data = os.read(self.master, 256)
+            except OSError:
+                return
+            now = time.monotonic()
+            with self.lock:
+                for byte in data:
+                    # Bytes queue up on the wire behind each other
+                    self.line_free = max(now, self.line_free) + self.byte_time
+                    self.received += 1
+                    if len(self.rx) >= RX_BUFFER:
+                        self.lost += 1
+                    else:
+                        self.rx.append((self.line_free, byte))
+
+    def loop(self):
+        # One byte is read at the start of every frame
+        while self.running:
+            now = time.monotonic()
+            with self.lock:
+                if self.rx and self.rx[0][0] <= now:
+                    _, self.mode = self.rx.popleft()
+                    self.applied.append((now, self.mode))
+                    if self.verbose:
+                        print("%.3f mode %d" % (now, self.mode))
+            time.sleep(self.frame_time)
+
+    def close(self):
+        self.running = False
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class PtyPort:
+    """
+        Writes to a pseudo terminal like a wpilib SerialPort
+    """
+
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_WRONLY | os.O_NOCTTY)
+
+    def write(self, data):
+        return os.write(self.fd, data)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def bench(changes, rate):
+    """
+        Change pattern ``changes`` times at ``rate`` per second through the
+        LEDManager, then report what the arduino saw
+    """
+    sys.path.insert(0, ROBOT_PATH)
+    from common.led_manager import LEDManager, LedPattern
+
+    arduino = FakeArduino()
+    leds = LEDManager(open_port=lambda: PtyPort(arduino.path))
+    patterns = list(LedPattern)
+
+    put_times = []
+    start = time.monotonic()
+    for _ in range(changes):
+        put = time.monotonic()
+        leds.write_pattern(random.choice(patterns))
+        put_times.append(time.monotonic() - put)
+        time.sleep(1 / rate)
+    last = leds.last.value
+    last_put = time.monotonic()
+
+    # Wait for the last pattern to be shown
+    deadline = last_put + 2
+    while time.monotonic() < deadline:
+        if arduino.applied and arduino.applied[-1][1] == last and not leds.pending():
+            break
+        time.sleep(0.001)
+    latency = arduino.applied[-1][0] - last_put if arduino.applied else float("nan")
+    elapsed = time.monotonic() - start
+    leds.stop()
+    arduino.close()
+
+    print("%d pattern changes at %dhz over %.2fs" % (changes, rate, elapsed))
+    print(
+        "  sent %d, coalesced %d, dropped %d"
+        % (leds.sent, leds.coalesced, leds.dropped)
+    )
+    print(
+        "  arduino received %d, applied %d, lost %d"
+        % (arduino.received, len(arduino.applied), arduino.lost)
+    )
+    print("  throughput %.1f patterns/s" % (len(arduino.applied) / elapsed))
+    print("  last pattern shown after %.1fms" % (1000 * latency))
+    print("  worst enqueue %.3fms" % (1000 * max(put_times)))
+    print("  final pattern %s" % ("correct" if arduino.mode == last else "WRONG"))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--changes", type=int, default=500)
+    parser.add_argument("--rate", type=int, default=50, help="changes per second")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.changes, args.rate)
+        return
+
+    arduino = FakeArduino(verbose=True)
+    print("Listening on %s" % arduino.path)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,11 @@ import serial
 
 
 # *nix only, no clue how windows handles serial devices
-serial_modem_paths = glob.glob("/dev/cu.usbmodem*")
+# Pass a path to use another device, eg. the one printed by fake_arduino.py
+if len(sys.argv) > 1:
+    serial_modem_paths = sys.argv[1:2]
+else:
+    serial_modem_paths = glob.glob("/dev/cu.usbmodem*")
 if len(serial_modem_paths) < 1:
     print("Unable to find usb serial modem")
     sys.exit(1)
@@ -0,0 +1,35 @@
+from magicbot import AutonomousStateMachine
+
+from common.robot_state import RobotState
+from common.trajectory import TrajectoryLibrary
+from controllers.trajectory_follower import TrajectoryFollower
+
+
+class Routine(AutonomousStateMachine):
+    """
+        A sandstorm routine built from pregenerated trajectories
+
+        The drivers can take over at any point by moving the sticks, which
+        ends the routine
+    """
+
+    trajectory_follower: TrajectoryFollower
+    trajectories: TrajectoryLibrary
+    robot_state: RobotState
+
+    def on_iteration(self, tm):
+        # Routines run before the controls and components each loop
+        self.robot_state.refresh()
+        super().on_iteration(tm)
+
+    def follow(self, name: str):
+        self.trajectory_follower.follow(self.trajectories.get(name))
+
+    def arrived(self) -> bool:
+        """
+            :return: whether the trajectory has been followed to its end
+        """
+        if self.trajectory_follower.cancelled:
+            self.done()
+            return False
+        return self.trajectory_follower.is_done()
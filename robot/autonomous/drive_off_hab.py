@@ -0,0 +1,19 @@
+from magicbot import state
+
+from autonomous.base import Routine
+
+
+class DriveOffHab(Routine):
+    """
+        Drives off the hab in tank, ending up facing the side of the cargo
+        ship for the drivers
+    """
+
+    MODE_NAME = "Drive Off Hab"
+
+    @state(first=True)
+    def drive(self, initial_call):
+        if initial_call:
+            self.follow("drive_off_hab")
+        if self.arrived():
+            self.done()
@@ -0,0 +1,40 @@
+from magicbot import state, timed_state
+
+from autonomous.base import Routine
+from components import Intake, Lift
+
+# Lift height for the cargo ship and the rocket's lowest hatches
+HATCH_HEIGHT = 200
+
+
+class FrontCargoHatch(Routine):
+    """
+        Places the preloaded hatch on the right front bay of the cargo ship
+        in mecanum, then backs away
+    """
+
+    MODE_NAME = "Front Cargo Hatch"
+
+    lift: Lift
+    intake: Intake
+
+    @state(first=True)
+    def drive_to_ship(self, initial_call):
+        if initial_call:
+            self.intake.grab_hatch()
+            # Raised on the way, the profile takes less time than the drive
+            self.lift.set_setpoint(HATCH_HEIGHT)
+            self.follow("hab_to_front_cargo")
+        if self.arrived():
+            self.next_state("place")
+
+    @timed_state(duration=0.5, next_state="back_off")
+    def place(self):
+        self.intake.release_hatch()
+
+    @state
+    def back_off(self, initial_call):
+        if initial_call:
+            self.follow("front_cargo_back_off")
+        if self.arrived():
+            self.done()
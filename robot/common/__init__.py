@@ -1 +1,3 @@
 from .led_manager import LEDManager
+from .profiler import LoopProfiler
+from .telemetry import TelemetryPublisher
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from networktables import NetworkTables
+
+
+class BootTimer:
+    """
+        Times each step of robot startup, and runs slow independent steps
+        on background threads so they overlap with the rest of startup
+
+        Background steps don't hold up the end of boot, any still running
+        are reported when they finish
+    """
+
+    def __init__(self, workers=4, table="Boot"):
+        self.table = NetworkTables.getTable(table)
+        self.start = time.perf_counter()
+        self.checkpoint = self.start
+        self.total = 0.0
+        # (name, seconds, ran in the background)
+        self.steps: List[Tuple[str, float, bool]] = []
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="boot")
+        self.futures: List[Future] = []
+        # Set once the report has been made
+        self.logger: Optional[logging.Logger] = None
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.checkpoint = time.perf_counter()
+            self.record(name, self.checkpoint - start, False)
+
+    def lap(self, name: str):
+        """
+            Record everything since the last step as ``name``
+        """
+        now = time.perf_counter()
+        self.record(name, now - self.checkpoint, False)
+        self.checkpoint = now
+
+    def background(self, name: str, fn: Callable, *args) -> Future:
+        """
+            Run ``fn(*args)`` on a boot thread
+            :return: a future for its result
+        """
+
+        elapsed = []
+
+        def timed():
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                elapsed.append(time.perf_counter() - start)
+
+        future = self.pool.submit(timed)
+        self.futures.append(future)
+        future.add_done_callback(lambda future: self.done(name, elapsed[0], future))
+        return future
+
+    def done(self, name: str, seconds: float, future: Future):
+        with self.lock:
+            self.steps.append((name, seconds, True))
+            # Still None if this made it into the report
+            logger = self.logger
+        # Failures are logged rather than stopping the robot from booting
+        exception = future.exception()
+        if exception is not None:
+            (logger or logging.getLogger("boot")).error(
+                "Boot step %s failed", name, exc_info=exception
+            )
+        elif logger is not None:
+            logger.info(
+                "  %-24s %7.1fms (background, after boot)", name, seconds * 1000
+            )
+            self.table.putNumber(name, seconds * 1000)
+
+    def pending(self) -> List[Future]:
+        return [future for future in self.futures if not future.done()]
+
+    def record(self, name: str, seconds: float, background: bool):
+        with self.lock:
+            self.steps.append((name, seconds, background))
+
+    def summary(self) -> List[Tuple[str, float, bool]]:
+        """
+            :return: every step, slowest first
+        """
+        with self.lock:
+            return sorted(self.steps, key=lambda step: -step[1])
+
+    def finish(self, logger: logging.Logger):
+        """
+            Log and publish the report, without waiting for the background
+            steps that are still running
+        """
+        self.pool.shutdown(wait=False)
+        self.total = time.perf_counter() - self.start
+
+        with self.lock:
+            self.logger = logger
+            steps = sorted(self.steps, key=lambda step: -step[1])
+        logger.info("Booted in %.3fs", self.total)
+        for name, seconds, background in steps:
+            logger.info(
+                "  %-24s %7.1fms%s",
+                name,
+                seconds * 1000,
+                " (background)" if background else "",
+            )
+            self.table.putNumber(name, seconds * 1000)
+        self.table.putNumber("total", self.total * 1000)
+        pending = len(self.pending())
+        if pending:
+            logger.info("  %d background steps still running", pending)
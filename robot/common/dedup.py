@@ -0,0 +1,77 @@
+import wpilib
+
+
+class DedupSolenoid:
+    """
+        Wraps a solenoid, only writing to the PCM when the value changes
+
+        Everything other than ``set`` is passed through to the solenoid
+    """
+
+    def __init__(self, solenoid):
+        self.solenoid = solenoid
+        self.value = None
+        self.writes = 0
+        self.saved = 0
+
+    def set(self, value):
+        if value == self.value:
+            self.saved += 1
+            return
+        self.solenoid.set(value)
+        self.value = value
+        self.writes += 1
+
+    def __getattr__(self, name):
+        return getattr(self.solenoid, name)
+
+
+_UNKNOWN = object()
+
+
+class DedupMotor:
+    """
+        Wraps a motor controller, suppressing ``set`` calls that repeat
+        the last value
+
+        Repeated values are still resent every ``refresh_period`` seconds in
+        case a frame was dropped, and the motor safety is fed locally on
+        every suppressed write so it never times out
+
+        Everything other than ``set`` is passed through to the motor
+    """
+
+    def __init__(self, motor, refresh_period=0.1, initial=None):
+        """
+            :param initial: the value the motor starts at, setting it is
+                            skipped until something else has been written,
+                            so a lazily built motor isn't built just to be
+                            told to stay stopped
+        """
+        self.motor = motor
+        self.refresh_period = refresh_period
+        self.value = None if initial is None else (initial,)
+        self.last_write = 0.0
+        self.writes = 0
+        self.saved = 0
+        self._feed = _UNKNOWN
+
+    def set(self, *args):
+        if args == self.value and self.writes == 0:
+            self.saved += 1
+            return
+        now = wpilib.Timer.getFPGATimestamp()
+        if args == self.value and now - self.last_write < self.refresh_period:
+            if self._feed is _UNKNOWN:
+                self._feed = getattr(self.motor, "feed", None)
+            if self._feed is not None:
+                self._feed()
+            self.saved += 1
+            return
+        self.motor.set(*args)
+        self.value = args
+        self.last_write = now
+        self.writes += 1
+
+    def __getattr__(self, name):
+        return getattr(self.motor, name)
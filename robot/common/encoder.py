@@ -1,3 +1,5 @@
+from array import array
+
 import wpilib
 from wpilib.interfaces import PIDSource
 
@@ -6,12 +8,110 @@ import ctre
 
 # TODO: Merge into marsutils
 
+# Samples the velocity is fit over, 8 loops is 160ms
+VELOCITY_WINDOW = 8
+
+
+class VelocityEstimator:
+    """
+        Estimates velocity as the least squares slope through the last few
+        timestamped positions, which smooths out quantization and jitter
+        between samples without the lag of a filter on the raw velocity
+    """
+
+    __slots__ = ("times", "positions", "index", "count", "velocity")
+
+    def __init__(self, size=VELOCITY_WINDOW):
+        self.times = array("d", [0.0]) * size
+        self.positions = array("d", [0.0]) * size
+        self.index = 0
+        self.count = 0
+        self.velocity = 0.0
+
+    def add(self, timestamp: float, position: float) -> float:
+        """
+            Add a sample and update the estimate
+            :return: the velocity, in position units per second
+        """
+        size = len(self.times)
+        self.times[self.index] = timestamp
+        self.positions[self.index] = position
+        self.index = (self.index + 1) % size
+        if self.count < size:
+            self.count += 1
+
+        n = self.count
+        if n < 2:
+            return self.velocity
+        times = self.times
+        positions = self.positions
+        # Relative to the newest sample, to keep the sums small
+        t0 = timestamp
+        p0 = position
+        sum_t = sum_p = sum_tt = sum_tp = 0.0
+        for i in range(n):
+            t = times[i] - t0
+            p = positions[i] - p0
+            sum_t += t
+            sum_p += p
+            sum_tt += t * t
+            sum_tp += t * p
+        denominator = n * sum_tt - sum_t * sum_t
+        # Repeated timestamps, keep the last estimate
+        if denominator > 1e-12:
+            self.velocity = (n * sum_tp - sum_t * sum_p) / denominator
+        return self.velocity
+
+    def clear(self):
+        """
+            Forget the samples, eg. when the position jumps on zeroing.
+            The last estimate is kept until there are two new samples
+        """
+        self.index = 0
+        self.count = 0
+
 
 class BaseEncoder(wpilib.interfaces.PIDSource, wpilib.sendablebase.SendableBase):
     """
         BaseEncoder provides a consistent interface to encoders
+
+        Positions and velocities from the ``get_`` methods are in the
+        sensor's native units, and ``get_distance`` is in the units given to
+        ``set_units``. Call ``update`` once per loop to cache the position,
+        the distance and a smoothed rate in units per second.
     """
 
+    # Units per native unit
+    scale = 1.0
+    position = 0.0
+    distance = 0.0
+    rate = 0.0
+    estimator = None
+
+    def set_units(self, scale: float, window=VELOCITY_WINDOW) -> "BaseEncoder":
+        """
+            :param scale: units, eg. inches, per native unit
+            :param window: samples the rate is estimated over
+            :return: this encoder
+        """
+        self.scale = scale
+        self.estimator = VelocityEstimator(window)
+        return self
+
+    def update(self, timestamp: float):
+        """
+            Sample the position, call once per loop
+        """
+        self.position = self.get_position()
+        self.distance = self.position * self.scale
+        if self.estimator is None:
+            self.estimator = VelocityEstimator()
+        self.rate = self.estimator.add(timestamp, self.distance)
+
+    def _zeroed(self):
+        if self.estimator is not None:
+            self.estimator.clear()
+
     def get_position(self) -> float:
         """
         Gets position from the feedback sensor
@@ -26,6 +126,12 @@ class BaseEncoder(wpilib.interfaces.PIDSource, wpilib.sendablebase.SendableBase)
         """
         raise NotImplementedError
 
+    def get_distance(self) -> float:
+        """
+        Gets position from the feedback sensor in the encoder's units
+        """
+        return self.get_position() * self.scale
+
     def zero(self):
         """
         Resets the current position to zero
@@ -69,8 +175,12 @@ class CANTalonEncoder(BaseEncoder):
     def get_position(self) -> int:
         return (self.mod * self.motor.getQuadraturePosition()) - self.initialValue
 
+    def get_velocity(self) -> float:
+        return self.mod * self.motor.getQuadratureVelocity()
+
     def zero(self):
         self.initialValue = self.mod * self.motor.getQuadraturePosition()
+        self._zeroed()
 
 
 class CANTalonQuadEncoder(BaseEncoder):
@@ -87,12 +197,13 @@ class CANTalonQuadEncoder(BaseEncoder):
 
     def zero(self):
         self.motor.setQuadraturePosition(0)
+        self._zeroed()
 
     def get_position(self) -> float:
         return self.mod * self.motor.getQuadraturePosition()
 
     def get_velocity(self) -> float:
-        return self.motor.getQuadratureVelocity()
+        return self.mod * self.motor.getQuadratureVelocity()
 
 
 class CANTalonAnalogEncoder(BaseEncoder):
@@ -109,12 +220,13 @@ class CANTalonAnalogEncoder(BaseEncoder):
 
     def zero(self):
         self.motor.setAnalogPosition(0)
+        self._zeroed()
 
     def get_position(self) -> float:
         return self.mod * self.motor.getAnalogIn()
 
     def get_velocity(self) -> float:
-        return self.motor.getAnalogInVel()
+        return self.mod * self.motor.getAnalogInVel()
 
 
 class SparkMaxEncoder(BaseEncoder):
@@ -132,12 +244,13 @@ class SparkMaxEncoder(BaseEncoder):
 
     def zero(self):
         self.initialValue = self.mod * self.encoder.getPosition()
+        self._zeroed()
 
     def get_position(self) -> float:
         return (self.mod * self.encoder.getPosition()) - self.initialValue
 
     def get_velocity(self) -> float:
-        return self.encoder.getVelocity()
+        return self.mod * self.encoder.getVelocity()
 
 
 class ExternalEncoder(BaseEncoder):
@@ -163,3 +276,4 @@ class ExternalEncoder(BaseEncoder):
 
     def zero(self):
         self.encoder.reset()
+        self._zeroed()
@@ -0,0 +1,223 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import wpilib
+
+
+class RepeatFilter(logging.Filter):
+    """
+        Drops a message that repeats the last one from the same logger
+        within ``interval`` seconds
+
+        When the run of repeats ends, a separate record saying how many
+        were dropped is passed to ``summarize``
+    """
+
+    def __init__(self, summarize: Callable[[logging.LogRecord], None], interval=1.0):
+        super().__init__()
+        self.summarize = summarize
+        self.interval = interval
+        # logger name -> [message, args, time first seen, repeats dropped, level]
+        self.last: Dict[str, list] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self.lock:
+            last = self.last.get(record.name)
+            if (
+                last is not None
+                and last[0] == record.msg
+                and last[1] == record.args
+                and record.created - last[2] < self.interval
+            ):
+                last[3] += 1
+                return False
+
+            if last is not None and last[3]:
+                self.summarize(self.repeated(record.name, last))
+            self.last[record.name] = [
+                record.msg,
+                record.args,
+                record.created,
+                0,
+                record.levelno,
+            ]
+        return True
+
+    def flush(self):
+        """
+            Summarize every run of repeats that hasn't ended yet
+        """
+        with self.lock:
+            for name, last in self.last.items():
+                if last[3]:
+                    self.summarize(self.repeated(name, last))
+                    last[3] = 0
+
+    @staticmethod
+    def repeated(name: str, last: list) -> logging.LogRecord:
+        record = logging.LogRecord(
+            name,
+            last[4],
+            __file__,
+            0,
+            "Previous message repeated %d times",
+            (last[3],),
+            None,
+        )
+        record.repeats = last[3]
+        return record
+
+
+class EventLog(logging.Handler):
+    """
+        A logging handler that never blocks the caller on I/O
+
+        Records are stored in a preallocated ring and a background thread
+        formats them as JSON lines and writes them to disk in batches. The
+        console handlers already on the root logger are moved behind the
+        same thread, so printing to the slow roboRIO console happens there
+        too. When the ring is full new records are counted and dropped.
+
+        Every logger goes through this once it is installed, including the
+        ones magicbot gives each component, so per-subsystem levels are
+        set on those loggers by name
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        size=1024,
+        flush_period=0.5,
+        repeat_interval=1.0,
+    ):
+        """
+            :param directory: where to write the log, None for no file
+            :param flush_period: how often the writer thread wakes up
+            :param repeat_interval: how often an unchanged message is repeated
+        """
+        super().__init__()
+        self.slots: List[Optional[logging.LogRecord]] = [None] * size
+        # Total number of records ever queued and written
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        # Separate from the handler lock, which logging.shutdown holds
+        # while it waits for close() to join the writer thread
+        self.ring_lock = threading.Lock()
+        self.flush_period = flush_period
+        self.repeats = RepeatFilter(self.emit, repeat_interval)
+        self.addFilter(self.repeats)
+
+        self.file = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            name = time.strftime("%Y%m%d-%H%M%S") + ".jsonl"
+            self.file = open(os.path.join(directory, name), "a")
+
+        self.console: List[logging.Handler] = []
+        self.running = True
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="EventLog", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def install(
+        cls, directory: Optional[str], levels: Optional[Dict[str, int]] = None, **kwargs
+    ):
+        """
+            Route every logger through a new event log, replacing any that was
+            installed before
+
+            :param levels: logger name -> level, eg. {"drive": logging.DEBUG}
+        """
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            if isinstance(handler, cls):
+                root.removeHandler(handler)
+                handler.close()
+
+        log = cls(directory, **kwargs)
+        for handler in root.handlers[:]:
+            # Only plain console handlers, so test log capture keeps working
+            if type(handler) is logging.StreamHandler:
+                root.removeHandler(handler)
+                log.console.append(handler)
+        root.addHandler(log)
+
+        for name, level in (levels or {}).items():
+            logging.getLogger(name).setLevel(level)
+        return log
+
+    def emit(self, record: logging.LogRecord):
+        record.fpga_time = wpilib.Timer.getFPGATimestamp()
+        with self.ring_lock:
+            if self.head - self.tail >= len(self.slots):
+                self.dropped += 1
+                return
+            self.slots[self.head % len(self.slots)] = record
+            self.head += 1
+
+    def drain(self) -> List[logging.LogRecord]:
+        with self.ring_lock:
+            records = []
+            size = len(self.slots)
+            while self.tail < self.head:
+                i = self.tail % size
+                records.append(self.slots[i])
+                self.slots[i] = None
+                self.tail += 1
+            return records
+
+    def run(self):
+        while self.running:
+            self.wake.wait(self.flush_period)
+            self.wake.clear()
+            self.write(self.drain())
+
+    def write(self, records: List[logging.LogRecord]):
+        if not records:
+            return
+        if self.file is not None:
+            lines = []
+            for record in records:
+                event = {
+                    "time": record.fpga_time,
+                    "logger": record.name,
+                    "level": record.levelname,
+                    "message": record.getMessage(),
+                }
+                repeats = getattr(record, "repeats", 0)
+                if repeats:
+                    event["repeats"] = repeats
+                if record.exc_info:
+                    event["exception"] = logging.Formatter().formatException(
+                        record.exc_info
+                    )
+                lines.append(json.dumps(event))
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+        for handler in self.console:
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def close(self):
+        if self.running:
+            self.running = False
+            self.wake.set()
+            self.thread.join()
+            self.repeats.flush()
+            self.write(self.drain())
+            if self.file is not None:
+                self.file.close()
+            # Hand the console back
+            root = logging.getLogger()
+            for handler in self.console:
+                root.addHandler(handler)
+            self.console = []
+        super().close()
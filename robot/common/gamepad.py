@@ -0,0 +1,199 @@
+import enum
+from array import array
+from typing import Dict, List, NamedTuple, Sequence, Union
+
+import wpilib
+
+AXIS_COUNT = 6
+
+
+class Button(enum.IntEnum):
+    """
+        Xbox controller buttons, numbered as the driver station reports them
+    """
+
+    A = 1
+    B = 2
+    X = 3
+    Y = 4
+    LEFT_BUMPER = 5
+    RIGHT_BUMPER = 6
+    BACK = 7
+    START = 8
+    LEFT_STICK = 9
+    RIGHT_STICK = 10
+
+
+class Axis(enum.IntEnum):
+    LEFT_X = 0
+    LEFT_Y = 1
+    LEFT_TRIGGER = 2
+    RIGHT_TRIGGER = 3
+    RIGHT_X = 4
+    RIGHT_Y = 5
+
+
+class POV(enum.IntEnum):
+    """
+        D-pad directions, in degrees
+    """
+
+    UP = 0
+    RIGHT = 90
+    DOWN = 180
+    LEFT = 270
+
+
+Control = Union[Button, Axis, POV]
+
+# Rows of the controls table, in order
+CONTROL_LABELS = (
+    ((Axis.LEFT_X, Axis.LEFT_Y), "Left Stick"),
+    ((Axis.RIGHT_X, Axis.RIGHT_Y), "Right Stick"),
+    ((Button.LEFT_STICK,), "Left Stick Button"),
+    ((Button.RIGHT_STICK,), "Right Stick Button"),
+    ((POV.UP,), "Up"),
+    ((POV.DOWN,), "Down"),
+    ((POV.LEFT,), "Left"),
+    ((POV.RIGHT,), "Right"),
+    ((Button.A,), "A"),
+    ((Button.B,), "B"),
+    ((Button.X,), "X"),
+    ((Button.Y,), "Y"),
+    ((Axis.LEFT_TRIGGER,), "Left Trigger"),
+    ((Axis.RIGHT_TRIGGER,), "Right Trigger"),
+    ((Button.LEFT_BUMPER,), "Left Bumper"),
+    ((Button.RIGHT_BUMPER,), "Right Bumper"),
+    ((Button.BACK,), "Back Button"),
+    ((Button.START,), "Start Button"),
+)
+
+
+class Binding(NamedTuple):
+    port: int
+    control: Control
+    description: str
+
+
+class Bindings:
+    """
+        Names what each control on each gamepad does, so the controls table
+        in the README comes from the same place as the code
+    """
+
+    def __init__(self, names: Dict[int, str]):
+        """
+            :param names: column heading for each gamepad port
+        """
+        self.names = names
+        self.bindings: List[Binding] = []
+
+    def add(self, port: int, control: Control, description: str) -> Binding:
+        binding = Binding(port, control, description)
+        self.bindings.append(binding)
+        return binding
+
+    def table(self) -> str:
+        """
+            :return: a markdown table of every binding, a row per control
+                that's used
+        """
+        ports = sorted(self.names)
+        widths = [13] + [26] * len(ports)
+        rows = [[""] + [self.names[port] for port in ports]]
+        for controls, label in CONTROL_LABELS:
+            row = [label]
+            for port in ports:
+                descriptions = []
+                for binding in self.bindings:
+                    if (
+                        binding.port == port
+                        and binding.control in controls
+                        and type(binding.control) is type(controls[0])
+                        and binding.description not in descriptions
+                    ):
+                        descriptions.append(binding.description)
+                row.append(", ".join(descriptions))
+            # Unused controls are left out
+            if any(row[1:]):
+                rows.append(row)
+
+        for row in rows:
+            for i, cell in enumerate(row):
+                widths[i] = max(widths[i], len(cell))
+        lines = [_row(rows[0], widths), _row(["-" * w for w in widths], widths, "-")]
+        lines.extend(_row(row, widths) for row in rows[1:])
+        return "\n".join(lines) + "\n"
+
+
+def _row(cells: Sequence[str], widths: Sequence[int], fill=" ") -> str:
+    return (
+        "|"
+        + "|".join(
+            fill + cell.ljust(width, fill) + fill for cell, width in zip(cells, widths)
+        )
+        + "|"
+    )
+
+
+class Gamepad:
+    """
+        One gamepad's axes, buttons and POV, read from the driver station
+        once per loop
+
+        Pressed and released edges are between the last two reads, so
+        any number of readers see the same edges within a loop
+    """
+
+    __slots__ = ("port", "axes", "buttons", "pressed", "released", "pov")
+
+    def __init__(self, port: int):
+        self.port = port
+        self.axes = array("d", [0.0]) * AXIS_COUNT
+        # Bit n - 1 is button n
+        self.buttons = 0
+        self.pressed = 0
+        self.released = 0
+        self.pov = -1
+
+    def read(self, ds: wpilib.DriverStation):
+        port = self.port
+        for axis in range(AXIS_COUNT):
+            self.axes[axis] = ds.getStickAxis(port, axis)
+        buttons = ds.getStickButtons(port)
+        previous = self.buttons
+        self.pressed = buttons & ~previous
+        self.released = previous & ~buttons
+        self.buttons = buttons
+        self.pov = ds.getStickPOV(port, 0)
+
+
+class Gamepads:
+    """
+        A snapshot of every gamepad, call ``update`` once at the start of
+        each loop and read bindings from it
+    """
+
+    def __init__(self, ports=(0, 1)):
+        self.ds = wpilib.DriverStation.getInstance()
+        self.pads = {port: Gamepad(port) for port in ports}
+
+    def update(self):
+        for pad in self.pads.values():
+            pad.read(self.ds)
+
+    def held(self, binding: Binding) -> bool:
+        pad = self.pads[binding.port]
+        control = binding.control
+        if isinstance(control, POV):
+            return pad.pov == control
+        return bool(pad.buttons >> (control - 1) & 1)
+
+    def pressed(self, binding: Binding) -> bool:
+        return bool(self.pads[binding.port].pressed >> (binding.control - 1) & 1)
+
+    def released(self, binding: Binding) -> bool:
+        return bool(self.pads[binding.port].released >> (binding.control - 1) & 1)
+
+    def axis(self, binding: Binding) -> float:
+        return self.pads[binding.port].axes[binding.control]
@@ -0,0 +1,164 @@
+import json
+import math
+from array import array
+from typing import Dict, Optional, Sequence
+
+# Each response curve is sampled at this many steps over -1 to 1
+CURVE_STEPS = 512
+
+# The drive axes that are shaped, in order
+AXES = (
+    "tank_forward",
+    "tank_turn",
+    "mecanum_forward",
+    "mecanum_strafe",
+    "mecanum_turn",
+)
+TANK_FORWARD, TANK_TURN, MECANUM_FORWARD, MECANUM_STRAFE, MECANUM_TURN = range(
+    len(AXES)
+)
+
+
+def apply_deadband(value: float, deadband: float) -> float:
+    """
+        Zero inside the deadband, rescaled so the output still reaches 1
+    """
+    if abs(value) <= deadband:
+        return 0.0
+    return math.copysign((abs(value) - deadband) / (1 - deadband), value)
+
+
+class ResponseCurve:
+    """
+        A precomputed lookup table for an input response, linearly
+        interpolated between samples
+
+        The input is put through a deadband, multiplied by ``scale`` and
+        raised to ``power``, keeping its sign. Interpolating is only close
+        to the curve, an ``exact`` curve is calculated on every call
+        instead, for responses that must match the old ones.
+    """
+
+    __slots__ = ("table", "half", "last", "exact", "deadband", "scale", "power")
+
+    def __init__(self, deadband=0.0, scale=1.0, power=1.0, exact=False):
+        self.exact = exact
+        self.deadband = deadband
+        self.scale = scale
+        self.power = power
+        steps = CURVE_STEPS
+        self.table = array("d", [0.0]) * (steps + 1)
+        for k in range(steps + 1):
+            value = scale * apply_deadband(-1 + 2 * k / steps, deadband)
+            self.table[k] = math.copysign(abs(value) ** power, value)
+        self.half = steps / 2
+        self.last = steps
+
+    def __call__(self, value: float) -> float:
+        value = min(max(value, -1.0), 1.0)
+        if self.exact:
+            value = self.scale * apply_deadband(value, self.deadband)
+            return math.copysign(abs(value) ** self.power, value)
+        t = (value + 1.0) * self.half
+        i = int(t)
+        if i >= self.last:
+            return self.table[self.last]
+        a = self.table[i]
+        return a + (self.table[i + 1] - a) * (t - i)
+
+
+class Profile:
+    """
+        A response curve and slew limit for every axis
+    """
+
+    __slots__ = ("name", "curves", "slew_rates")
+
+    def __init__(self, name: str, axes: Dict[str, dict]):
+        """
+            :param axes: for each axis name, optional ``deadband``, ``scale``
+                         and ``power`` for its curve, ``exact`` to calculate
+                         it rather than use a table, and ``slew``, the most
+                         it can change per second
+        """
+        self.name = name
+        self.curves = []
+        self.slew_rates = array("d", [math.inf]) * len(AXES)
+        for index, axis in enumerate(AXES):
+            config = axes.get(axis, {})
+            self.curves.append(
+                ResponseCurve(
+                    config.get("deadband", 0.0),
+                    config.get("scale", 1.0),
+                    config.get("power", 1.0),
+                    config.get("exact", False),
+                )
+            )
+            if "slew" in config:
+                self.slew_rates[index] = config["slew"]
+
+
+class InputShaper:
+    """
+        Shapes the driver's stick inputs with the selected profile
+
+        Each axis goes through its profile's response curve, then is slew
+        limited from its value last loop. Shape each axis once per loop.
+    """
+
+    def __init__(self, profiles: Sequence[Profile], period=0.02, default=None):
+        self.profiles = {profile.name: profile for profile in profiles}
+        self.period = period
+        self.selected = self.profiles[default or profiles[0].name]
+        self.held: Optional[Profile] = None
+        self.outputs = array("d", [0.0]) * len(AXES)
+
+    @classmethod
+    def load(cls, path: str, period=0.02) -> "InputShaper":
+        """
+            Read profiles from a JSON file of
+            ``{"default": name, "profiles": {name: {axis: config}}}``
+        """
+        with open(path) as f:
+            config = json.load(f)
+        profiles = [Profile(name, axes) for name, axes in config["profiles"].items()]
+        return cls(profiles, period, config.get("default"))
+
+    def names(self):
+        return list(self.profiles)
+
+    def select(self, name: str):
+        """
+            Switch profiles, safe to call from another thread
+        """
+        self.selected = self.profiles[name]
+
+    def hold(self, name: Optional[str]):
+        """
+            Use another profile instead of the selected one, eg. while a
+            slow mode button is held, None to release it
+        """
+        self.held = None if name is None else self.profiles[name]
+
+    @property
+    def active(self) -> Profile:
+        return self.held or self.selected
+
+    def shape(self, axis: int, value: float) -> float:
+        profile = self.held or self.selected
+        target = profile.curves[axis](value)
+        last = self.outputs[axis]
+        step = profile.slew_rates[axis] * self.period
+        if target > last + step:
+            target = last + step
+        elif target < last - step:
+            target = last - step
+        self.outputs[axis] = target
+        return target
+
+    def reset(self):
+        """
+            Start every axis from a stop, slew limits ramp up from zero
+        """
+        for axis in range(len(AXES)):
+            self.outputs[axis] = 0.0
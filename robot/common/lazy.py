@@ -0,0 +1,32 @@
+import threading
+
+
+class Lazy:
+    """
+        Stands in for a device that isn't built until it is first used, or
+        until ``get`` is called, eg. from a boot thread
+
+        Any attribute access builds the device, so it can be passed anywhere
+        the device itself would be. Use while another thread is building it
+        waits for that to finish
+    """
+
+    def __init__(self, factory, *args):
+        self._factory = factory
+        self._args = args
+        self._device = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._device is not None
+
+    def get(self):
+        if self._device is None:
+            with self._lock:
+                if self._device is None:
+                    self._device = self._factory(*self._args)
+        return self._device
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
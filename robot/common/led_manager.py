@@ -1,6 +1,15 @@
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+
 import wpilib
 
-from enum import Enum
+# The link runs at 9600 baud, but the arduino only reads the port between
+# animation frames, so writes are spaced out to about one per frame
+MIN_INTERVAL = 0.05
+RECONNECT_PERIOD = 1.0
 
 
 class LedPattern(Enum):
@@ -15,27 +24,85 @@ class LedPattern(Enum):
 class LEDManager:
     """
         Communicate with the ardunio leds
+
+        Writes are queued and sent from a background thread, so the control
+        loop never waits on the serial port. A pattern that is still waiting
+        to be sent is replaced by the next one, writes are spaced out to what
+        the arduino can keep up with, and the port is reopened in the
+        background after the arduino is unplugged.
     """
 
     fast: bool = False
     last: LedPattern = LedPattern.Off
 
-    def __init__(self, baud=9600, port=wpilib.SerialPort.Port.kUSB):
-        # Don't explode if there is nothing plugged in
-        try:
-            self.serial = wpilib.SerialPort(baud, port)
-        except:
-            pass
+    def __init__(
+        self,
+        baud=9600,
+        port=wpilib.SerialPort.Port.kUSB,
+        start=True,
+        open_port=None,
+        queue_size=8,
+        min_interval=MIN_INTERVAL,
+        reconnect_period=RECONNECT_PERIOD,
+    ):
+        """
+            :param start: start the writer now, otherwise ``start`` must be
+                          called
+            :param open_port: opens the port, a wpilib SerialPort by default
+            :param queue_size: writes that can be waiting, the oldest are
+                               dropped once it is full
+        """
+        if open_port is None:
+
+            def open_port():
+                return wpilib.SerialPort(baud, port)
+
+        self.open_port = open_port
+        self.min_interval = min_interval
+        self.reconnect_period = reconnect_period
+        self.logger = logging.getLogger("leds")
+
+        # (byte, is a pattern), only a pattern at the back can be replaced
+        self.queue = deque(maxlen=queue_size)
+        self.condition = threading.Condition()
+        # Only stopping cuts the wait between reconnects short, new writes
+        # don't
+        self.stopping = threading.Event()
+        self.running = False
+        self.thread = None
+        self.serial = None
+        # The last pattern the arduino was sent, resent after a reconnect
+        self.shown = None
+
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed_opens = 0
+
+        if start:
+            self.start()
+
+    def start(self):
+        self.running = True
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, name="leds", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.close_port()
 
     def alliance_fader(self):
-        try:
-            alliance = wpilib.DriverStation.getInstance().getAlliance()
-            if alliance == wpilib.DriverStation.Alliance.Red:
-                self.write_pattern(LedPattern.RedFader)
-            else:
-                self.write_pattern(LedPattern.BlueFader)
-        except:
-            pass
+        alliance = wpilib.DriverStation.getInstance().getAlliance()
+        if alliance == wpilib.DriverStation.Alliance.Red:
+            self.write_pattern(LedPattern.RedFader)
+        else:
+            self.write_pattern(LedPattern.BlueFader)
 
     def set_fast(self, fast: bool):
         if self.fast != fast:
@@ -47,15 +114,95 @@ class LEDManager:
 
     def write_pattern(self, pattern: LedPattern):
         self.last = pattern
-        self.write_byte(pattern.value)
+        self.put(pattern.value, True)
 
     def write_pattern_forget(self, pattern: LedPattern):
-        self.write_byte(pattern.value)
+        self.put(pattern.value, True)
 
     def write_byte(self, byte: int):
         assert byte <= 255, "byte must be less than or equal to 255"
-        # Don't explode if there is nothing plugged in
+        self.put(byte, False)
+
+    def put(self, byte: int, pattern: bool):
+        with self.condition:
+            if pattern and self.queue and self.queue[-1][1]:
+                # Only the newest pattern matters
+                self.queue[-1] = (byte, True)
+                self.coalesced += 1
+            else:
+                if len(self.queue) == self.queue.maxlen:
+                    self.dropped += 1
+                self.queue.append((byte, pattern))
+            self.condition.notify()
+
+    def pending(self) -> int:
+        with self.condition:
+            return len(self.queue)
+
+    def run(self):
+        next_write = 0.0
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    return
+
+            if self.serial is None and not self.reconnect():
+                self.stopping.wait(self.reconnect_period)
+                continue
+
+            # Patterns queued while waiting replace the one at the back
+            delay = next_write - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.condition:
+                if not self.queue:
+                    continue
+                byte, pattern = self.queue.popleft()
+
+            try:
+                self.serial.write(bytes([byte]))
+            except Exception:
+                self.logger.warning("Lost the arduino, reconnecting")
+                self.close_port()
+                self.requeue(byte, pattern)
+                continue
+
+            self.sent += 1
+            if pattern:
+                self.shown = byte
+            next_write = time.monotonic() + self.min_interval
+
+    def reconnect(self) -> bool:
         try:
-            self.serial.write(bytes([byte]))
-        except:
-            pass
+            self.serial = self.open_port()
+        except Exception:
+            # Nothing plugged in, only worth mentioning the first time
+            if self.failed_opens == 0:
+                self.logger.warning("No arduino found, retrying in the background")
+            self.failed_opens += 1
+            return False
+
+        self.logger.info("Connected to the arduino")
+        # The arduino restarts when it is plugged back in
+        if self.shown is not None:
+            with self.condition:
+                if not self.queue or not self.queue[0][1]:
+                    self.requeue(self.shown, True)
+        return True
+
+    def requeue(self, byte: int, pattern: bool):
+        with self.condition:
+            # Never push out anything newer
+            if len(self.queue) < self.queue.maxlen:
+                self.queue.appendleft((byte, pattern))
+
+    def close_port(self):
+        serial, self.serial = self.serial, None
+        if serial is not None:
+            try:
+                serial.close()
+            except Exception:
+                pass
@@ -0,0 +1,196 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# File layout:
+#   MAGIC, then a little endian uint32 header length, then the JSON header
+#   {"version": 1, "fields": [[name, struct code], ...],
+#    "labels": {name: {value: label}}}
+#   followed by fixed size little endian records with no padding
+MAGIC = b"MREC"
+VERSION = 1
+HEADER_LENGTH = struct.Struct("<I")
+
+# Struct codes that can be recorded
+CODES = "?BhHifd"
+
+
+def prune_logs(directory: str, suffix: str, keep: int) -> int:
+    """
+        Delete all but the newest ``keep`` logs ending in ``suffix``, their
+        names start with the time they were made
+        :return: how many were deleted
+    """
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(suffix))
+    except FileNotFoundError:
+        return 0
+    old = names[:-keep] if keep > 0 else names
+    for name in old:
+        os.remove(os.path.join(directory, name))
+    return len(old)
+
+
+def read_header(f) -> Tuple[dict, int]:
+    """
+        Read the header from the start of a recording
+        :return: the header, and the offset of the first record
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("%s is not a match recording" % f.name)
+    (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+    header = json.loads(f.read(length).decode())
+    if header["version"] != VERSION:
+        raise ValueError("%s is recording version %s" % (f.name, header["version"]))
+    return header, len(MAGIC) + HEADER_LENGTH.size + length
+
+
+def record_struct(header: dict) -> struct.Struct:
+    return struct.Struct("<" + "".join(code for _, code in header["fields"]))
+
+
+class MatchRecorder:
+    """
+        Records a fixed set of values every loop into a compact binary log
+
+        Each loop's values are packed into a preallocated buffer, and full
+        buffers are handed to a background thread to be written, so the
+        control loop never waits on the disk. If the writer falls behind
+        and every buffer is full, records are counted and dropped.
+    """
+
+    def __init__(self, directory: str, buffer_records=250, buffers=4):
+        """
+            :param buffer_records: records per buffer, 5 seconds at 50hz
+            :param buffers: number of buffers, including the one being filled
+        """
+        self.directory = directory
+        self.buffer_records = buffer_records
+        self.buffer_count = buffers
+        self.fields: List[Tuple[str, str]] = []
+        self.getters: List[Callable] = []
+        self.labels: Dict[str, Dict[int, str]] = {}
+        self.dropped = 0
+        self.file = None
+
+    def add(
+        self,
+        name: str,
+        code: str,
+        getter: Callable,
+        labels: Optional[Dict[int, str]] = None,
+    ):
+        """
+            Record ``getter()`` in every record, add everything before ``start``
+            :param code: a struct format character, one of ``CODES``
+            :param labels: names for the values of an enum field
+        """
+        if code not in CODES:
+            raise ValueError("Unsupported struct code %r" % code)
+        if self.file is not None:
+            raise RuntimeError("Fields can't be added once recording has started")
+        self.fields.append((name, code))
+        self.getters.append(getter)
+        if labels is not None:
+            self.labels[name] = labels
+
+    def start(self):
+        self.struct = struct.Struct("<" + "".join(code for _, code in self.fields))
+        size = self.struct.size * self.buffer_records
+        self.free: "queue.Queue[bytearray]" = queue.Queue()
+        for _ in range(self.buffer_count - 1):
+            self.free.put(bytearray(size))
+        self.full: "queue.Queue[Optional[Tuple[bytearray, int]]]" = queue.Queue()
+        self.buffer = bytearray(size)
+        self.offset = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(
+            self.directory, time.strftime("%Y%m%d-%H%M%S") + ".mrec"
+        )
+        self.file = open(self.path, "wb")
+        header = json.dumps(
+            {"version": VERSION, "fields": self.fields, "labels": self.labels}
+        ).encode()
+        self.file.write(MAGIC + HEADER_LENGTH.pack(len(header)) + header)
+
+        self.thread = threading.Thread(
+            target=self.run, name="MatchRecorder", daemon=True
+        )
+        self.thread.start()
+
+    def record(self):
+        """
+            Capture one record, call once per loop
+        """
+        self.struct.pack_into(
+            self.buffer, self.offset, *[getter() for getter in self.getters]
+        )
+        self.offset += self.struct.size
+        if self.offset == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        """
+            Hand the records captured so far to the writer
+        """
+        if self.offset == 0:
+            return
+        try:
+            spare = self.free.get_nowait()
+        except queue.Empty:
+            # The writer is behind, drop this buffer rather than block
+            self.dropped += self.offset // self.struct.size
+            self.offset = 0
+            return
+        self.full.put((self.buffer, self.offset))
+        self.buffer = spare
+        self.offset = 0
+
+    def stop(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.full.put(None)
+        self.thread.join()
+        self.file.close()
+        self.file = None
+
+    def run(self):
+        while True:
+            item = self.full.get()
+            if item is None:
+                return
+            buffer, length = item
+            self.file.write(memoryview(buffer)[:length])
+            self.file.flush()
+            self.free.put(buffer)
+
+
+class Recording:
+    """
+        A match recording read back into memory, for replay and tests
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            header, _ = read_header(f)
+            body = f.read()
+
+        self.fields = [name for name, _ in header["fields"]]
+        self.labels = header["labels"]
+        record = record_struct(header)
+        # Ignore a partly written record at the end
+        body = body[: len(body) - len(body) % record.size]
+        self.records = list(record.iter_unpack(body))
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name: str) -> list:
+        i = self.fields.index(name)
+        return [record[i] for record in self.records]
@@ -0,0 +1,89 @@
+import gc
+import logging
+import time
+
+from .profiler import TimingBuffer
+
+
+class MemoryManager:
+    """
+        Keeps the garbage collector out of the middle of enabled loops
+
+        Everything built during startup is frozen out of the collector's
+        view once, so collections only walk objects made since. While
+        enabled automatic collection is off, and the young generations are
+        collected at the end of a loop instead, once as many objects have
+        built up as would have triggered an automatic collection. Full
+        collections only run while disabled.
+    """
+
+    def __init__(self, window=250):
+        self.logger = logging.getLogger("memory")
+        self.active = False
+        self.frozen = 0
+
+        # Objects the collector tracks that each enabled loop created
+        self.allocations = TimingBuffer(window)
+        self.collections = 0
+        self.pause = 0.0
+        self.max_pause = 0.0
+        self._last_count = 0
+
+    def freeze(self):
+        """
+            Move every object alive now into the permanent generation,
+            call once the robot is built
+        """
+        gc.collect()
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+        self.logger.info("Froze %d objects", self.frozen)
+
+    def enable(self):
+        """
+            Stop automatic collections, call when the robot is enabled
+        """
+        gc.disable()
+        self.active = True
+        self._last_count = gc.get_count()[0]
+
+    def disable(self):
+        """
+            Run a full collection and hand collection back to Python
+        """
+        self.active = False
+        start = time.perf_counter()
+        gc.collect()
+        self.logger.info(
+            "Full collection took %.1fms, %d collections last period, "
+            "longest %.2fms",
+            (time.perf_counter() - start) * 1000,
+            self.collections,
+            self.max_pause * 1000,
+        )
+        self.collections = 0
+        self.max_pause = 0.0
+        gc.enable()
+
+    def end_loop(self):
+        """
+            Count this loop's objects and collect if enough have built up,
+            call at the end of every loop
+        """
+        if not self.active:
+            return
+
+        count = gc.get_count()
+        self.allocations.add(max(0, count[0] - self._last_count))
+
+        threshold = gc.get_threshold()
+        if count[0] >= threshold[0]:
+            # Like automatic collection, the middle generation only gets
+            # collected every few young collections
+            generation = 1 if count[1] + 1 >= threshold[1] else 0
+            start = time.perf_counter()
+            gc.collect(generation)
+            self.pause = time.perf_counter() - start
+            self.max_pause = max(self.max_pause, self.pause)
+            self.collections += 1
+        self._last_count = gc.get_count()[0]
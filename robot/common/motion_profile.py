@@ -0,0 +1,79 @@
+import math
+from array import array
+from typing import Dict, Sequence, Tuple
+
+
+def trapezoidal(
+    start: float,
+    end: float,
+    max_velocity: float,
+    max_acceleration: float,
+    period: float,
+    velocity=0.0,
+) -> array:
+    """
+        Generate a velocity and acceleration limited move
+
+        :param velocity: the velocity at ``start``, so a move can be replaced
+                         part way through without a jolt
+        :return: the position at each period after ``start``, ending at ``end``
+    """
+    positions = array("d")
+    position = start
+    dv = max_acceleration * period
+    while True:
+        remaining = end - position
+        # Fastest speed that can still stop at the end, decelerating in
+        # steps of one period
+        stopping = max_acceleration * (
+            math.sqrt(period ** 2 / 4 + 2 * abs(remaining) / max_acceleration)
+            - period / 2
+        )
+        target = math.copysign(min(max_velocity, stopping), remaining)
+        velocity = min(max(target, velocity - dv), velocity + dv)
+
+        step = velocity * period
+        # Close enough to arrive this period
+        if abs(remaining) <= abs(step) + 1e-9 and abs(velocity) <= dv:
+            positions.append(end)
+            return positions
+        position += step
+        positions.append(position)
+
+
+class ProfileCache:
+    """
+        Every profile between a set of positions, generated once up front
+
+        The profiles are packed end to end in a single array, and looked up
+        by their start and end position
+    """
+
+    def __init__(
+        self,
+        positions: Sequence[float],
+        max_velocity: float,
+        max_acceleration: float,
+        period: float,
+    ):
+        self.positions = array("d")
+        self.index: Dict[Tuple[float, float], Tuple[int, int]] = {}
+        for start in positions:
+            for end in positions:
+                if start == end:
+                    continue
+                profile = trapezoidal(
+                    start, end, max_velocity, max_acceleration, period
+                )
+                self.index[(start, end)] = (len(self.positions), len(profile))
+                self.positions.extend(profile)
+
+    def get(self, start: float, end: float):
+        """
+            :return: a view of the cached profile, or None if it isn't cached
+        """
+        found = self.index.get((start, end))
+        if found is None:
+            return None
+        offset, length = found
+        return memoryview(self.positions)[offset : offset + length]
@@ -0,0 +1,176 @@
+from typing import Callable, List, Optional
+
+import wpilib
+
+# PID loops run with the main loop, after every component has executed
+LOOP_PERIOD = 0.02
+
+
+class PIDLoop(wpilib.sendablebase.SendableBase):
+    """
+        A position PID loop, with the same update as wpilib.PIDController
+
+        Gains are per update, so they depend on the loop's period. The
+        setpoint, error and output are plain attributes, only ever written
+        from the main loop, so they can be read without locking.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        p: float,
+        i: float,
+        d: float,
+        source: Callable[[], float],
+        output: Callable[[float], None],
+        period: float,
+        output_range=(-1.0, 1.0),
+        tolerance: Optional[float] = None,
+    ):
+        super().__init__(addLiveWindow=False)
+        self.setName(name)
+        self.p = p
+        self.i = i
+        self.d = d
+        self.source = source
+        self.write = output
+        self.period = period
+        self.minimum, self.maximum = output_range
+        self.tolerance = tolerance
+
+        self.enabled = False
+        self.setpoint = 0.0
+        self.error = 0.0
+        self.output = 0.0
+        self.total_error = 0.0
+        self.prev_error = 0.0
+
+    def set_setpoint(self, setpoint: float):
+        self.setpoint = setpoint
+
+    def get_setpoint(self) -> float:
+        return self.setpoint
+
+    def get_error(self) -> float:
+        return self.error
+
+    def get_output(self) -> float:
+        return self.output
+
+    def set_output_range(self, minimum: float, maximum: float):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def set_enabled(self, enabled: bool):
+        if self.enabled and not enabled:
+            # Let go, like wpilib.PIDController.disable
+            self.output = 0.0
+            self.write(0.0)
+        self.enabled = enabled
+
+    def is_enabled(self) -> bool:
+        return self.enabled
+
+    def on_target(self) -> bool:
+        return self.tolerance is not None and abs(self.error) < self.tolerance
+
+    def reset(self):
+        """
+            Forget the accumulated and previous error
+        """
+        self.total_error = 0.0
+        self.prev_error = 0.0
+
+    def calculate(self):
+        error = self.setpoint - self.source()
+        if self.i != 0:
+            self.total_error = min(
+                max(self.total_error + error, self.minimum / self.i),
+                self.maximum / self.i,
+            )
+        output = (
+            self.p * error
+            + self.i * self.total_error
+            + self.d * (error - self.prev_error)
+        )
+        output = min(max(output, self.minimum), self.maximum)
+        self.prev_error = error
+        self.error = error
+        self.output = output
+        self.write(output)
+
+    def initSendable(self, builder: wpilib.SendableBuilder):
+        # Shows as a PID controller widget, tunable from the dashboard
+        builder.setSmartDashboardType("PIDController")
+        builder.setSafeState(lambda: self.set_enabled(False))
+        builder.addDoubleProperty("p", lambda: self.p, self._set_p)
+        builder.addDoubleProperty("i", lambda: self.i, self._set_i)
+        builder.addDoubleProperty("d", lambda: self.d, self._set_d)
+        builder.addDoubleProperty("f", lambda: 0.0, None)
+        builder.addDoubleProperty("setpoint", self.get_setpoint, self.set_setpoint)
+        builder.addBooleanProperty("enabled", self.is_enabled, self.set_enabled)
+
+    def _set_p(self, p):
+        self.p = p
+
+    def _set_i(self, i):
+        self.i = i
+
+    def _set_d(self, d):
+        self.d = d
+
+
+class PIDScheduler:
+    """
+        Runs every PID loop on the robot from the main loop
+
+        This replaces a notifier thread per wpilib.PIDController. Loops run
+        in the order they were added, once every ``period`` worth of main
+        loops, and read their input from the loop's sensor snapshot
+    """
+
+    def __init__(self, period=LOOP_PERIOD):
+        self.period = period
+        self.loops: List[PIDLoop] = []
+        self.dividers: List[int] = []
+        self.ticks = 0
+
+    def add(
+        self,
+        name: str,
+        p: float,
+        i: float,
+        d: float,
+        source: Callable[[], float],
+        output: Callable[[float], None],
+        period: Optional[float] = None,
+        **kwargs
+    ) -> PIDLoop:
+        """
+            :param source: returns the input, read it from the RobotState
+            :param output: takes the output, eg. a motor's set
+            :param period: how often the loop runs, a multiple of the main
+                           loop's period
+        """
+        if period is None:
+            period = self.period
+        every = round(period / self.period)
+        if every < 1 or abs(every * self.period - period) > 1e-9:
+            raise ValueError(
+                "PID period must be a multiple of %s, not %s" % (self.period, period)
+            )
+        loop = PIDLoop(name, p, i, d, source, output, period, **kwargs)
+        self.loops.append(loop)
+        self.dividers.append(every)
+        return loop
+
+    def update(self):
+        ticks = self.ticks
+        for loop, every in zip(self.loops, self.dividers):
+            if loop.enabled and ticks % every == 0:
+                loop.calculate()
+        self.ticks = ticks + 1
+
+    def reset(self):
+        for loop in self.loops:
+            loop.reset()
@@ -0,0 +1,112 @@
+from array import array
+from typing import Optional, Sequence
+
+import wpilib
+
+
+class PowerSample:
+    """
+        A single reading of the PDP
+    """
+
+    __slots__ = ("timestamp", "voltage", "total_current", "currents")
+
+    def __init__(self, channels: int):
+        self.timestamp = 0.0
+        self.voltage = 0.0
+        self.total_current = 0.0
+        self.currents = array("d", [0.0]) * channels
+
+
+class PowerSampler:
+    """
+        Reads the PDP from its own notifier so the slow CAN reads never
+        land in the control loop
+
+        Samples are written into a preallocated ring buffer. There is a
+        single writer, which fills a slot completely before publishing its
+        index, so readers can take the newest sample without locking.
+    """
+
+    def __init__(
+        self,
+        pdp: wpilib.PowerDistributionPanel,
+        channels: Sequence[int] = range(16),
+        period=0.05,
+        size=32,
+        sag_voltage=9.0,
+        brownout_voltage=7.0,
+        min_scale=0.5,
+    ):
+        """
+            :param sag_voltage: outputs start being scaled below this voltage
+            :param brownout_voltage: outputs are scaled to ``min_scale`` at
+                                     and below this voltage
+        """
+        self.pdp = pdp
+        self.channels = tuple(channels)
+        self.period = period
+        self.sag_voltage = sag_voltage
+        self.brownout_voltage = brownout_voltage
+        self.min_scale = min_scale
+
+        self.samples = [PowerSample(len(self.channels)) for _ in range(size)]
+        # Index of the newest complete sample, -1 until the first one is taken
+        self.newest = -1
+
+        self.notifier = wpilib.Notifier(self.sample)
+
+    def start(self):
+        self.notifier.startPeriodic(self.period)
+
+    def stop(self):
+        self.notifier.stop()
+
+    def sample(self):
+        index = (self.newest + 1) % len(self.samples)
+        sample = self.samples[index]
+
+        sample.timestamp = wpilib.Timer.getFPGATimestamp()
+        sample.voltage = self.pdp.getVoltage()
+        sample.total_current = self.pdp.getTotalCurrent()
+        currents = sample.currents
+        for i, channel in enumerate(self.channels):
+            currents[i] = self.pdp.getCurrent(channel)
+
+        # Publish only once the slot is fully written
+        self.newest = index
+
+    def latest(self) -> Optional[PowerSample]:
+        """
+            :return: the newest sample, or None if nothing has been sampled yet
+        """
+        newest = self.newest
+        if newest < 0:
+            return None
+        return self.samples[newest]
+
+    def voltage(self) -> float:
+        sample = self.latest()
+        return sample.voltage if sample is not None else 0.0
+
+    def total_current(self) -> float:
+        sample = self.latest()
+        return sample.total_current if sample is not None else 0.0
+
+    def output_scale(self) -> float:
+        """
+            How much motor outputs should be scaled to ride out a voltage sag
+
+            :return: 1.0 with a healthy battery, falling linearly to
+                     ``min_scale`` at ``brownout_voltage``
+        """
+        sample = self.latest()
+        # A zero voltage means the PDP hasn't reported yet
+        if sample is None or sample.voltage <= 0 or sample.voltage >= self.sag_voltage:
+            return 1.0
+        if sample.voltage <= self.brownout_voltage:
+            return self.min_scale
+        fraction = (sample.voltage - self.brownout_voltage) / (
+            self.sag_voltage - self.brownout_voltage
+        )
+        return self.min_scale + fraction * (1 - self.min_scale)
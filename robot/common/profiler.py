@@ -0,0 +1,126 @@
+import math
+import time
+import tracemalloc
+from array import array
+from typing import Dict, Tuple
+
+from networktables import NetworkTables
+
+
+class TimingBuffer:
+    """
+        Fixed-size ring buffer of section timings, in seconds
+    """
+
+    __slots__ = ("samples", "index", "count")
+
+    def __init__(self, size: int):
+        self.samples = array("d", [0.0]) * size
+        self.index = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        if self.count < len(self.samples):
+            self.count += 1
+
+    def summary(self) -> Tuple[float, float, float, float]:
+        """
+            Summarize the buffered timings
+            :return: (min, mean, p99, max)
+        """
+        if self.count == 0:
+            return (0.0, 0.0, 0.0, 0.0)
+        ordered = sorted(self.samples[: self.count])
+        p99 = ordered[max(0, math.ceil(0.99 * self.count) - 1)]
+        return (ordered[0], sum(ordered) / self.count, p99, ordered[-1])
+
+
+class LoopProfiler:
+    """
+        Times each instrumented section of the control loop and publishes
+        a min/mean/p99/max summary (in ms) to NetworkTables at a low rate
+    """
+
+    # Also record the bytes each section allocates, in ``allocations``.
+    # Needs tracemalloc to be tracing and slows everything down, so it is
+    # only for benchmarks in the simulator
+    trace_allocations = False
+
+    def __init__(self, window=250, publish_period=1.0, table="Profiler"):
+        self.window = window
+        self.publish_period = publish_period
+        self.table = NetworkTables.getTable(table)
+
+        self.buffers: Dict[str, TimingBuffer] = {}
+        self.allocations: Dict[str, TimingBuffer] = {}
+        self.loop = TimingBuffer(window)
+        self.overruns = 0
+
+        self._loop_total = 0.0
+        self._last_publish = time.monotonic()
+
+    def instrument(self, name: str, obj, method="execute"):
+        """
+            Replace ``obj.method`` with a timed wrapper
+        """
+        fn = getattr(obj, method)
+        buffer = self.buffers.setdefault(name, TimingBuffer(self.window))
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                buffer.add(elapsed)
+                self._loop_total += elapsed
+
+        if self.trace_allocations:
+            timed = self._trace_allocations(name, timed)
+        setattr(obj, method, timed)
+
+    def _trace_allocations(self, name: str, fn):
+        buffer = self.allocations.setdefault(name, TimingBuffer(self.window))
+        get_traced_memory = tracemalloc.get_traced_memory
+        # Python 3.9+, otherwise only memory kept after the call is counted
+        reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+        def traced(*args, **kwargs):
+            if reset_peak is not None:
+                reset_peak()
+            start = get_traced_memory()[0]
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                current, peak = get_traced_memory()
+                buffer.add((peak if reset_peak is not None else current) - start)
+
+        return traced
+
+    def overrun(self):
+        """
+            Called when the loop watchdog expires
+        """
+        self.overruns += 1
+
+    def end_loop(self):
+        """
+            Close out the current loop iteration, call once per loop
+        """
+        if self._loop_total:
+            self.loop.add(self._loop_total)
+            self._loop_total = 0.0
+
+        now = time.monotonic()
+        if now - self._last_publish >= self.publish_period:
+            self._last_publish = now
+            self.publish()
+
+    def publish(self):
+        for name, buffer in self.buffers.items():
+            self.table.putNumberArray(name, [t * 1000 for t in buffer.summary()])
+        self.table.putNumberArray("loop", [t * 1000 for t in self.loop.summary()])
+        self.table.putNumber("overruns", self.overruns)
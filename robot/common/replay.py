@@ -0,0 +1,65 @@
+import bisect
+
+from common.match_recorder import Recording
+
+# The gamepad ports the match recorder captures
+PORTS = (0, 1)
+AXES = 6
+
+
+class InputReplay:
+    """
+        Plays the gamepad inputs from a match recording back into the
+        simulator
+
+        Inputs are replayed by the time since the first call to ``apply``,
+        so replay runs at whatever speed the simulator steps
+    """
+
+    def __init__(self, recording: Recording):
+        self.recording = recording
+        self.times = recording.column("time")
+        self.start = None
+
+        fields = recording.fields
+        self.columns = [
+            (
+                port,
+                [
+                    fields.index("gamepad%d_axis%d" % (port, axis))
+                    for axis in range(AXES)
+                ],
+                fields.index("gamepad%d_buttons" % port),
+                fields.index("gamepad%d_pov" % port),
+            )
+            for port in PORTS
+        ]
+
+    @property
+    def duration(self) -> float:
+        return self.times[-1] - self.times[0]
+
+    def apply(self, hal_data, tm: float) -> bool:
+        """
+            Set the simulated gamepads to the recorded inputs at ``tm``
+
+            :param tm: the simulator time
+            :return: False once the recording has run out
+        """
+        if self.start is None:
+            self.start = tm
+        elapsed = tm - self.start
+        # Small tolerance so float error can't slip a loop
+        i = bisect.bisect_right(self.times, self.times[0] + elapsed + 1e-6) - 1
+        record = self.recording.records[i]
+
+        for port, axes, buttons, pov in self.columns:
+            joystick = hal_data["joysticks"][port]
+            for axis, column in enumerate(axes):
+                joystick["axes"][axis] = record[column]
+            mask = record[buttons]
+            for button in range(1, len(joystick["buttons"])):
+                joystick["buttons"][button] = bool(mask & (1 << (button - 1)))
+            joystick["povs"][0] = record[pov]
+
+        return elapsed <= self.duration
@@ -0,0 +1,165 @@
+import navx
+import wpilib
+
+from common.encoder import BaseEncoder
+from common.srx_mag_encoder import AbsoluteMagneticEncoder
+from common.vision import VisionClient
+
+
+class RobotState:
+    """
+        A snapshot of every sensor on the robot, captured once per loop
+
+        Components read from this instead of the hardware, so each signal
+        is only read once per tick and every component sees the same values.
+        Whatever runs first in a loop calls ``refresh``, and ``expire`` is
+        called at the end of the loop.
+    """
+
+    __slots__ = (
+        "timestamp",
+        "fl_position",
+        "fr_position",
+        "rl_position",
+        "rr_position",
+        "fl_velocity",
+        "fr_velocity",
+        "rl_velocity",
+        "rr_velocity",
+        "navx_angle",
+        "lift_position",
+        "lift_velocity",
+        "wrist_angle",
+        "wrist_ready",
+        "tape_yaw",
+        "tape_detected",
+        "tape_age",
+        "cargo_yaw",
+        "cargo_detected",
+        "cargo_age",
+        "current",
+        "_drive_encoders",
+        "_navx",
+        "_lift_encoder",
+        "_wrist_encoder",
+        "_vision",
+    )
+
+    def __init__(
+        self,
+        fl_drive_encoder: BaseEncoder,
+        fr_drive_encoder: BaseEncoder,
+        rl_drive_encoder: BaseEncoder,
+        rr_drive_encoder: BaseEncoder,
+        navx: navx.AHRS,
+        lift_encoder: BaseEncoder,
+        wrist_encoder: AbsoluteMagneticEncoder,
+        vision: VisionClient,
+    ):
+        self._drive_encoders = (
+            fl_drive_encoder,
+            fr_drive_encoder,
+            rl_drive_encoder,
+            rr_drive_encoder,
+        )
+        self._navx = navx
+        self._lift_encoder = lift_encoder
+        self._wrist_encoder = wrist_encoder
+        self._vision = vision
+
+        self.timestamp = 0.0
+        self.fl_position = self.fr_position = 0.0
+        self.rl_position = self.rr_position = 0.0
+        self.fl_velocity = self.fr_velocity = 0.0
+        self.rl_velocity = self.rr_velocity = 0.0
+        self.navx_angle = 0.0
+        self.lift_position = self.lift_velocity = 0.0
+        self.wrist_angle = 0.0
+        self.wrist_ready = False
+        self.tape_yaw = self.cargo_yaw = 0.0
+        self.tape_detected = self.cargo_detected = False
+        # Seconds since the target was seen
+        self.tape_age = self.cargo_age = 0.0
+        # Whether the snapshot was taken this loop
+        self.current = False
+
+    def refresh(self):
+        """
+            Take the snapshot, unless it was already taken this loop
+        """
+        if not self.current:
+            self.update()
+            self.current = True
+
+    def expire(self):
+        self.current = False
+
+    def update(self):
+        """
+            Read every sensor
+        """
+        self.timestamp = wpilib.Timer.getFPGATimestamp()
+
+        # Wheel travel in inches, velocities smoothed inches per second
+        fl, fr, rl, rr = self._drive_encoders
+        for encoder in self._drive_encoders:
+            encoder.update(self.timestamp)
+        self.fl_position = fl.distance
+        self.fr_position = fr.distance
+        self.rl_position = rl.distance
+        self.rr_position = rr.distance
+        self.fl_velocity = fl.rate
+        self.fr_velocity = fr.rate
+        self.rl_velocity = rl.rate
+        self.rr_velocity = rr.rate
+
+        self.navx_angle = self._navx.getAngle()
+
+        # The lift works in encoder counts
+        self._lift_encoder.update(self.timestamp)
+        self.lift_position = self._lift_encoder.position
+        self.lift_velocity = self._lift_encoder.rate
+        self.wrist_angle = self._wrist_encoder.get_angle()
+        self.wrist_ready = self._wrist_encoder.is_ready()
+
+        # Only a fresh target counts as detected, the yaw is kept when lost
+        tape = self._vision.tape.latest_valid()
+        self.tape_detected = tape is not None
+        if tape is not None:
+            self.tape_yaw = tape[0].yaw
+            self.tape_age = tape[1]
+        cargo = self._vision.cargo.latest_valid()
+        self.cargo_detected = cargo is not None
+        if cargo is not None:
+            self.cargo_yaw = cargo[0].yaw
+            self.cargo_age = cargo[1]
+
+    def encoder_view(self, name: str) -> "EncoderView":
+        """
+            A dashboard encoder widget backed by this snapshot
+            :param name: the encoder prefix, eg. "fl" or "lift"
+        """
+        return EncoderView(self, name + "_position", name + "_velocity")
+
+
+class EncoderView(wpilib.sendablebase.SendableBase):
+    """
+        Presents a snapshot's encoder values as an encoder sendable,
+        without touching the hardware when the dashboard updates
+    """
+
+    def __init__(self, state: RobotState, position: str, velocity: str):
+        super().__init__(addLiveWindow=False)
+        self.state = state
+        self.position = position
+        self.velocity = velocity
+
+    def initSendable(self, builder: wpilib.SendableBuilder) -> None:
+        builder.setSmartDashboardType("Encoder")
+
+        builder.addDoubleProperty(
+            "Speed", lambda: getattr(self.state, self.velocity), None
+        )
+        builder.addDoubleProperty(
+            "Distance", lambda: getattr(self.state, self.position), None
+        )
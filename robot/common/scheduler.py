@@ -0,0 +1,85 @@
+import logging
+import threading
+from typing import Callable, Dict, List, Tuple
+
+import wpilib
+
+
+class Handoff:
+    """
+        Passes the newest value from one thread to another, readers get the
+        value and how long ago it was put
+    """
+
+    def __init__(self, value):
+        self.lock = threading.Lock()
+        self.value = value
+        self.timestamp = wpilib.Timer.getFPGATimestamp()
+
+    def put(self, value):
+        now = wpilib.Timer.getFPGATimestamp()
+        with self.lock:
+            self.value = value
+            self.timestamp = now
+
+    def get(self) -> Tuple[object, float]:
+        with self.lock:
+            value = self.value
+            timestamp = self.timestamp
+        return value, wpilib.Timer.getFPGATimestamp() - timestamp
+
+
+class Scheduler:
+    """
+        Runs components at the rates they declare
+
+        A component declares ``RATE``, in hz, at least the main loop's rate.
+        Its ``update`` method is called from a notifier at that rate, and
+        ``execute`` still runs in the main loop to hand commands over to
+        ``update``. Components without a rate run every loop.
+
+        Slower rates aren't supported, magicbot resets ``will_reset_to``
+        attributes after every loop whether or not ``execute`` ran.
+    """
+
+    def __init__(self, loop_period: float):
+        self.loop_period = loop_period
+        self.logger = logging.getLogger("scheduler")
+        # period: update methods, every component at a rate shares a notifier
+        self.fast: Dict[float, List[Tuple[str, Callable]]] = {}
+        self.notifiers: List[wpilib.Notifier] = []
+
+    def add(self, name: str, component):
+        rate = getattr(component, "RATE", None)
+        if rate is None:
+            return
+        period = 1 / rate
+        if period > self.loop_period:
+            raise ValueError(
+                "%s.RATE must be at least %s hz, not %s"
+                % (name, 1 / self.loop_period, rate)
+            )
+        if period < self.loop_period:
+            self.fast.setdefault(period, []).append((name, component.update))
+
+    def start(self):
+        for period, updates in self.fast.items():
+            notifier = wpilib.Notifier(self.runner(updates))
+            notifier.startPeriodic(period)
+            self.notifiers.append(notifier)
+
+    def stop(self):
+        for notifier in self.notifiers:
+            notifier.stop()
+        self.notifiers.clear()
+
+    def runner(self, updates: List[Tuple[str, Callable]]) -> Callable:
+        def run():
+            for name, update in updates:
+                # Keep the other components running
+                try:
+                    update()
+                except Exception:
+                    self.logger.exception("%s.update failed", name)
+
+        return run
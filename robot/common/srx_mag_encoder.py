@@ -1,27 +1,86 @@
+import statistics
+from array import array
+
 import wpilib
 import wpilib.interfaces
 from wpilib.interfaces import PIDSource
-import time
+
+# Valid pulse widths, the encoder outputs 1us to 4096us
+MIN_PERIOD = 0.5e-6
+MAX_PERIOD = 4200e-6
+
+
+def period_to_degrees(period: float) -> float:
+    return ((period - 1e-6) / 4095e-6) * 360
 
 
 # TODO: Move to marsutils
 class AbsoluteMagneticEncoder(wpilib.interfaces.PIDSource):
-    def __init__(self, pwm_channel):
+    """
+        Reads an SRX mag encoder's absolute PWM output
+
+        The pulse width is sampled from a notifier into a small ring buffer,
+        and the median of the buffer is cached as the angle, so readers never
+        touch the counter and a single bad pulse can't jerk the wrist. The
+        encoder is ready once it has had time to settle and the buffer is
+        full, which happens in the background instead of blocking startup.
+    """
+
+    def __init__(self, pwm_channel, period=0.005, size=7, settle_time=0.5):
+        """
+            :param period: how often the pulse width is sampled
+            :param size: how many samples the median is taken over
+            :param settle_time: how long after startup readings are trusted
+        """
         self.counter = wpilib.Counter(pwm_channel)
         self.counter.setSemiPeriodMode(True)  # only count rising edges
 
-        time.sleep(0.5)
+        self.samples = array("d", [0.0]) * size
+        self.index = 0
+        self.count = 0
+        self.rejected = 0
+
+        self.period = 0.0
+        self.angle = 0.0
+        self.offsetDegrees = 0.0
+        self.ready = False
+        self.ready_time = wpilib.Timer.getFPGATimestamp() + settle_time
+
+        self.notifier = wpilib.Notifier(self.sample)
+        self.notifier.startPeriodic(period)
+
+    def sample(self):
+        period = self.counter.getPeriod()
+        # Dropped or glitched pulses
+        if not MIN_PERIOD <= period <= MAX_PERIOD:
+            self.rejected += 1
+            return
+
+        self.samples[self.index] = period
+        self.index = (self.index + 1) % len(self.samples)
+        if self.count < len(self.samples):
+            self.count += 1
+            if self.count < len(self.samples):
+                return
+
+        self.period = statistics.median(self.samples)
+        self.angle = period_to_degrees(self.period)
+
+        if not self.ready and wpilib.Timer.getFPGATimestamp() >= self.ready_time:
+            self.offsetDegrees = self.angle
+            self.ready = True
 
-        self.offsetDegrees = self.get_angle()
+    def is_ready(self) -> bool:
+        return self.ready
 
     def clear(self):
         self.offsetDegrees = 0
 
     def get_angle(self):
-        return ((self.counter.getPeriod() - 1e-6) / 4095e-6) * 360  # returns degrees
+        return self.angle  # returns degrees
 
     def get_raw(self):
-        return self.counter.getPeriod()
+        return self.period
 
     def getPIDSourceType(self) -> PIDSource.PIDSourceType:
         return PIDSource.PIDSourceType.kDisplacement
@@ -0,0 +1,55 @@
+from typing import Callable, List
+
+import wpilib
+from networktables.entry import NetworkTableEntry
+
+
+class _Channel:
+    __slots__ = ("entry", "getter", "deadband", "last")
+
+    def __init__(self, entry: NetworkTableEntry, getter: Callable, deadband: float):
+        self.entry = entry
+        self.getter = getter
+        self.deadband = deadband
+        self.last = None
+
+
+class TelemetryPublisher:
+    """
+        Publishes dashboard values from its own notifier instead of the
+        control loop, only sending values that changed beyond a deadband
+
+        Getters run on the notifier thread, so they must only read cached
+        values (eg. from ``RobotState``) and never touch the hardware
+    """
+
+    def __init__(self, period=0.1):
+        self.period = period
+        self.channels: List[_Channel] = []
+        self.notifier = wpilib.Notifier(self.publish)
+
+    def add(self, entry: NetworkTableEntry, getter: Callable, deadband=0.0):
+        """
+            Publish ``getter()`` to ``entry``
+            :param deadband: minimum change before a number is resent
+        """
+        self.channels.append(_Channel(entry, getter, deadband))
+
+    def start(self):
+        self.notifier.startPeriodic(self.period)
+
+    def stop(self):
+        self.notifier.stop()
+
+    def publish(self):
+        for channel in self.channels:
+            value = channel.getter()
+            last = channel.last
+            if last is not None:
+                if isinstance(value, (bool, str)):
+                    if value == last:
+                        continue
+                elif abs(value - last) <= channel.deadband:
+                    continue
+            channel.entry.setValue(value)
+            channel.last = value
@@ -0,0 +1,148 @@
+import math
+import mmap
+import struct
+import sys
+import threading
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+# Generated by tools/generate_trajectories.py
+MAGIC = b"KTRJ"
+VERSION = 1
+# magic, version, fields per sample, period, trajectory count
+HEADER = struct.Struct("<4sHHfI")
+# name, drive mode name, first sample, sample count
+ENTRY = struct.Struct("<32s8sII")
+
+# Each sample is, in feet, degrees and seconds relative to the start pose:
+# x forward, y right, heading clockwise, then their velocities
+FIELDS = ("x", "y", "heading", "vx", "vy", "omega")
+
+Sample = Tuple[float, float, float, float, float, float]
+
+
+class Trajectory:
+    """
+        A time parameterized path, sampled at a fixed period
+
+        The samples are a view straight into the trajectory file, pages are
+        only read in as they are used
+    """
+
+    __slots__ = ("name", "mode", "period", "samples", "length")
+
+    def __init__(self, name: str, mode: str, period: float, samples: memoryview):
+        self.name = name
+        # DriveMode name, eg. "TANK"
+        self.mode = mode
+        self.period = period
+        self.samples = samples
+        self.length = len(samples) // len(FIELDS)
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def duration(self) -> float:
+        return (self.length - 1) * self.period
+
+    def sample(self, tm: float) -> Sample:
+        """
+            :param tm: seconds since the start, clamped to the trajectory
+            :return: the sample at ``tm``, interpolated between samples
+        """
+        position = min(max(tm / self.period, 0.0), self.length - 1.0)
+        i = min(int(position), self.length - 2)
+        fraction = position - i
+        samples = self.samples
+        width = len(FIELDS)
+        a = i * width
+        b = a + width
+        return tuple(
+            samples[a + k] + (samples[b + k] - samples[a + k]) * fraction
+            for k in range(width)
+        )
+
+    def end(self) -> Sample:
+        start = (self.length - 1) * len(FIELDS)
+        return tuple(self.samples[start : start + len(FIELDS)])
+
+
+class TrajectoryLibrary:
+    """
+        Every trajectory in a trajectory file, memory mapped the first time
+        one is needed so startup doesn't wait on the disk
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.trajectories: Dict[str, Trajectory] = {}
+        self._map = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+            Map the file and read its index, if it hasn't been already
+        """
+        with self._lock:
+            if self._map is not None:
+                return
+            if sys.byteorder != "little":
+                raise RuntimeError("Trajectory files are little endian")
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            magic, version, fields, period, count = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or version != VERSION or fields != len(FIELDS):
+                raise ValueError(
+                    "%s is not a version %d trajectory file" % (self.path, VERSION)
+                )
+
+            data_start = HEADER.size + count * ENTRY.size
+            floats = memoryview(mapped)[data_start:].cast("f")
+            for n in range(count):
+                name, mode, first, length = ENTRY.unpack_from(
+                    mapped, HEADER.size + n * ENTRY.size
+                )
+                name = name.rstrip(b"\0").decode()
+                self.trajectories[name] = Trajectory(
+                    name,
+                    mode.rstrip(b"\0").decode(),
+                    period,
+                    floats[first * len(FIELDS) : (first + length) * len(FIELDS)],
+                )
+            self._map = mapped
+
+    def names(self):
+        self.load()
+        return sorted(self.trajectories)
+
+    def get(self, name: str) -> Trajectory:
+        self.load()
+        return self.trajectories[name]
+
+
+class Path(NamedTuple):
+    mode: str
+    samples: Iterable[Sample]
+
+
+def write_trajectories(path: str, period: float, trajectories: Dict[str, Path]):
+    """
+        Write a trajectory file, see tools/generate_trajectories.py
+    """
+    entries = []
+    data = bytearray()
+    first = 0
+    for name, (mode, samples) in trajectories.items():
+        samples = list(samples)
+        entries.append(ENTRY.pack(name.encode(), mode.encode(), first, len(samples)))
+        for sample in samples:
+            assert all(math.isfinite(value) for value in sample), name
+            data += struct.pack("<%df" % len(FIELDS), *sample)
+        first += len(samples)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(FIELDS), period, len(entries)))
+        for entry in entries:
+            f.write(entry)
+        f.write(data)
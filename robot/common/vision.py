@@ -0,0 +1,202 @@
+import logging
+from array import array
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import wpilib
+from networktables import NetworkTables, NetworkTablesInstance
+from networktables.entry import NetworkTableEntry
+from networktables.networktable import NetworkTable
+
+# A target this old is no longer trusted, the coprocessor sends a frame
+# about every 33ms (~30fps)
+STALE_AGE = 0.25
+HISTORY_SIZE = 32
+
+LISTEN_FLAGS = (
+    NetworkTablesInstance.NotifyFlags.NEW
+    | NetworkTablesInstance.NotifyFlags.UPDATE
+    | NetworkTablesInstance.NotifyFlags.LOCAL
+)
+
+
+class Target(NamedTuple):
+    # FPGA time the update arrived
+    timestamp: float
+    yaw: float
+    detected: bool
+
+
+class VisionFeed:
+    """
+        Timestamped updates for one kind of target, kept in a ring buffer
+
+        Filled by networktables listeners instead of polling. There is a
+        single writer, the listener thread; each slot is filled before the
+        count is published, so readers only see complete updates.
+
+        Networktables only sends values that change, so a still target's
+        yaw may never update. Instead the coprocessor counts every frame it
+        processes, and sets the yaw and detected entries before the count.
+        Each new count is one update, and a skipped count is a lost frame.
+        Until a count arrives every yaw or detected change is an update, as
+        older coprocessor code doesn't send one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        frame: NetworkTableEntry,
+        yaw: NetworkTableEntry,
+        detected: NetworkTableEntry,
+        size=HISTORY_SIZE,
+        stale_age=STALE_AGE,
+    ):
+        self.name = name
+        self.logger = logging.getLogger("vision")
+        self.size = size
+        self.stale_age = stale_age
+        self.times = array("d", [0.0]) * size
+        self.yaws = array("d", [0.0]) * size
+        self.detections = array("b", [0]) * size
+        # Total number of updates ever appended
+        self.count = 0
+        # Frames the coprocessor sent that never arrived
+        self.dropouts = 0
+        # The last frame count received
+        self.frame: Optional[int] = None
+        # Complained that there is no frame count
+        self.warned = False
+
+        self.yaw_entry = yaw
+        self.detected_entry = detected
+        self.callbacks: List[Callable[[Target], None]] = []
+
+        frame.addListener(self.on_frame, LISTEN_FLAGS)
+        yaw.addListener(self.on_value, LISTEN_FLAGS)
+        detected.addListener(self.on_value, LISTEN_FLAGS)
+
+    def subscribe(self, callback: Callable[[Target], None]):
+        """
+            Call ``callback(target)`` from the listener thread on every update
+        """
+        self.callbacks.append(callback)
+
+    def on_frame(self, entry, key, value, is_new):
+        frame = int(value)
+        # The count starts over when the coprocessor restarts
+        if self.frame is not None and frame > self.frame + 1:
+            self.dropouts += frame - self.frame - 1
+        self.frame = frame
+        self.append(
+            self.yaw_entry.getDouble(0.0), self.detected_entry.getBoolean(False)
+        )
+
+    def on_value(self, entry, key, value, is_new):
+        if self.frame is not None:
+            return
+        # The first yaw and detected arrive before the first count
+        if self.count >= 10 and not self.warned:
+            self.logger.error(
+                "%sFrame isn't being sent, update the coprocessor. Until then "
+                "a still %s target goes stale",
+                self.name,
+                self.name,
+            )
+            self.warned = True
+        self.append(
+            self.yaw_entry.getDouble(0.0), self.detected_entry.getBoolean(False)
+        )
+
+    def append(self, yaw: float, detected: bool):
+        now = wpilib.Timer.getFPGATimestamp()
+        count = self.count
+        i = count % self.size
+        self.times[i] = now
+        self.yaws[i] = yaw
+        self.detections[i] = detected
+        self.count = count + 1
+
+        target = Target(now, yaw, detected)
+        for callback in self.callbacks:
+            callback(target)
+
+    def latest(self) -> Optional[Target]:
+        count = self.count
+        if count == 0:
+            return None
+        return self._target((count - 1) % self.size)
+
+    def latest_valid(self) -> Optional[Tuple[Target, float]]:
+        """
+            :return: the newest update with a target in view and its age in
+                     seconds, or None if the target was lost or is stale
+        """
+        target = self.latest()
+        if target is None or not target.detected:
+            return None
+        age = wpilib.Timer.getFPGATimestamp() - target.timestamp
+        if age > self.stale_age:
+            return None
+        return target, age
+
+    def is_stale(self) -> bool:
+        target = self.latest()
+        return (
+            target is None
+            or wpilib.Timer.getFPGATimestamp() - target.timestamp > self.stale_age
+        )
+
+    def _target(self, i: int) -> Target:
+        return Target(self.times[i], self.yaws[i], bool(self.detections[i]))
+
+
+class VisionClient:
+    """
+        Everything the pi/jetson sends over the Vision table, and the mode
+        sent back to it
+
+        For each of tape and cargo it sends the yaw and whether the target
+        is detected, then a frame count, eg. tapeYaw, tapeDetected and
+        tapeFrame
+    """
+
+    def __init__(self, table: NetworkTable):
+        self.table = table
+        self.tape = VisionFeed(
+            "tape",
+            table.getEntry("tapeFrame"),
+            table.getEntry("tapeYaw"),
+            table.getEntry("tapeDetected"),
+        )
+        self.cargo = VisionFeed(
+            "cargo",
+            table.getEntry("cargoFrame"),
+            table.getEntry("cargoYaw"),
+            table.getEntry("cargoDetected"),
+        )
+        self.tape_mode = table.getEntry("tape")
+        self.tape_mode_value: Optional[bool] = None
+        # A restarted coprocessor may have gone back to its default mode
+        self.tape.subscribe(self.resend_tape_mode)
+        self.cargo.subscribe(self.resend_tape_mode)
+
+    def set_tape_mode(self, tape: bool):
+        """
+            Switch the coprocessor between looking for tape and cargo
+
+            Sent immediately rather than at the next periodic update, so the
+            switch takes a single round trip
+        """
+        self.tape_mode_value = tape
+        self.resend_tape_mode()
+
+    def resend_tape_mode(self, target: Optional[Target] = None):
+        """
+            Send the mode again if the entry no longer holds it, checked
+            with every update
+        """
+        tape = self.tape_mode_value
+        if tape is None or self.tape_mode.getBoolean(not tape) == tape:
+            return
+        self.tape_mode.setBoolean(tape)
+        NetworkTables.flush()
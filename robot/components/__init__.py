@@ -2,3 +2,4 @@ from .drive import Drive  # noqa F401
 from .lift import Lift  # noqa F401
 from .intake import Intake  # noqa F401
 from .climb import Climb  # noqa F401
+from .odometry import Odometry  # noqa F401
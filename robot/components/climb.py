@@ -1,19 +1,23 @@
-import rev
 import wpilib
 from magicbot import will_reset_to
 
+from common.dedup import DedupMotor, DedupSolenoid
+
 
 class Climb:
+    # Runs every loop so the legs stop as soon as the driver lets go, the
+    # deduplicated writes make the idle loops nearly free
+
     # leg1: ctre.WPI_TalonSRX
     # leg2: ctre.WPI_TalonSRX
 
-    leg1: rev.CANSparkMax
+    leg1: DedupMotor
     # leg2: rev.CANSparkMax
 
-    leg_drive: rev.CANSparkMax
+    leg_drive: DedupMotor
     # leg_drive: ctre.WPI_TalonSRX
 
-    climb_piston: wpilib.DoubleSolenoid
+    climb_piston: DedupSolenoid
 
     def setup(self):
         self.extend = will_reset_to(False)
@@ -1,12 +1,23 @@
 import wpilib
 import wpilib.drive
 from enum import Enum, auto
-import math
-import marsutils.math
+import threading
+from typing import NamedTuple
 import navx
 from magicbot import will_reset_to
 
 from common.encoder import BaseEncoder
+from common.power import PowerSampler
+from common.dedup import DedupSolenoid
+from common.input_shaping import ResponseCurve
+from common.scheduler import Handoff
+
+# Stop if the main loop hasn't sent a command for this long
+COMMAND_TIMEOUT = 0.1
+
+# Responses for adjusted commands, the driver's are shaped by their profile
+ADJUSTED_MOVE = ResponseCurve(power=3, exact=True)
+ADJUSTED_TURN = ResponseCurve(scale=0.85, power=2, exact=True)
 
 
 class DriveMode(Enum):
@@ -20,26 +31,46 @@ class DriveMode(Enum):
             return self.MECANUM
 
 
+class DriveCommand(NamedTuple):
+    mode: DriveMode
+    y: float
+    x: float
+    rotation: float
+    fod: bool
+    adjusted: bool
+
+
+STOPPED = DriveCommand(DriveMode.TANK, 0, 0, 0, False, True)
+
+
 class Drive:
     """
         Kevin has a high power drive train that uses
         mecanum and tank (Octocanum) to provide
         maneuverability and power
+
+        The outputs are updated at 100hz, faster than the main loop, so
+        field oriented drive always uses a fresh gyro angle. Controls still
+        set the drive from the main loop, ``execute`` hands the command over
+        to ``update`` and applies it straight away.
     """
 
+    RATE = 100
+
     tank_drive: wpilib.drive.DifferentialDrive
     mecanum_drive: wpilib.drive.MecanumDrive
 
-    octacanum_shifter_front: wpilib.DoubleSolenoid
-    octacanum_shifter_rear: wpilib.DoubleSolenoid
-
-    navx: navx.AHRS
+    octacanum_shifter_front: DedupSolenoid
+    octacanum_shifter_rear: DedupSolenoid
 
     fl_drive_encoder: BaseEncoder
     fr_drive_encoder: BaseEncoder
     rl_drive_encoder: BaseEncoder
     rr_drive_encoder: BaseEncoder
 
+    power: PowerSampler
+    navx: navx.AHRS
+
     def __init__(self):
         # Current drive mode, this changes when a control calls its drive function
         self.drive_mode = will_reset_to(DriveMode.TANK)
@@ -57,6 +88,19 @@ class Drive:
         self.fod = will_reset_to(False)
         self.adjusted = will_reset_to(True)
 
+        # navx angle that field oriented drive treats as forward
+        self.fod_offset = 0
+
+        self.commands = Handoff(STOPPED)
+        # Updates come from the main loop and the scheduler's notifier
+        self.update_lock = threading.Lock()
+
+        # The last values sent to the drive train, for telemetry
+        self.active_mode = DriveMode.TANK
+        self.output_y = 0
+        self.output_x = 0
+        self.output_rotation = 0
+
     def drive_mecanum(self, y, x, z, fod=False, adjusted=True):
         self.rotation = z
         self.y = y
@@ -83,32 +127,70 @@ class Drive:
         Zero the field oriented drive,
 
         makes the current facing direction "forward"
+
+        The navx itself is not zeroed so its angle stays continuous
+        for odometry
         """
-        self.navx.zeroYaw()
+        self.fod_offset = self.navx.getAngle()
 
     def execute(self):
-        if self.adjusted:
-            rot = marsutils.math.signed_square(self.rotation * 0.85)
+        self.commands.put(
+            DriveCommand(
+                self.drive_mode, self.y, self.x, self.rotation, self.fod, self.adjusted
+            )
+        )
+        # Don't wait for the notifier
+        self.update()
+
+    def on_disable(self):
+        # Don't pick up where we left off when re-enabled
+        self.commands.put(STOPPED._replace(mode=self.active_mode))
+
+    def update(self):
+        with self.update_lock:
+            self.write(*self.commands.get())
+
+    def write(self, command: DriveCommand, age: float):
+        if age > COMMAND_TIMEOUT:
+            command = command._replace(y=0, x=0, rotation=0)
+
+        if command.adjusted:
+            rot = ADJUSTED_TURN(command.rotation)
             # cube the inputs because the drive train is incredibly touchy even at small inputs
-            y = math.pow(self.y, 3)
-            x = math.pow(self.x, 3)
+            y = ADJUSTED_MOVE(command.y)
+            x = ADJUSTED_MOVE(command.x)
         else:
-            rot = self.rotation
-            y = self.y
-            x = self.x
+            rot = command.rotation
+            y = command.y
+            x = command.x
+
+        # Scale down the outputs when the battery sags to avoid a brownout
+        scale = self.power.output_scale()
+        if scale != 1.0:
+            y *= scale
+            x *= scale
+            rot *= scale
+
+        mode = command.mode
+        if mode != self.active_mode:
+            self.logger.info("Switched to %s", mode.name)
+        self.active_mode = mode
+        self.output_y = y
+        self.output_x = x
+        self.output_rotation = rot
         # feed the other drive train to appease the motor safety
-        if self.drive_mode == DriveMode.TANK:
+        if mode == DriveMode.TANK:
             self.octacanum_shifter_front.set(wpilib.DoubleSolenoid.Value.kForward)
             self.octacanum_shifter_rear.set(wpilib.DoubleSolenoid.Value.kForward)
             # We cube the inputs above
             self.tank_drive.arcadeDrive(y, rot, squareInputs=False)
             self.mecanum_drive.feed()
-        elif self.drive_mode == DriveMode.MECANUM:
+        elif mode == DriveMode.MECANUM:
             self.octacanum_shifter_front.set(wpilib.DoubleSolenoid.Value.kReverse)
             self.octacanum_shifter_rear.set(wpilib.DoubleSolenoid.Value.kReverse)
-            if self.fod:
+            if command.fod:
                 self.mecanum_drive.driveCartesian(
-                    y, x, rot, gyroAngle=self.navx.getAngle()
+                    y, x, rot, gyroAngle=self.navx.getAngle() - self.fod_offset
                 )
             else:
                 self.mecanum_drive.driveCartesian(y, x, rot)
@@ -1,7 +1,8 @@
 import ctre
 import wpilib
-from common.srx_mag_encoder import AbsoluteMagneticEncoder
-import networktables.entry
+from common.pid import PIDScheduler
+from common.robot_state import RobotState
+from common.dedup import DedupMotor, DedupSolenoid
 from components import Lift
 
 
@@ -15,14 +16,14 @@ class Intake:
         to grab the hatch
     """
 
-    intake_motor: ctre.WPI_TalonSRX
+    intake_motor: DedupMotor
     wrist_motor: ctre.WPI_TalonSRX
     # Front intake
-    intake_grabber_piston: wpilib.DoubleSolenoid
+    intake_grabber_piston: DedupSolenoid
     # Rear intake
     # intake_piston: wpilib.DoubleSolenoid
-    wrist_encoder: AbsoluteMagneticEncoder
-    wrist_pos_dashboard: networktables.entry.NetworkTableEntry
+    robot_state: RobotState
+    pids: PIDScheduler
 
     def setup(self):
         self.speed = 0
@@ -30,15 +31,25 @@ class Intake:
         self.extend = False
         self.grab = False
 
-        self.pid_controller = wpilib.PIDController(
-            0.0256, 0.0, 0.0, self.wrist_encoder, self.wrist_motor
+        self.pid_controller = self.pids.add(
+            "wrist",
+            0.0256,
+            0.0,
+            0.0,
+            self.get_wrist_angle,
+            self.wrist_motor.set,
+            tolerance=0.5,
         )
-        self.pid_controller.setAbsoluteTolerance(0.5)
-        self.pid_controller.setContinuous(False)
-        self.pid_controller.setOutputRange(-1, 1)
-        self.pid_controller.setSetpoint(self.wrist_setpoint)
+        self.pid_controller.set_setpoint(self.wrist_setpoint)
         # 136-215-220 (changed) 281-208-270
-        self.pid_controller.enable()
+        # Enabled once the wrist encoder has a trustworthy reading
+        self.wrist_ready = False
+
+    def get_wrist_angle(self):
+        return self.robot_state.wrist_angle
+
+    def get_wrist_setpoint(self):
+        return self.wrist_setpoint
 
     def set_speed(self, speed):
         self.speed = speed
@@ -70,11 +81,12 @@ class Intake:
         self.grab = not self.grab
 
     def execute(self):
-        # self.wrist_pos_dashboard.setNumber(self.wrist_encoder.get_angle())
-        self.wrist_pos_dashboard.setNumber(self.wrist_setpoint)
         self.intake_motor.set(ctre.ControlMode.PercentOutput, self.speed)
 
-        self.pid_controller.setSetpoint(self.wrist_setpoint)
+        self.pid_controller.set_setpoint(self.wrist_setpoint)
+        if self.robot_state.wrist_ready != self.wrist_ready:
+            self.wrist_ready = self.robot_state.wrist_ready
+            self.pid_controller.set_enabled(self.wrist_ready)
 
         self.intake_grabber_piston.set(
             wpilib.DoubleSolenoid.Value.kForward
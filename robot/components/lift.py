@@ -1,40 +1,151 @@
 from ctre.basemotorcontroller import BaseMotorController
-import wpilib
-from common.encoder import BaseEncoder
+from common.pid import PIDScheduler
+from common.robot_state import RobotState
+from common.power import PowerSampler
+from common.motion_profile import ProfileCache, trapezoidal
 
 
 # Any setpoint is capped at this value
 LIFT_ENCODER_MAX = 1980
 
+# Encoder counts per inch of lift travel
+LIFT_TICKS_PER_INCH = 30
+
+# Preset heights, profiles between these are generated at startup
+LIFT_PRESETS = (200, 380, 420, 575, 1180, LIFT_ENCODER_MAX)
+
+# Motion profile limits, in encoder counts
+LIFT_MAX_VELOCITY = 1500
+LIFT_MAX_ACCELERATION = 3000
+# Profiles are stepped once per loop
+LIFT_PROFILE_PERIOD = 0.02
+
+# PID output range at full battery voltage
+LIFT_OUTPUT_MIN = -0.5
+LIFT_OUTPUT_MAX = 1.0
+
 
 class Lift:
     """
         A position PID enabled lift with preset heights
+
+        Moves follow a trapezoidal motion profile, and the PID tracks the
+        profile's position each loop
     """
 
     lift_motor: BaseMotorController
-    lift_encoder: BaseEncoder
+    robot_state: RobotState
+    power: PowerSampler
+    pids: PIDScheduler
 
     def setup(self):
         self.speed = 0
         self.setpoint = 0
-        self.pid_controller = wpilib.PIDController(
-            0.00255, 0.0, 0.0, self.lift_encoder, self.lift_motor
+        self.output_scale = 1.0
+
+        # The bottom is included since that's where the lift starts
+        self.profiles = ProfileCache(
+            (0,) + LIFT_PRESETS,
+            LIFT_MAX_VELOCITY,
+            LIFT_MAX_ACCELERATION,
+            LIFT_PROFILE_PERIOD,
+        )
+        self.profile = None
+        self.profile_index = 0
+        # Where the profile has the lift this loop, and how fast it's moving
+        self.command = 0
+        self.command_velocity = 0.0
+        # Fraction of top speed to nudge the command by this loop
+        self.nudge_speed = 0.0
+
+        self.pid_controller = self.pids.add(
+            "lift",
+            0.00255,
+            0.0,
+            0.0,
+            self.get_position,
+            self.lift_motor.set,
+            output_range=(LIFT_OUTPUT_MIN, LIFT_OUTPUT_MAX),
+            tolerance=0.5,
         )
-        self.pid_controller.setAbsoluteTolerance(0.5)
-        self.pid_controller.setContinuous(False)
-        self.pid_controller.setOutputRange(-0.5, 1.0)
-        self.pid_controller.setSetpoint(0)
-        self.pid_controller.enable()
+        self.pid_controller.set_setpoint(0)
+        self.pid_controller.set_enabled(True)
 
     def set_speed(self, speed):
         self.speed = speed
 
     def set_setpoint(self, setpoint):
-        self.setpoint = max(0, min(setpoint, LIFT_ENCODER_MAX))
+        setpoint = max(0, min(setpoint, LIFT_ENCODER_MAX))
+        if setpoint == self.setpoint:
+            return
+        self.setpoint = setpoint
+
+        profile = None
+        if self.command_velocity == 0:
+            profile = self.profiles.get(self.command, setpoint)
+        if profile is None:
+            # Not a move between presets, or changing course mid move
+            profile = trapezoidal(
+                self.command,
+                setpoint,
+                LIFT_MAX_VELOCITY,
+                LIFT_MAX_ACCELERATION,
+                LIFT_PROFILE_PERIOD,
+                velocity=self.command_velocity,
+            )
+        self.profile = profile
+        self.profile_index = 0
+
+    def nudge(self, speed):
+        """
+            Move the command directly this loop, ending any profiled move.
+            It speeds up no faster than a profile would, so the lift stops
+            where the command is when the nudges stop
+            :param speed: -1 to 1, a fraction of the lift's top speed
+        """
+        self.nudge_speed = speed
 
     def get_setpoint(self):
-        return self.pid_controller.getSetpoint()
+        return self.setpoint
+
+    def get_command(self):
+        return self.command
+
+    def get_position(self):
+        return self.robot_state.lift_position
 
     def execute(self):
-        self.pid_controller.setSetpoint(self.setpoint)
+        if self.nudge_speed:
+            dv = LIFT_MAX_ACCELERATION * LIFT_PROFILE_PERIOD
+            target = max(-1.0, min(self.nudge_speed, 1.0)) * LIFT_MAX_VELOCITY
+            velocity = max(
+                self.command_velocity - dv, min(target, self.command_velocity + dv)
+            )
+            command = max(
+                0, min(self.command + velocity * LIFT_PROFILE_PERIOD, LIFT_ENCODER_MAX)
+            )
+            self.command_velocity = (command - self.command) / LIFT_PROFILE_PERIOD
+            self.command = command
+            self.setpoint = command
+            self.profile = None
+            self.nudge_speed = 0.0
+        elif self.profile is not None:
+            command = self.profile[self.profile_index]
+            self.command_velocity = (command - self.command) / LIFT_PROFILE_PERIOD
+            self.command = command
+            self.profile_index += 1
+            if self.profile_index == len(self.profile):
+                self.profile = None
+                self.command_velocity = 0.0
+        else:
+            self.command_velocity = 0.0
+
+        self.pid_controller.set_setpoint(self.command)
+
+        # Back off the lift when the battery sags
+        scale = self.power.output_scale()
+        if scale != self.output_scale:
+            self.output_scale = scale
+            self.pid_controller.set_output_range(
+                LIFT_OUTPUT_MIN * scale, LIFT_OUTPUT_MAX * scale
+            )
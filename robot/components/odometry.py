@@ -0,0 +1,186 @@
+import bisect
+import math
+from array import array
+from typing import Optional, Tuple
+
+import navx
+import wpilib
+
+from common.encoder import BaseEncoder
+from components.drive import Drive, DriveMode
+
+# 6 inch wheels, in feet
+WHEEL_CIRCUMFERENCE = 0.5 * math.pi
+# Motor rotations per wheel rotation
+DRIVE_GEAR_RATIO = 10.71
+# Feet travelled per motor rotation, the native spark max encoder unit
+FEET_PER_ROTATION = WHEEL_CIRCUMFERENCE / DRIVE_GEAR_RATIO
+# The drive encoders' units
+INCHES_PER_ROTATION = 12 * FEET_PER_ROTATION
+
+# Odometry runs at 200hz, 4x the main loop
+ODOMETRY_RATE = 200
+# Keep 2 seconds of pose history
+HISTORY_SIZE = 400
+
+Pose = Tuple[float, float, float]
+
+
+class PoseHistory:
+    """
+        A fixed size ring buffer of timestamped poses
+
+        There is a single writer; each slot is filled before the count is
+        published, so readers on other threads see only complete poses
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.times = array("d", [0.0]) * size
+        self.xs = array("d", [0.0]) * size
+        self.ys = array("d", [0.0]) * size
+        self.headings = array("d", [0.0]) * size
+        # Total number of poses ever appended
+        self.count = 0
+
+    def append(self, timestamp: float, x: float, y: float, heading: float):
+        i = self.count % self.size
+        self.times[i] = timestamp
+        self.xs[i] = x
+        self.ys[i] = y
+        self.headings[i] = heading
+        self.count += 1
+
+    def latest(self) -> Optional[Pose]:
+        count = self.count
+        if count == 0:
+            return None
+        i = (count - 1) % self.size
+        return (self.xs[i], self.ys[i], self.headings[i])
+
+    def at(self, timestamp: float) -> Optional[Pose]:
+        """
+            Interpolate the pose at ``timestamp``, clamped to the oldest and
+            newest poses in the history
+        """
+        count = self.count
+        if count == 0:
+            return None
+        n = min(count, self.size)
+        start = count - n
+
+        # Unroll the ring into time order
+        times = [self.times[(start + k) % self.size] for k in range(n)]
+        k = bisect.bisect_left(times, timestamp)
+        if k == 0:
+            return self._pose(start % self.size)
+        if k == n:
+            return self._pose((count - 1) % self.size)
+
+        a = (start + k - 1) % self.size
+        b = (start + k) % self.size
+        span = self.times[b] - self.times[a]
+        t = (timestamp - self.times[a]) / span if span > 0 else 1.0
+        return (
+            self.xs[a] + (self.xs[b] - self.xs[a]) * t,
+            self.ys[a] + (self.ys[b] - self.ys[a]) * t,
+            self.headings[a] + (self.headings[b] - self.headings[a]) * t,
+        )
+
+    def _pose(self, i: int) -> Pose:
+        return (self.xs[i], self.ys[i], self.headings[i])
+
+
+class Odometry:
+    """
+        Tracks the robot's pose from the drive encoders and the navx
+
+        Updated faster than the main loop by the scheduler. Poses are in
+        feet and degrees: x is forward from the starting position, y is to
+        the right and the heading is clockwise, matching the navx.
+    """
+
+    RATE = ODOMETRY_RATE
+
+    drive: Drive
+    navx: navx.AHRS
+
+    fl_drive_encoder: BaseEncoder
+    fr_drive_encoder: BaseEncoder
+    rl_drive_encoder: BaseEncoder
+    rr_drive_encoder: BaseEncoder
+
+    def setup(self):
+        self.history = PoseHistory(HISTORY_SIZE)
+        self.x = 0.0
+        self.y = 0.0
+        self.heading_offset = 0.0
+        self.last_positions = None
+        self.last_heading = None
+        self.reset_requested = False
+
+    def reset(self):
+        """
+            Make the current position the origin and the current heading zero
+        """
+        # Handled on the odometry thread so a pose is never half reset
+        self.reset_requested = True
+
+    def get_pose(self) -> Pose:
+        """
+            :return: the newest (x, y, heading)
+        """
+        return self.history.latest() or (0.0, 0.0, 0.0)
+
+    def pose_at(self, timestamp: float) -> Pose:
+        """
+            :param timestamp: FPGA timestamp, in seconds
+            :return: the (x, y, heading) at ``timestamp``
+        """
+        return self.history.at(timestamp) or (0.0, 0.0, 0.0)
+
+    def update(self):
+        now = wpilib.Timer.getFPGATimestamp()
+        # In inches
+        positions = (
+            self.fl_drive_encoder.get_distance(),
+            self.fr_drive_encoder.get_distance(),
+            self.rl_drive_encoder.get_distance(),
+            self.rr_drive_encoder.get_distance(),
+        )
+        angle = self.navx.getAngle()
+
+        if self.reset_requested:
+            self.reset_requested = False
+            self.x = self.y = 0.0
+            self.heading_offset = -angle
+            self.last_positions = None
+
+        heading = angle + self.heading_offset
+
+        if self.last_positions is not None:
+            fl, fr, rl, rr = (
+                (position - last) / 12
+                for position, last in zip(positions, self.last_positions)
+            )
+            forward = (fl + fr + rl + rr) / 4
+            if self.drive.active_mode == DriveMode.MECANUM:
+                strafe = (fl - fr - rl + rr) / 4
+            else:
+                # The traction wheels are down, there is no strafing
+                strafe = 0.0
+
+            # Rotate into field coordinates using the heading halfway
+            # through the step
+            theta = math.radians((heading + self.last_heading) / 2)
+            cos = math.cos(theta)
+            sin = math.sin(theta)
+            self.x += forward * cos - strafe * sin
+            self.y += forward * sin + strafe * cos
+
+        self.last_positions = positions
+        self.last_heading = heading
+        self.history.append(now, self.x, self.y, heading)
+
+    def execute(self):
+        pass
@@ -1,2 +1,3 @@
 from .align_cargo import AlignCargo
 from .align_tape import AlignTape
+from .trajectory_follower import TrajectoryFollower
@@ -1,10 +1,12 @@
 import wpilib
 import wpilib.interfaces
 
-from networktables.entry import NetworkTableEntry
 from wpilib.shuffleboard import ShuffleboardTab
 
 from components.drive import Drive, DriveMode
+from common.pid import PIDScheduler
+from common.robot_state import RobotState
+from common.vision import VisionClient
 
 #
 # class PID(wpilib.interfaces.PIDSource, wpilib.interfaces.PIDOutput):
@@ -25,50 +27,53 @@ from components.drive import Drive, DriveMode
 
 class AlignCargo:
     drive: Drive
-    cargo_yaw: NetworkTableEntry
-    cargo_detected: NetworkTableEntry
     debug_tab: ShuffleboardTab
+    robot_state: RobotState
+    vision: VisionClient
+    pids: PIDScheduler
 
     def setup(self):
         self.enabled = False
         # self.pid_source = PID(self.cargo_yaw)
-        self.pid = wpilib.PIDController(
+        self.pid = self.pids.add(
             # 0.045, 0.0002, 0.04, 0, self.pid_source, self.pid_source
+            # Tuned as 0.045, 0.0002, 0.04 at 20hz
+            "cargo",
             0.045,
-            0.0002,
-            0.04,
-            0,
+            0.00008,
+            0.1,
             self.get_yaw,
             self.set_output,
+            output_range=(-0.7, 0.7),
+            tolerance=5,
         )
-        self.pid.setAbsoluteTolerance(5)
-        self.pid.setContinuous(False)
-        self.pid.setOutputRange(-0.7, 0.7)
-        self.pid.enable()
+        self.pid.set_enabled(True)
         self.output = 0
         self.on_target = False
 
         self.debug_tab.add(title="Auto Driving PID", value=self.pid)
 
     def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            self.vision.set_tape_mode(False)
         self.enabled = enabled
         # if enabled:
         #     self.on_target = False
 
     def get_yaw(self):
-        return self.cargo_yaw.getNumber(0.0)
+        return self.robot_state.cargo_yaw
 
     def set_output(self, output):
         self.output = output
 
     def execute(self):
         forward = 0.55 if self.on_target else 0
-        self.pid.setEnabled(self.enabled)
+        self.pid.set_enabled(self.enabled)
         self.drive.set_mode(DriveMode.MECANUM)
         # self.drive.drive_mecanum(-self.pid_source.output, forward, 0)
         # yaw = abs(self.pid_source.yaw.getNumber(0))
         self.drive.drive_mecanum(-self.output, forward, 0)
         # yaw = abs(self.e.yaw.getNumber(0))
         # print(self.pid_source.output, self.on_target, yaw)
-        self.on_target = self.cargo_detected.getBoolean(False)
-        print("charge" if self.on_target else "seek")
+        self.on_target = self.robot_state.cargo_detected
+        self.logger.info("charge" if self.on_target else "seek")
@@ -1,10 +1,24 @@
 import wpilib
 import wpilib.interfaces
 
-from networktables.entry import NetworkTableEntry
 from wpilib.shuffleboard import ShuffleboardTab
 
 from components.drive import Drive, DriveMode
+from components.odometry import Odometry
+from common.pid import PIDScheduler
+from common.robot_state import RobotState
+from common.vision import Target, VisionClient
+
+# Time from the camera capturing a frame to its yaw arriving over
+# networktables (camera exposure, processing on the pi/jetson and the network)
+VISION_LATENCY = 0.06
+
+# Yaw the tape should be at when aligned, the camera is off center
+TAPE_YAW_SETPOINT = -4
+
+# The loop runs with the main loop, faster than vision updates arrive, on
+# the yaw corrected by the gyro between them
+PID_PERIOD = 0.02
 
 #
 # class PID(wpilib.interfaces.PIDSource, wpilib.interfaces.PIDOutput):
@@ -24,47 +38,84 @@ from components.drive import Drive, DriveMode
 
 
 class AlignTape:
+    """
+        Strafes to line up with the vision tape
+
+        Each vision measurement is taken at the time the frame was captured,
+        and combined with the heading history from odometry to give a field
+        relative bearing to the tape. The yaw the PID sees is that bearing
+        from the current heading, so turning since the frame was captured,
+        or between vision updates, doesn't count as being off the tape
+    """
+
     drive: Drive
-    tape_yaw: NetworkTableEntry
-    tape_detected: NetworkTableEntry
+    odometry: Odometry
+    vision: VisionClient
     debug_tab: ShuffleboardTab
+    robot_state: RobotState
+    pids: PIDScheduler
 
     def setup(self):
         self.enabled = False
+        self.has_target = False
         # self.pid_source = PID(self.cargo_yaw)
-        self.pid = wpilib.PIDController(
+        self.pid = self.pids.add(
             # 0.045, 0.0002, 0.04, 0, self.pid_source, self.pid_source
+            # Tuned as 0.078, 0.005, 0.04 at 20hz
+            "tape",
             0.078,
-            0.005,
-            0.04,
-            0,
+            0.002,
+            0.1,
             self.get_yaw,
             self.set_output,
+            PID_PERIOD,
+            output_range=(-0.7, 0.7),
+            tolerance=5,
         )
-        self.pid.setAbsoluteTolerance(5)
-        self.pid.setContinuous(False)
-        self.pid.setOutputRange(-0.7, 0.7)
+        self.pid.set_setpoint(TAPE_YAW_SETPOINT)
         # self.pid.enable()
-        self.pid.setSetpoint(-4)
+        # Field relative heading of the tape, in degrees
+        self.bearing = 0.0
         self.output = 0
         self.on_target = False
 
+        self.vision.tape.subscribe(self.on_tape)
+
         self.debug_tab.add(title="Auto Driving Tape PID", value=self.pid)
 
     def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            self.vision.set_tape_mode(True)
         self.enabled = enabled
         # if enabled:
         #     self.on_target = False
 
+    def on_tape(self, target: Target):
+        """
+            Called from the networktables thread with each new measurement
+        """
+        if not target.detected:
+            return
+        captured = target.timestamp - VISION_LATENCY
+        self.bearing = self.odometry.pose_at(captured)[2] + target.yaw
+        self.has_target = True
+
     def get_yaw(self):
-        return self.tape_yaw.getNumber(0.0)
+        """
+            The tape's yaw now, corrected for how far the robot turned since
+            the frame was captured
+        """
+        return self.bearing - self.odometry.get_pose()[2]
 
     def set_output(self, output):
         self.output = output
 
     def execute(self):
         # forward = 0.55 if self.on_target else 0
-        self.pid.setEnabled(self.enabled and self.tape_detected.getBoolean(False))
+        detected = self.robot_state.tape_detected
+        if not detected:
+            self.has_target = False
+        self.pid.set_enabled(self.enabled and self.has_target)
         if self.enabled:
             self.drive.set_mode(DriveMode.MECANUM)
             # self.drive.drive_mecanum(-self.pid_source.output, forward, 0)
@@ -72,5 +123,5 @@ class AlignTape:
             self.drive.drive_mecanum(-self.output, 0, 0)
             # yaw = abs(self.e.yaw.getNumber(0))
             # print(self.pid_source.output, self.on_target, yaw)
-            self.on_target = self.tape_detected.getBoolean(False)
-            print("charge" if self.on_target else "seek")
+            self.on_target = detected
+            self.logger.info("charge" if self.on_target else "seek")
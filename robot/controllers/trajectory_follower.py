@@ -0,0 +1,176 @@
+import math
+from typing import Optional
+
+import wpilib
+
+from components.drive import Drive, DriveMode
+from components.odometry import Odometry
+from common.trajectory import Trajectory
+
+# Drive speeds at full output, as the simulator models them. The feedback
+# below makes up for some error, but measure these on the robot
+MAX_SPEED = 5.0  # feet per second
+TANK_TURN_RATE = 286.0  # degrees per second
+MECANUM_TURN_RATE = 143.0
+
+# Feedback on the error from the trajectory, per second
+POSITION_GAIN = 3.0
+HEADING_GAIN = 5.0
+# Tank only: turn towards the path when off to one side, degrees per foot
+CROSS_TRACK_GAIN = 45.0
+
+# Finished once this close to the end, in feet and degrees
+POSITION_TOLERANCE = 0.25
+HEADING_TOLERANCE = 5.0
+# Give up on getting within tolerance this long after the trajectory ends
+SETTLE_TIMEOUT = 0.75
+
+
+def wrap_degrees(angle: float) -> float:
+    return (angle + 180) % 360 - 180
+
+
+class TrajectoryFollower:
+    """
+        Drives along a pregenerated trajectory, starting from wherever the
+        robot is when ``follow`` is called
+
+        Each loop looks up where the trajectory should be, and drives with
+        its velocity plus feedback on the odometry's error from it. Must run
+        before the drive, so the command applies the same loop.
+    """
+
+    drive: Drive
+    odometry: Odometry
+
+    def setup(self):
+        self.trajectory: Optional[Trajectory] = None
+        self.start_time = 0.0
+        # Pose the trajectory is relative to
+        self.origin = (0.0, 0.0, 0.0)
+        self.finished = False
+        self.cancelled = False
+        # Latest error from the trajectory, in feet and degrees
+        self.position_error = 0.0
+        self.heading_error = 0.0
+
+    def follow(self, trajectory: Trajectory):
+        self.trajectory = trajectory
+        self.start_time = wpilib.Timer.getFPGATimestamp()
+        self.origin = self.odometry.get_pose()
+        self.finished = False
+        self.cancelled = False
+
+    def cancel(self):
+        """
+            Stop following, eg. when the driver takes over
+        """
+        if self.trajectory is not None:
+            self.logger.info("Cancelled %s", self.trajectory.name)
+            self.trajectory = None
+            self.cancelled = True
+
+    def is_following(self) -> bool:
+        return self.trajectory is not None
+
+    def is_done(self) -> bool:
+        return self.finished
+
+    def to_field(self, sample):
+        """
+            Move a trajectory sample to start at the origin pose
+        """
+        ox, oy, oheading = self.origin
+        x, y, heading, vx, vy, omega = sample
+        theta = math.radians(oheading)
+        cos = math.cos(theta)
+        sin = math.sin(theta)
+        return (
+            ox + x * cos - y * sin,
+            oy + x * sin + y * cos,
+            oheading + heading,
+            vx * cos - vy * sin,
+            vx * sin + vy * cos,
+            omega,
+        )
+
+    def on_disable(self):
+        self.trajectory = None
+
+    def execute(self):
+        trajectory = self.trajectory
+        if trajectory is None:
+            return
+
+        elapsed = wpilib.Timer.getFPGATimestamp() - self.start_time
+        x, y, heading, vx, vy, omega = self.to_field(trajectory.sample(elapsed))
+        pose_x, pose_y, pose_heading = self.odometry.get_pose()
+
+        error_x = x - pose_x
+        error_y = y - pose_y
+        error_heading = wrap_degrees(heading - pose_heading)
+        self.position_error = math.hypot(error_x, error_y)
+        self.heading_error = error_heading
+
+        if elapsed >= trajectory.duration and (
+            elapsed >= trajectory.duration + SETTLE_TIMEOUT
+            or (
+                self.position_error < POSITION_TOLERANCE
+                and abs(error_heading) < HEADING_TOLERANCE
+            )
+        ):
+            self.logger.info(
+                "Finished %s, %.2fft and %.1f degrees off",
+                trajectory.name,
+                self.position_error,
+                error_heading,
+            )
+            self.trajectory = None
+            self.finished = True
+            # Stop without shifting, the driver carries on in this mode
+            if trajectory.mode == DriveMode.MECANUM.name:
+                self.drive.drive_mecanum(0, 0, 0, adjusted=False)
+            else:
+                self.drive.drive_tank(0, 0, adjusted=False)
+            return
+
+        # Into the robot's frame
+        theta = math.radians(pose_heading)
+        cos = math.cos(theta)
+        sin = math.sin(theta)
+
+        if trajectory.mode == DriveMode.MECANUM.name:
+            vx += POSITION_GAIN * error_x
+            vy += POSITION_GAIN * error_y
+            forward = vx * cos + vy * sin
+            strafe = -vx * sin + vy * cos
+            turn = omega + HEADING_GAIN * error_heading
+            self.drive.drive_mecanum(
+                clamp(strafe / MAX_SPEED),
+                clamp(forward / MAX_SPEED),
+                clamp(turn / MECANUM_TURN_RATE),
+                adjusted=False,
+            )
+        else:
+            along = error_x * cos + error_y * sin
+            cross = -error_x * sin + error_y * cos
+            # Signed, so tank trajectories can back up
+            path_theta = math.radians(heading)
+            speed = (vx * math.cos(path_theta) + vy * math.sin(path_theta)) * math.cos(
+                math.radians(error_heading)
+            )
+            forward = speed + POSITION_GAIN * along
+            turn = (
+                omega
+                + HEADING_GAIN * error_heading
+                + CROSS_TRACK_GAIN * cross * min(abs(speed), 1.0)
+            )
+            self.drive.drive_tank(
+                clamp(forward / MAX_SPEED),
+                clamp(turn / TANK_TURN_RATE),
+                adjusted=False,
+            )
+
+
+def clamp(value: float) -> float:
+    return min(max(value, -1.0), 1.0)
@@ -4,12 +4,67 @@ import navx
 
 import wpilib.robotbase
 from wpilib.drive.robotdrivebase import RobotDriveBase
-from wpilib.interfaces.generichid import GenericHID
 
 from components.drive import DriveMode, Drive
 from components import Lift, Intake, Climb
-from controllers import AlignCargo, AlignTape
+from components.lift import LIFT_ENCODER_MAX
+from controllers import AlignCargo, AlignTape, TrajectoryFollower
 from common import LEDManager, rumble
+from common.gamepad import Axis, Bindings, Button, Gamepads, POV
+from common.robot_state import RobotState
+from common.input_shaping import (
+    InputShaper,
+    MECANUM_FORWARD,
+    MECANUM_STRAFE,
+    MECANUM_TURN,
+    TANK_FORWARD,
+    TANK_TURN,
+)
+
+# Input profile used while the slow mode button is held
+SLOW_PROFILE = "slow"
+
+# Moving a drive stick past this takes over from an autonomous routine
+OVERRIDE_THRESHOLD = 0.2
+
+DRIVER = 0
+OPERATOR = 1
+
+# Everything Primary reads, tools/controls_table.py puts these in the README
+BINDINGS = Bindings({DRIVER: "Driver 1", OPERATOR: "Driver 2"})
+FORWARD = BINDINGS.add(DRIVER, Axis.LEFT_Y, "Forward/Reverse")
+STRAFE = BINDINGS.add(DRIVER, Axis.LEFT_X, "Strafe (Mecanum)")
+TURN = BINDINGS.add(DRIVER, Axis.RIGHT_X, "Turn")
+TOGGLE_FOD = BINDINGS.add(DRIVER, Button.LEFT_STICK, "Toggle Field Oriented Drive")
+SLOW = BINDINGS.add(DRIVER, Button.A, "Slow Mode")
+AUTO_TAPE = BINDINGS.add(DRIVER, Button.B, "Auto Tape Target")
+CLIMB = BINDINGS.add(DRIVER, Button.X, "Climb Pistons and Leg Wheels")
+ZERO_FOD = BINDINGS.add(DRIVER, Button.Y, "Reset Field Oriented Drive")
+KNEE_DOWN = BINDINGS.add(DRIVER, Axis.LEFT_TRIGGER, "Climb Arm Down")
+KNEE_UP = BINDINGS.add(DRIVER, Axis.RIGHT_TRIGGER, "Climb Arm Up")
+TOGGLE_MODE = BINDINGS.add(DRIVER, Button.LEFT_BUMPER, "Toggle Mecanum")
+COMPRESSOR_OFF = BINDINGS.add(DRIVER, Button.BACK, "Compressor Off")
+COMPRESSOR_ON = BINDINGS.add(DRIVER, Button.START, "Compressor On")
+
+INTAKE = BINDINGS.add(OPERATOR, Axis.LEFT_Y, "Intake wheels")
+WRIST = BINDINGS.add(OPERATOR, Axis.RIGHT_Y, "Wrist Position")
+# Presets follow motion profiles so they can't slam the lift, the first
+# one held wins
+LIFT_PRESETS = (
+    (BINDINGS.add(OPERATOR, Button.Y, "Lift preset (575)"), 575),
+    (BINDINGS.add(OPERATOR, Button.X, "Lift preset (420)"), 420),
+    (BINDINGS.add(OPERATOR, POV.DOWN, "Lift preset Rocket L1 Hatch (200)"), 200),
+    (BINDINGS.add(OPERATOR, POV.LEFT, "Lift preset (380)"), 380),
+    (BINDINGS.add(OPERATOR, POV.UP, "Lift preset (1180)"), 1180),
+    (
+        BINDINGS.add(OPERATOR, POV.RIGHT, "Lift preset MAX (%d)" % LIFT_ENCODER_MAX),
+        LIFT_ENCODER_MAX,
+    ),
+)
+DEFENSE = BINDINGS.add(OPERATOR, Button.A, "Intake Defense Mode")
+LIFT_DOWN = BINDINGS.add(OPERATOR, Axis.LEFT_TRIGGER, "Lift Setpoint Decrease")
+LIFT_UP = BINDINGS.add(OPERATOR, Axis.RIGHT_TRIGGER, "Lift Setpoint Increase")
+TOGGLE_GRAB = BINDINGS.add(OPERATOR, Button.LEFT_BUMPER, "Toggle Hatch Intake")
 
 
 class Primary(marsutils.ControlInterface):
@@ -19,9 +74,11 @@ class Primary(marsutils.ControlInterface):
 
     _DISPLAY_NAME = "Primary"
 
+    # Only for rumble, inputs are read from the snapshot
     gamepad: wpilib.XboxController
-    gamepad2: wpilib.XboxController
+    gamepads: Gamepads
     navx: navx.AHRS
+    robot_state: RobotState
 
     drive: Drive
     lift: Lift
@@ -30,27 +87,32 @@ class Primary(marsutils.ControlInterface):
 
     # cargo_align_ctrl: AlignCargo
     tape_align_ctrl: AlignTape
+    trajectory_follower: TrajectoryFollower
 
     compressor: wpilib.Compressor
 
     led_manager: LEDManager
+    input_shaper: InputShaper
 
     def __init__(self):
         self.drive_mode = DriveMode.TANK
         self.slow = False
         self.angle = 0
         self.fod = False
+        # Whether the trajectory follower was driving last loop
+        self.following = False
         super().__init__()
 
     def teleopPeriodic(self):
-        # TODO: Fix for bug in wpilib (this shouldn't be needed anymore)
-        wpilib.shuffleboard.Shuffleboard.update()
+        # Runs first in the loop, so everything this loop sees the same sensors
+        self.robot_state.refresh()
+        pads = self.gamepads
+        pads.update()
 
         # Drive
-        self.slow = self.gamepad.getAButton()
+        self.slow = pads.held(SLOW)
 
-        # Toggle field-oriented-drive with the right stick button
-        if self.gamepad.getStickButtonPressed(GenericHID.Hand.kLeft):
+        if pads.pressed(TOGGLE_FOD):
             self.fod = not self.fod
 
             if self.fod:
@@ -62,121 +124,105 @@ class Primary(marsutils.ControlInterface):
 
         # self.led_manager.set_fast(self.fast)
 
-        if self.gamepad.getBumperPressed(GenericHID.Hand.kLeft):
+        if pads.pressed(TOGGLE_MODE):
             self.drive_mode = self.drive_mode.toggle()
+            # The other mode's axes start from a stop
+            self.input_shaper.reset()
 
         # enable auto target seeking
-        auto = self.gamepad.getBButton()
+        auto = pads.held(AUTO_TAPE)
         self.tape_align_ctrl.set_enabled(auto)
 
-        if not auto:
-            if self.drive_mode == DriveMode.MECANUM:
-                forward_speed = -self.gamepad.getY(GenericHID.Hand.kLeft)
-
-                if self.slow:
-                    forward_speed *= 0.75
-                # else:
-                #     forward_speed *= 0.9
-
-                strafe_mult = 0.76 if self.slow else 1
-                # turn_mult = 0.65 if self.slow else 0.75
-                # Reduce the turn input even without slow mode because Kevin is *really fast*
-                turn_mult = 0.65 if self.slow else 0.75
-
-                self.drive.drive_mecanum(
-                    self.gamepad.getX(GenericHID.Hand.kLeft) * strafe_mult,
-                    forward_speed,
-                    self.gamepad.getX(GenericHID.Hand.kRight) * turn_mult,
-                    fod=self.fod,
-                )
-            else:
-                if self.slow:
-                    self.drive.drive_tank(
-                        -self.gamepad.getY(GenericHID.Hand.kLeft) * 0.75,
-                        self.gamepad.getX(GenericHID.Hand.kRight) * 0.75,
-                    )
-                else:
-                    self.drive.drive_tank(
-                        -self.gamepad.getY(GenericHID.Hand.kLeft),
-                        self.gamepad.getX(GenericHID.Hand.kRight),
-                    )
-
-        # Lift
-        # Presets are disabled because they are dangerous
-        # pov = self.gamepad2.getPOV()
-        # if pov == 180:  # Down (lowest rocket hatch height)
-        #     self.lift.set_setpoint(200)
-        # elif pov == 270:  # Left
-        #     self.lift.set_setpoint(380.5)
-        # elif pov == 0:  # Up
-        #     self.lift.set_setpoint(1180.5)
-        # elif pov == 90:  # Right
-        #     self.lift.set_setpoint(2028)  # max
-        #
-        # if self.gamepad2.getYButton():
-        #     self.lift.set_setpoint(575)
-        # elif self.gamepad2.getXButton():
-        #     self.lift.set_setpoint(420)
-
-        # manual adjustment of the setpoint with analog triggers
-        setpoint = self.lift.get_setpoint()
-        if self.gamepad2.getTriggerAxis(GenericHID.Hand.kRight) > 0.02:
-            self.lift.set_setpoint(
-                setpoint + (self.gamepad2.getTriggerAxis(GenericHID.Hand.kRight) * 85)
+        # The driver takes over from autonomous by moving a drive stick
+        follower = self.trajectory_follower
+        if follower.is_following() and any(
+            abs(pads.axis(binding)) > OVERRIDE_THRESHOLD
+            for binding in (FORWARD, STRAFE, TURN)
+        ):
+            follower.cancel()
+
+        # Carry on in the mode autonomous left the drive train in
+        following = follower.is_following()
+        if self.following and not following:
+            self.drive_mode = self.drive.active_mode
+        self.following = following
+
+        shaper = self.input_shaper
+        shaper.hold(SLOW_PROFILE if self.slow else None)
+        if auto or following:
+            shaper.reset()
+        elif self.drive_mode == DriveMode.MECANUM:
+            self.drive.drive_mecanum(
+                shaper.shape(MECANUM_STRAFE, pads.axis(STRAFE)),
+                shaper.shape(MECANUM_FORWARD, -pads.axis(FORWARD)),
+                shaper.shape(MECANUM_TURN, pads.axis(TURN)),
+                fod=self.fod,
+                adjusted=False,
             )
-        if self.gamepad2.getTriggerAxis(GenericHID.Hand.kLeft) > 0.02:
-            self.lift.set_setpoint(
-                setpoint - (self.gamepad2.getTriggerAxis(GenericHID.Hand.kLeft) * 85)
+        else:
+            self.drive.drive_tank(
+                shaper.shape(TANK_FORWARD, -pads.axis(FORWARD)),
+                shaper.shape(TANK_TURN, pads.axis(TURN)),
+                adjusted=False,
             )
 
+        # Lift
+        for binding, setpoint in LIFT_PRESETS:
+            if pads.held(binding):
+                self.lift.set_setpoint(setpoint)
+                break
+
+        # manual adjustment with analog triggers, moves the lift at up to
+        # its top speed
+        lift_up = pads.axis(LIFT_UP)
+        lift_down = pads.axis(LIFT_DOWN)
+        nudge = (lift_up if lift_up > 0.02 else 0) - (
+            lift_down if lift_down > 0.02 else 0
+        )
+        if nudge:
+            self.lift.nudge(nudge)
+
         # Intake
-        self.intake.set_speed(-self.gamepad2.getY(GenericHID.Hand.kLeft))
+        self.intake.set_speed(-pads.axis(INTAKE))
 
-        wrist_setpoint_adj = RobotDriveBase.applyDeadband(
-            self.gamepad2.getY(GenericHID.Hand.kRight) * 0.5, 0.15
-        )
+        wrist_setpoint_adj = RobotDriveBase.applyDeadband(pads.axis(WRIST) * 0.5, 0.15)
 
         self.intake.set_wrist_setpoint(
-            self.intake.pid_controller.getSetpoint() - (wrist_setpoint_adj * 15)
+            self.intake.get_wrist_setpoint() - (wrist_setpoint_adj * 15)
         )
 
-        if self.gamepad.getBumperPressed(
-            GenericHID.Hand.kLeft
-        ) or self.gamepad2.getBumperPressed(GenericHID.Hand.kLeft):
+        if pads.pressed(TOGGLE_GRAB):
             self.intake.toggle_grab()
 
         # Misc
-        if self.gamepad.getYButton():
+        if pads.held(ZERO_FOD):
             self.drive.zero_fod()
 
-        if self.gamepad.getBackButton():
+        if pads.held(COMPRESSOR_OFF):
             self.compressor.stop()
 
-        if self.gamepad.getStartButton():
+        if pads.held(COMPRESSOR_ON):
             self.compressor.start()
 
-        if self.gamepad2.getAButton():
+        if pads.held(DEFENSE):
             self.intake.set_defense()
 
         # Climb
-
-        if self.gamepad.getXButton():
+        climb = pads.held(CLIMB)
+        if climb:
             self.climb.extend_piston()
         else:
             self.climb.retract_piston()
 
         leg_speed = -marsutils.math.signed_square(
-            (
-                self.gamepad.getTriggerAxis(GenericHID.Hand.kRight)
-                + -self.gamepad.getTriggerAxis(GenericHID.Hand.kLeft)
-            )
+            pads.axis(KNEE_UP) - pads.axis(KNEE_DOWN)
         )
 
         # The "knee", moves the legs down
         self.climb.set_knee_speed(leg_speed)
 
         # The leg's wheels
-        if self.gamepad.getXButton():
+        if climb:
             self.climb.set_drive_speed(-1)
         else:
             self.climb.set_drive_speed(0)
@@ -1,9 +1,39 @@
 from pyfrc.physics import drivetrains, motion
-import math
 
-ENCODER_REVOLUTION = 1024
-
-ENCODER_TICKS = ENCODER_REVOLUTION / (0.5 * math.pi)
+from components.lift import LIFT_TICKS_PER_INCH
+from components.odometry import FEET_PER_ROTATION
+
+# Simulated battery
+BATTERY_VOLTAGE = 12.5
+BATTERY_RESISTANCE = 0.018  # ohms
+# Current drawn by a motor at full output, in amps
+MOTOR_CURRENT = 40
+
+# Drivetrain, in feet and feet per second at full output
+DRIVE_WHEELBASE = 2
+DRIVE_SPEED = 5
+
+# Lift travel at full output in feet per second, and encoder counts per foot
+LIFT_SPEED = 6
+LIFT_TICKS_PER_FOOT = 12 * LIFT_TICKS_PER_INCH
+
+# Wrist travel at full output, in degrees per second, and where it starts
+WRIST_DEGREES_PER_SECOND = 1000
+WRIST_START_ANGLE = 273
+
+# PDP channel for each motor controller, keyed by hal_data["CAN"] key
+PDP_CHANNELS = {
+    "sparkmax-2": 0,
+    "sparkmax-3": 1,
+    "sparkmax-4": 14,
+    "sparkmax-5": 15,
+    9: 2,
+    8: 3,
+    10: 4,
+    11: 5,
+    "sparkmax-12": 12,
+    "sparkmax-17": 13,
+}
 
 
 class PhysicsEngine:
@@ -13,8 +43,7 @@ class PhysicsEngine:
                                    to communicate simulation effects to
         """
 
-        self.fl_encoder = self.fr_encoder = self.rl_encoder = self.rr_encoder = 0
-        self.wrist_encoder = 0
+        self.wrist_angle = WRIST_START_ANGLE
         self.physics_controller = physics_controller
 
         """
@@ -22,13 +51,15 @@ class PhysicsEngine:
         """
 
         # Create a lift simulation
-        self.lift_motion = motion.LinearMotion("Lift", 6, 360)
+        self.lift_motion = motion.LinearMotion("Lift", LIFT_SPEED, LIFT_TICKS_PER_FOOT)
 
         self.mecaum_drivetrain = drivetrains.MecanumDrivetrain(
-            x_wheelbase=2, y_wheelbase=2, speed=5
+            x_wheelbase=DRIVE_WHEELBASE, y_wheelbase=DRIVE_WHEELBASE, speed=DRIVE_SPEED
         )
 
-        self.tank_drivetrain = drivetrains.FourMotorDrivetrain(x_wheelbase=2, speed=5)
+        self.tank_drivetrain = drivetrains.FourMotorDrivetrain(
+            x_wheelbase=DRIVE_WHEELBASE, speed=DRIVE_SPEED
+        )
 
         self.physics_controller.add_device_gyro_channel("navxmxp_spi_4_angle")
 
@@ -45,51 +76,87 @@ class PhysicsEngine:
         is_tank = not hal_data["solenoid"][1]["value"]
 
         # Simulate the drivetrain
-        # right motors must be inverted
+        # Wheel commands, positive drives the wheel forward. The drive trains
+        # invert the right side motors
         front_l = hal_data["CAN"]["sparkmax-2"]["value"]
         front_r = -hal_data["CAN"]["sparkmax-3"]["value"]
         rear_l = hal_data["CAN"]["sparkmax-4"]["value"]
         rear_r = -hal_data["CAN"]["sparkmax-5"]["value"]
 
-        # TODO: The encoder math is _completely_ wrong
         if is_tank:
+            # FourMotorDrivetrain expects the left side to be negative forward
             speed, rotation = self.tank_drivetrain.get_vector(
-                rear_l, rear_r, front_l, front_r
+                -rear_l, rear_r, -front_l, front_r
             )
             self.physics_controller.drive(speed, rotation, tm_diff)
-            self.fl_encoder += self.tank_drivetrain.l_speed * tm_diff * 10
-            self.fr_encoder += self.tank_drivetrain.r_speed * tm_diff * 10
-            self.rl_encoder += self.tank_drivetrain.l_speed * tm_diff * 10
-            self.rr_encoder += self.tank_drivetrain.r_speed * tm_diff * 10
-
+            fl_speed = rl_speed = self.tank_drivetrain.l_speed
+            fr_speed = rr_speed = self.tank_drivetrain.r_speed
         else:
             x_speed, y_speed, rotation = self.mecaum_drivetrain.get_vector(
                 rear_l, rear_r, front_l, front_r
             )
             self.physics_controller.vector_drive(x_speed, y_speed, rotation, tm_diff)
-            self.fl_encoder += self.mecaum_drivetrain.lf_speed * tm_diff * 1000
-            self.fr_encoder += self.mecaum_drivetrain.rf_speed * tm_diff * 1000
-            self.rl_encoder += self.mecaum_drivetrain.lr_speed * tm_diff * 1000
-            self.rr_encoder += self.mecaum_drivetrain.rr_speed * tm_diff * 1000
-        hal_data["CAN"]["sparkmax-2"]["quad_position"] = int(
-            self.fl_encoder * ENCODER_TICKS
-        )
-        hal_data["CAN"]["sparkmax-4"]["quad_position"] = int(
-            self.fr_encoder * ENCODER_TICKS
-        )
-        hal_data["CAN"]["sparkmax-3"]["quad_position"] = int(
-            self.rl_encoder * ENCODER_TICKS
-        )
-        hal_data["CAN"]["sparkmax-5"]["quad_position"] = int(
-            self.rr_encoder * ENCODER_TICKS
-        )
+            fl_speed = self.mecaum_drivetrain.lf_speed
+            fr_speed = self.mecaum_drivetrain.rf_speed
+            rl_speed = self.mecaum_drivetrain.lr_speed
+            rr_speed = self.mecaum_drivetrain.rr_speed
+
+        # Wheels are only driven while enabled
+        if not self.physics_controller.robot_enabled:
+            fl_speed = fr_speed = rl_speed = rr_speed = 0
+
+        # The spark max encoders count motor rotations, in the direction
+        # the motor spins, so the right side counts backwards
+        self.update_drive_encoder(hal_data, "sparkmax-2", fl_speed, tm_diff)
+        self.update_drive_encoder(hal_data, "sparkmax-3", -fr_speed, tm_diff)
+        self.update_drive_encoder(hal_data, "sparkmax-4", rl_speed, tm_diff)
+        self.update_drive_encoder(hal_data, "sparkmax-5", -rr_speed, tm_diff)
 
         # Simulate the lift encoders
         hal_data["encoder"][0]["count"] = self.lift_motion.compute(
             hal_data["CAN"][8]["value"], tm_diff
         )
+        hal_data["encoder"][0]["distance_per_pulse"] = 1
 
-        # Simulate the wrist encoders
-        self.wrist_encoder += hal_data["CAN"][10]["value"] * tm_diff * 1000
-        hal_data["encoder"][1]["count"] = self.wrist_encoder
-        hal_data["encoder"][1]["distance_per_pulse"] = 1
+        # Simulate the wrist's absolute encoder, which reports its angle as
+        # a pulse width of 1us to 4096us
+        self.wrist_angle += (
+            hal_data["CAN"][10]["value"] * tm_diff * WRIST_DEGREES_PER_SECOND
+        )
+        for counter in hal_data["counter"]:
+            if counter["initialized"] and counter["up_source_channel"] == 2:
+                counter["period"] = 1e-6 + (self.wrist_angle % 360) / 360 * 4095e-6
+
+        self.update_pdp(hal_data)
+
+    def update_drive_encoder(self, hal_data, key, wheel_speed, tm_diff):
+        """
+            Advance a drive spark max's encoder
+            :param wheel_speed: speed the motor is driving its wheel, in ft/s
+        """
+        device = hal_data["CAN"][key]
+        rotations_per_second = wheel_speed / FEET_PER_ROTATION
+        device["position"] = (
+            device.get("position", 0.0) + rotations_per_second * tm_diff
+        )
+        device["velocity"] = rotations_per_second * 60.0
+
+    def update_pdp(self, hal_data):
+        """
+            Simulate PDP currents from the motor outputs, sagging the
+            battery voltage as the total current rises
+        """
+        pdp = hal_data["pdp"].get(0)
+        if pdp is None:
+            return
+
+        currents = [0] * 16
+        for key, channel in PDP_CHANNELS.items():
+            device = hal_data["CAN"].get(key)
+            if device is not None:
+                currents[channel] = abs(device.get("value") or 0) * MOTOR_CURRENT
+
+        total = sum(currents)
+        pdp["current"] = currents
+        pdp["total_current"] = total
+        pdp["voltage"] = BATTERY_VOLTAGE - total * BATTERY_RESISTANCE
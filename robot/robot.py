@@ -1,3 +1,7 @@
+import logging
+import os
+import tempfile
+
 import magicbot
 import wpilib
 import wpilib.drive
@@ -8,25 +12,54 @@ import navx
 from marsutils import with_ctrl_manager, with_setup
 from networktables import NetworkTables
 
-from components import Drive, Lift, Intake, Climb
-from controllers import AlignCargo, AlignTape
+from components import Drive, Lift, Intake, Climb, Odometry
+from components.drive import DriveMode
+from components.odometry import INCHES_PER_ROTATION
+from controllers import AlignCargo, AlignTape, TrajectoryFollower
 from common.encoder import SparkMaxEncoder, CANTalonQuadEncoder, ExternalEncoder
 from common.srx_mag_encoder import AbsoluteMagneticEncoder
-from common import LEDManager, rumble
+from common.robot_state import RobotState
+from common.power import PowerSampler
+from common.dedup import DedupMotor, DedupSolenoid
+from common.boot import BootTimer
+from common.scheduler import Scheduler
+from common.pid import PIDScheduler
+from common.gamepad import AXIS_COUNT, Gamepads
+from common.input_shaping import InputShaper
+from common.vision import VisionClient
+from common.lazy import Lazy
+from common.memory import MemoryManager
+from common.trajectory import TrajectoryLibrary
+from common.event_log import EventLog
+from common.match_recorder import MatchRecorder, prune_logs
+from common import LEDManager, LoopProfiler, TelemetryPublisher, rumble
 from controls import Primary
 
 from wpilib.interfaces.generichid import GenericHID
 
+# Logger names are the component attribute names
+LOG_LEVELS = {
+    "drive": logging.INFO,
+    "odometry": logging.WARNING,
+    "tape_align_ctrl": logging.INFO,
+    "cargo_align_ctrl": logging.INFO,
+}
+# Event logs and match recordings kept of each, the oldest are deleted at boot
+KEEP_LOGS = 30
+
 
 # Order matters
 @with_setup
 @with_ctrl_manager
 class Kevin(magicbot.MagicRobot):
     # Magic components
+    # Before the drive, so its commands apply the same loop
+    trajectory_follower: TrajectoryFollower
     drive: Drive
     lift: Lift
     intake: Intake
     climb: Climb
+    odometry: Odometry
 
     # Control modes
     primary: Primary
@@ -41,145 +74,440 @@ class Kevin(magicbot.MagicRobot):
     def createObjects(self):
         """Create magicbot components"""
 
-        # Allow player control in sandstorm (2019 specific)
-        self.use_teleop_in_autonomous = True
-
-        # Inputs
-        self.gamepad = wpilib.XboxController(0)
-        self.gamepad2 = wpilib.XboxController(1)
-
-        # Dashboard tabs
-        self.prefs = Shuffleboard.getTab("Preferences")
-        self.drive_tab = Shuffleboard.getTab("Drive")
-        self.debug_tab = Shuffleboard.getTab("Debugging")
-
-        # pi/jetson vision data
-        self.vision = NetworkTables.getTable("Vision")
-        self.cargo_yaw = self.vision.getEntry("cargoYaw")
-        self.tape_yaw = self.vision.getEntry("tapeYaw")
-        self.cargo_detected = self.vision.getEntry("cargoDetected")
-        self.tape_detected = self.vision.getEntry("tapeDetected")
-        self.tape_mode = self.vision.getEntry("tape")
-
-        # Drive motors
-        self.fl_drive = rev.CANSparkMax(2, rev.MotorType.kBrushless)
-        self.fr_drive = rev.CANSparkMax(3, rev.MotorType.kBrushless)
-        self.rl_drive = rev.CANSparkMax(4, rev.MotorType.kBrushless)
-        self.rr_drive = rev.CANSparkMax(5, rev.MotorType.kBrushless)
-
-        self.fl_drive_encoder = SparkMaxEncoder(self.fl_drive)
-        self.fr_drive_encoder = SparkMaxEncoder(self.fr_drive)
-        self.rl_drive_encoder = SparkMaxEncoder(self.rl_drive)
-        self.rr_drive_encoder = SparkMaxEncoder(self.rr_drive)
-
-        # Make the drive a little less jumpy
-        self.fl_drive.setOpenLoopRampRate(0.35)
-        self.fr_drive.setOpenLoopRampRate(0.35)
-        self.rl_drive.setOpenLoopRampRate(0.35)
-        self.rr_drive.setOpenLoopRampRate(0.35)
-
-        # Wheel groups for tank mode
-        self.left_drive = wpilib.SpeedControllerGroup(self.fl_drive, self.rl_drive)
-        self.right_drive = wpilib.SpeedControllerGroup(self.fr_drive, self.rr_drive)
-
-        # Drive trains
-        self.mecanum_drive = wpilib.drive.MecanumDrive(
-            self.fl_drive, self.rl_drive, self.fr_drive, self.rr_drive
-        )
-        self.tank_drive = wpilib.drive.DifferentialDrive(
-            self.left_drive, self.right_drive
-        )
-        # They can't tell the other is in control, so we just turn off the software safety
-        self.mecanum_drive.setSafetyEnabled(False)
-        self.tank_drive.setSafetyEnabled(False)
-
-        # Lift
-
-        # Comp
-        self.lift_motor = ctre.WPI_TalonSRX(9)
-        self.lift_follower = ctre.WPI_TalonSRX(8)
-        self.lift_follower.set(ctre.ControlMode.Follower, 9)
-
-        self.lift_motor.setInverted(True)
-        self.lift_follower.setInverted(True)
-        self.lift_encoder = ExternalEncoder(0, 1, reversed=False)
-
-        # Intake
-        self.wrist_motor = ctre.WPI_TalonSRX(10)
-        self.wrist_motor.setInverted(True)
-        self.intake_motor = ctre.WPI_TalonSRX(11)
-        # NOTE: Practice Bot (is this comment still relevant?)
-        self.wrist_encoder = AbsoluteMagneticEncoder(2)
-
-        # Intake grabber pistons
-        self.intake_grabber_piston = wpilib.DoubleSolenoid(4, 5)
-
-        # Pneumatics
-        self.compressor = wpilib.Compressor()
-        self.octacanum_shifter_front = wpilib.DoubleSolenoid(0, 1)
-        self.octacanum_shifter_rear = wpilib.DoubleSolenoid(2, 3)
-        # Default state is extended (mecanum)
-        self.octacanum_shifter_front.set(wpilib.DoubleSolenoid.Value.kForward)
-        self.octacanum_shifter_rear.set(wpilib.DoubleSolenoid.Value.kForward)
-
-        # Climbing
-        self.climb_piston = wpilib.DoubleSolenoid(6, 7)
-        self.climb_piston.set(wpilib.DoubleSolenoid.Value.kForward)
-
-        self.leg1 = rev.CANSparkMax(12, rev.MotorType.kBrushed)
-        # self.leg2 = rev.CANSparkMax(13, rev.MotorType.kBrushed)
-        # self.leg1 = ctre.WPI_TalonSRX(12)
-        # self.leg2 = ctre.WPI_TalonSRX(13)
-
-        # self.leg_drive = ctre.WPI_TalonSRX(17)
-        self.leg_drive = rev.CANSparkMax(17, rev.MotorType.kBrushed)
-
-        # Misc components
-        self.navx = navx.AHRS.create_spi()
-
-        # PDP for monitoring power usage
-        # WARN: Causes drive to stutter
-        # self.pdp = wpilib.PowerDistributionPanel(0)
-        # self.pdp.clearStickyFaults()
-        # self.debug_tab.add(title="PDP", value=self.pdp)
-
-        # WARN: Causes drive to stutter
-        # self.debug_tab.add(self.mecanum_drive)
-        # self.debug_tab.add(self.tank_drive)
+        # Time every step of startup, slow steps that nothing else depends on
+        # run in the background. See the report at the end of setup
+        self.boot = BootTimer()
+        boot = self.boot
+
+        with boot.step("logging"):
+            # Logging never blocks the loop, it is written out from its own thread
+            if self.isReal():
+                log_dir = "/home/lvuser/logs"
+            else:
+                log_dir = os.path.join(tempfile.gettempdir(), "robot-logs")
+            self.event_log = EventLog.install(log_dir, LOG_LEVELS)
 
-        encoders_list = self.debug_tab.getLayout("List", "Drive Encoders")
-        encoders_list.add(title="Front Left", value=self.fl_drive_encoder)
-        encoders_list.add(title="Front Right", value=self.fr_drive_encoder)
-        encoders_list.add(title="Rear Left", value=self.rl_drive_encoder)
-        encoders_list.add(title="Rear Right", value=self.rr_drive_encoder)
-        self.debug_tab.add(title="Lift Encoder", value=self.lift_encoder)
+            # Every enabled loop is recorded for analysis after the match
+            self.recorder = MatchRecorder(log_dir)
 
-        self.wrist_pos_dashboard = self.debug_tab.add(
-            value=0, title="Wrist Pos"
-        ).getEntry()
+            # The roboRIO's disk is small, only keep the latest logs
+            for suffix in (".jsonl", ".mrec"):
+                boot.background(
+                    "prune " + suffix, prune_logs, log_dir, suffix, KEEP_LOGS
+                )
 
         # Launch camera server
         # Disabled: Vision sent through Jetson/Pi
-        wpilib.CameraServer.launch()
+        boot.background("camera server", wpilib.CameraServer.launch)
 
-        # Connect to ardunio controlled leds
+        # Connect to ardunio controlled leds, the port is opened by the
+        # manager's writer thread
         self.led_manager = LEDManager()
 
+        # The navx is only needed by the robot state, at the end
+        navx_ready = boot.background("navx", navx.AHRS.create_spi)
+
+        with boot.step("inputs"):
+            # Allow player control in sandstorm (2019 specific)
+            self.use_teleop_in_autonomous = True
+
+            # Pregenerated autonomous trajectories, see
+            # tools/generate_trajectories.py. Mapped in the background
+            self.trajectories = TrajectoryLibrary(
+                os.path.join(os.path.dirname(__file__), "trajectories.bin")
+            )
+            boot.background("trajectories", self.trajectories.load)
+
+            # Inputs, read once per loop by the controls
+            self.gamepads = Gamepads((0, 1))
+            # Only used to rumble the driver's gamepad
+            self.gamepad = wpilib.XboxController(0)
+
+            # Response curves for the driver's sticks, switchable from the
+            # dashboard
+            self.input_shaper = InputShaper.load(
+                os.path.join(os.path.dirname(__file__), "input_profiles.json"),
+                self.control_loop_wait_time,
+            )
+
+            # Per-component loop timing
+            self.profiler = LoopProfiler()
+
+            # Garbage collection between loops while enabled
+            self.memory = MemoryManager()
+
+            # Every PID loop, run after the components each loop
+            self.pids = PIDScheduler(self.control_loop_wait_time)
+
+            # Dashboard values are published at 10hz off the main loop
+            self.telemetry = TelemetryPublisher(period=0.1)
+
+        with boot.step("dashboard"):
+            # Dashboard tabs
+            self.prefs = Shuffleboard.getTab("Preferences")
+            self.drive_tab = Shuffleboard.getTab("Drive")
+            self.debug_tab = Shuffleboard.getTab("Debugging")
+
+            # pi/jetson vision data, received as it arrives
+            self.vision = VisionClient(NetworkTables.getTable("Vision"))
+
+        with boot.step("drive"):
+            # Drive motors
+            self.fl_drive = rev.CANSparkMax(2, rev.MotorType.kBrushless)
+            self.fr_drive = rev.CANSparkMax(3, rev.MotorType.kBrushless)
+            self.rl_drive = rev.CANSparkMax(4, rev.MotorType.kBrushless)
+            self.rr_drive = rev.CANSparkMax(5, rev.MotorType.kBrushless)
+
+            # The right side motors are inverted by the drive trains
+            for wheel, inverted in (
+                ("fl", False),
+                ("fr", True),
+                ("rl", False),
+                ("rr", True),
+            ):
+                encoder = SparkMaxEncoder(getattr(self, wheel + "_drive"), inverted)
+                # Wheel travel in inches
+                encoder.set_units(INCHES_PER_ROTATION)
+                setattr(self, wheel + "_drive_encoder", encoder)
+
+            # Make the drive a little less jumpy
+            # Each call waits on the CAN bus for the controller to reply
+            for wheel in ("fl", "fr", "rl", "rr"):
+                boot.background(
+                    wheel + " ramp rate",
+                    getattr(self, wheel + "_drive").setOpenLoopRampRate,
+                    0.35,
+                )
+
+            # Wheel groups for tank mode
+            self.left_drive = wpilib.SpeedControllerGroup(self.fl_drive, self.rl_drive)
+            self.right_drive = wpilib.SpeedControllerGroup(self.fr_drive, self.rr_drive)
+
+            # Drive trains
+            self.mecanum_drive = wpilib.drive.MecanumDrive(
+                self.fl_drive, self.rl_drive, self.fr_drive, self.rr_drive
+            )
+            self.tank_drive = wpilib.drive.DifferentialDrive(
+                self.left_drive, self.right_drive
+            )
+            # They can't tell the other is in control, so we just turn off the software safety
+            self.mecanum_drive.setSafetyEnabled(False)
+            self.tank_drive.setSafetyEnabled(False)
+
+        with boot.step("lift"):
+            # Comp
+            self.lift_motor = ctre.WPI_TalonSRX(9)
+            self.lift_follower = ctre.WPI_TalonSRX(8)
+            self.lift_follower.set(ctre.ControlMode.Follower, 9)
+
+            self.lift_motor.setInverted(True)
+            self.lift_follower.setInverted(True)
+            # Left in counts, the lift's presets and profiles are in counts
+            self.lift_encoder = ExternalEncoder(0, 1, reversed=False)
+
+        with boot.step("intake"):
+            self.wrist_motor = ctre.WPI_TalonSRX(10)
+            self.wrist_motor.setInverted(True)
+            self.intake_motor = DedupMotor(ctre.WPI_TalonSRX(11))
+            # NOTE: Practice Bot (is this comment still relevant?)
+            # Settles in the background, the intake waits until it is ready
+            self.wrist_encoder = AbsoluteMagneticEncoder(2)
+
+            # Intake grabber pistons
+            self.intake_grabber_piston = DedupSolenoid(wpilib.DoubleSolenoid(4, 5))
+
+        with boot.step("pneumatics"):
+            self.compressor = wpilib.Compressor()
+            # Solenoids and slow-changing motors are wrapped so that components
+            # can set them every loop without flooding the PCM and CAN bus
+            self.octacanum_shifter_front = DedupSolenoid(wpilib.DoubleSolenoid(0, 1))
+            self.octacanum_shifter_rear = DedupSolenoid(wpilib.DoubleSolenoid(2, 3))
+            # Default state is extended (mecanum)
+            self.octacanum_shifter_front.set(wpilib.DoubleSolenoid.Value.kForward)
+            self.octacanum_shifter_rear.set(wpilib.DoubleSolenoid.Value.kForward)
+
+        with boot.step("climb"):
+            self.climb_piston = DedupSolenoid(wpilib.DoubleSolenoid(6, 7))
+            self.climb_piston.set(wpilib.DoubleSolenoid.Value.kForward)
+
+            # The legs are only used at the end of the match, so they are
+            # built on a boot thread rather than holding up startup
+            self.leg1 = DedupMotor(
+                Lazy(rev.CANSparkMax, 12, rev.MotorType.kBrushed), initial=0
+            )
+            # self.leg2 = rev.CANSparkMax(13, rev.MotorType.kBrushed)
+            # self.leg1 = ctre.WPI_TalonSRX(12)
+            # self.leg2 = ctre.WPI_TalonSRX(13)
+
+            # self.leg_drive = ctre.WPI_TalonSRX(17)
+            self.leg_drive = DedupMotor(
+                Lazy(rev.CANSparkMax, 17, rev.MotorType.kBrushed), initial=0
+            )
+            for name in ("leg1", "leg_drive"):
+                boot.background(name, getattr(self, name).motor.get)
+
+        with boot.step("robot state"):
+            # Misc components
+            self.navx = navx_ready.result()
+
+            # Sensor snapshot, read once per loop by every component
+            self.robot_state = RobotState(
+                self.fl_drive_encoder,
+                self.fr_drive_encoder,
+                self.rl_drive_encoder,
+                self.rr_drive_encoder,
+                self.navx,
+                self.lift_encoder,
+                self.wrist_encoder,
+                self.vision,
+            )
+
+        with boot.step("power"):
+            # PDP for monitoring power usage
+            # The PDP is only read from the power sampler's notifier, adding the
+            # PDP sendable to the dashboard reads it from the main loop and
+            # causes the drive to stutter
+            self.pdp = wpilib.PowerDistributionPanel(0)
+            self.pdp.clearStickyFaults()
+            self.power = PowerSampler(self.pdp)
+            self.power.start()
+
+        # WARN: Causes drive to stutter, drive outputs are published by
+        # self.telemetry in setup instead
+        # self.debug_tab.add(self.mecanum_drive)
+        # self.debug_tab.add(self.tank_drive)
+
+        with boot.step("debug tab"):
+            state = self.robot_state
+            encoders_list = self.debug_tab.getLayout("List", "Drive Encoders")
+            encoders_list.add(title="Front Left", value=state.encoder_view("fl"))
+            encoders_list.add(title="Front Right", value=state.encoder_view("fr"))
+            encoders_list.add(title="Rear Left", value=state.encoder_view("rl"))
+            encoders_list.add(title="Rear Right", value=state.encoder_view("rr"))
+            self.debug_tab.add(title="Lift Encoder", value=state.encoder_view("lift"))
+
+            self.wrist_pos_dashboard = self.debug_tab.add(
+                value=0, title="Wrist Pos"
+            ).getEntry()
+
         if self.isReal():
             wpilib.Notifier(lambda: self.led_manager.alliance_fader()).startSingle(2)
 
     def setup(self):
+        # Injection and every component's setup
+        self.boot.lap("components")
+
         self.drive_tab.add(self._control_manager.control_chooser, title="Control_Mode")
         self._control_manager.setup_listener("Shuffleboard/Drive/Control_Mode")
 
+        self.profile_chooser = wpilib.SendableChooser()
+        for name in self.input_shaper.names():
+            if name == self.input_shaper.selected.name:
+                self.profile_chooser.setDefaultOption(name, name)
+            else:
+                self.profile_chooser.addOption(name, name)
+        self.drive_tab.add(self.profile_chooser, title="Input_Profile")
+        NetworkTables.getTable("Shuffleboard/Drive/Input_Profile").addEntryListener(
+            self.input_profile_changed, True
+        )
+
+        # Time every component so a stuttering loop can be traced to its source
+        for name in (
+            "trajectory_follower",
+            "drive",
+            "lift",
+            "intake",
+            "climb",
+            "tape_align_ctrl",
+        ):
+            self.profiler.instrument(name, getattr(self, name))
+        self.profiler.instrument("primary", self.primary, "teleopPeriodic")
+        self.profiler.instrument("pids", self.pids, "update")
+        self.profiler.instrument("gc", self.memory, "end_loop")
+
+        # Run the drive and odometry faster than the main loop, and any
+        # component with a slower rate less often
+        self.scheduler = Scheduler(self.control_loop_wait_time)
+        for name, component in self._components:
+            self.scheduler.add(name, component)
+        self.scheduler.start()
+
+        # Everything published here must be a cached value, never a hardware read
+        drive_list = self.debug_tab.getLayout("List", "Drive Output")
+        self.telemetry.add(
+            drive_list.add(title="Mode", value="").getEntry(),
+            lambda: self.drive.active_mode.name,
+        )
+        self.telemetry.add(
+            drive_list.add(title="Y", value=0).getEntry(),
+            lambda: self.drive.output_y,
+            deadband=0.01,
+        )
+        self.telemetry.add(
+            drive_list.add(title="X", value=0).getEntry(),
+            lambda: self.drive.output_x,
+            deadband=0.01,
+        )
+        self.telemetry.add(
+            drive_list.add(title="Rotation", value=0).getEntry(),
+            lambda: self.drive.output_rotation,
+            deadband=0.01,
+        )
+        self.telemetry.add(
+            self.wrist_pos_dashboard, lambda: self.intake.wrist_setpoint, deadband=0.5
+        )
+        power_list = self.debug_tab.getLayout("List", "Power")
+        self.telemetry.add(
+            power_list.add(title="Voltage", value=0).getEntry(),
+            self.power.voltage,
+            deadband=0.05,
+        )
+        self.telemetry.add(
+            power_list.add(title="Total Current", value=0).getEntry(),
+            self.power.total_current,
+            deadband=0.5,
+        )
+        self.telemetry.add(
+            power_list.add(title="Output Scale", value=1).getEntry(),
+            self.power.output_scale,
+            deadband=0.01,
+        )
+        pid_list = self.debug_tab.getLayout("List", "PID")
+        for loop in self.pids.loops:
+            for value in ("setpoint", "error", "output"):
+                self.telemetry.add(
+                    pid_list.add(
+                        title=loop.getName() + " " + value, value=0
+                    ).getEntry(),
+                    lambda loop=loop, value=value: getattr(loop, value),
+                    deadband=0.01,
+                )
+        memory_list = self.debug_tab.getLayout("List", "Memory")
+        self.telemetry.add(
+            memory_list.add(title="Objects per Loop", value=0).getEntry(),
+            lambda: self.memory.allocations.summary()[1],
+            deadband=1,
+        )
+        self.telemetry.add(
+            memory_list.add(title="Collections", value=0).getEntry(),
+            lambda: self.memory.collections,
+        )
+        self.telemetry.add(
+            memory_list.add(title="Longest Collection", value=0).getEntry(),
+            lambda: self.memory.max_pause * 1000,
+            deadband=0.01,
+        )
+        writes_list = self.debug_tab.getLayout("List", "Writes Saved")
+        for name in (
+            "octacanum_shifter_front",
+            "octacanum_shifter_rear",
+            "climb_piston",
+            "intake_grabber_piston",
+            "intake_motor",
+            "leg1",
+            "leg_drive",
+        ):
+            device = getattr(self, name)
+            self.telemetry.add(
+                writes_list.add(title=name, value=0).getEntry(),
+                lambda device=device: device.saved,
+            )
+        self.telemetry.start()
+
+        self.boot.lap("telemetry")
+        with self.boot.step("recorder"):
+            self.setup_recorder()
+
+        self.boot.finish(self.logger)
+
+        # Everything from here on is long lived, keep it out of collections
+        self.memory.freeze()
+
+    def input_profile_changed(self, *args):
+        name = self.profile_chooser.getSelected()
+        if name is not None:
+            self.input_shaper.select(name)
+            self.logger.info("Input profile %s", name)
+
+    def setup_recorder(self):
+        recorder = self.recorder
+        state = self.robot_state
+
+        recorder.add("time", "d", lambda: state.timestamp)
+        # What the controls saw this loop
+        for port, pad in self.gamepads.pads.items():
+            prefix = "gamepad%d_" % port
+            for axis in range(AXIS_COUNT):
+                recorder.add(
+                    prefix + "axis%d" % axis,
+                    "f",
+                    lambda axes=pad.axes, axis=axis: axes[axis],
+                )
+            recorder.add(prefix + "buttons", "H", lambda pad=pad: pad.buttons)
+            recorder.add(prefix + "pov", "h", lambda pad=pad: pad.pov)
+
+        recorder.add(
+            "drive_mode",
+            "B",
+            lambda: self.drive.active_mode.value,
+            labels={mode.value: mode.name for mode in DriveMode},
+        )
+        recorder.add("drive_y", "f", lambda: self.drive.output_y)
+        recorder.add("drive_x", "f", lambda: self.drive.output_x)
+        recorder.add("drive_rotation", "f", lambda: self.drive.output_rotation)
+        for wheel in ("fl", "fr", "rl", "rr"):
+            recorder.add(
+                wheel + "_position",
+                "f",
+                lambda attr=wheel + "_position": getattr(state, attr),
+            )
+        recorder.add("navx_angle", "f", lambda: state.navx_angle)
+
+        recorder.add("lift_setpoint", "f", self.lift.get_setpoint)
+        recorder.add("lift_command", "f", self.lift.get_command)
+        recorder.add("lift_position", "f", lambda: state.lift_position)
+        recorder.add("wrist_setpoint", "f", self.intake.get_wrist_setpoint)
+        recorder.add("wrist_angle", "f", lambda: state.wrist_angle)
+
+        recorder.add("tape_yaw", "f", lambda: state.tape_yaw)
+        recorder.add("tape_detected", "?", lambda: state.tape_detected)
+        recorder.add("tape_age", "f", lambda: state.tape_age)
+        recorder.add("cargo_yaw", "f", lambda: state.cargo_yaw)
+        recorder.add("cargo_detected", "?", lambda: state.cargo_detected)
+        recorder.add("cargo_age", "f", lambda: state.cargo_age)
+
+        recorder.start()
+
+    def disabledPeriodic(self):
+        # Keep the dashboard current while disabled
+        self.robot_state.refresh()
+
+    def robotPeriodic(self):
+        super().robotPeriodic()
+        if self.isEnabled():
+            # After the components have set their setpoints
+            self.pids.update()
+            self.recorder.record()
+        # The next loop takes a new snapshot
+        self.robot_state.expire()
+        self.memory.end_loop()
+        self.profiler.end_loop()
+
+    def _loop_overrun(self):
+        self.profiler.overrun()
+
     def autonomous(self):
         """Prepare for autonomous mode"""
 
+        self.memory.enable()
+
         # This forwards input to teleopPerodic during the sandstorm
         magicbot.MagicRobot.autonomous(self)
 
-    # Make the primary controller rumble briefly
     def teleopInit(self):
+        self.memory.enable()
+
+        # Make the primary controller rumble briefly
         rumble.rumble(
             self.gamepad,
             duration=0.75,
@@ -193,6 +521,15 @@ class Kevin(magicbot.MagicRobot):
         )
         self.led_manager.alliance_fader()
 
+        # Get the end of the match onto the disk
+        self.recorder.flush()
+
+        # Don't carry integral or derivative error over to the next enable
+        self.pids.reset()
+
+        # Catch up on collections while nothing is moving
+        self.memory.disable()
+
 
 if __name__ == "__main__":
     # Run robot
@@ -0,0 +1,27 @@
+"""
+    Checks that tape alignment compensates for vision latency
+"""
+
+import wpilib
+
+from common.vision import Target
+from controllers.align_tape import TAPE_YAW_SETPOINT, VISION_LATENCY
+
+
+def test_latency_compensation(robot):
+    robot.robotInit()
+    odometry = robot.odometry
+    align = robot.tape_align_ctrl
+
+    # The robot turned 20 degrees since the frame was captured
+    now = wpilib.Timer.getFPGATimestamp()
+    odometry.history.append(now - VISION_LATENCY, 0, 0, 10)
+    odometry.history.append(now, 0, 0, 30)
+
+    align.on_tape(Target(now, 5, True))
+
+    # The yaw was measured from the heading when the frame was captured,
+    # the robot has turned 20 degrees to the right since
+    assert align.get_yaw() == 5 - 20
+    assert align.pid.get_setpoint() == TAPE_YAW_SETPOINT
+    assert align.has_target
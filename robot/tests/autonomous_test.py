@@ -0,0 +1,111 @@
+"""
+    Runs each autonomous routine against the simulator, and checks that the
+    trajectory file is current
+"""
+
+import importlib.util
+import math
+import os
+
+from networktables.util import ChooserControl
+
+from common.trajectory import TrajectoryLibrary
+from components.drive import DriveMode
+from helpers import ground_truth, run_with_physics
+
+
+def load_generator(robot_path):
+    path = os.path.join(robot_path, "..", "tools", "generate_trajectories.py")
+    spec = importlib.util.spec_from_file_location("generate_trajectories", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_routine(control, fake_time, robot_path, mode_name, on_step=None):
+    control.set_autonomous(enabled=True)
+    chooser = ChooserControl("Autonomous Mode")
+
+    def step(tm):
+        if tm < 0.5:
+            chooser.setSelected(mode_name)
+        elif on_step is not None:
+            on_step(tm)
+        return tm < 10
+
+    return run_with_physics(control, fake_time, robot_path, step)
+
+
+def assert_at(physics, x, y, heading):
+    true_x, true_y, true_heading = ground_truth(physics)
+    assert math.hypot(true_x - x, true_y - y) < 0.5
+    assert abs(true_heading - heading) < 5
+
+
+def test_trajectories_current(robot_path):
+    generator = load_generator(robot_path)
+    library = TrajectoryLibrary(os.path.join(robot_path, "trajectories.bin"))
+
+    assert library.names() == sorted(generator.PATHS)
+    for name, (mode, waypoints, _, _) in generator.PATHS.items():
+        trajectory = library.get(name)
+        assert trajectory.mode == mode
+        # Starts and ends on its waypoints, at rest
+        assert trajectory.sample(0)[:3] == (0, 0, 0)
+        x, y, heading, vx, vy, omega = trajectory.end()
+        end_x, end_y, end_heading = waypoints[-1]
+        assert abs(x - end_x) < 0.01 and abs(y - end_y) < 0.01
+        assert abs(heading - end_heading) < 0.01
+        assert vx == vy == omega == 0
+
+
+def test_drive_off_hab(control, fake_time, robot, robot_path):
+    physics = run_routine(control, fake_time, robot_path, "Drive Off Hab")
+
+    assert robot.trajectory_follower.is_done()
+    assert_at(physics, 10, 2.5, 45)
+
+
+def test_front_cargo_hatch(control, fake_time, robot, robot_path):
+    physics = run_routine(control, fake_time, robot_path, "Front Cargo Hatch")
+
+    assert robot.trajectory_follower.is_done()
+    # Placed the hatch on the ship, then backed off 2ft
+    assert not robot.intake.grab
+    assert robot.lift.get_setpoint() == 200
+    assert_at(physics, 8.5, 1.75, 0)
+    # Still in mecanum for the driver
+    assert robot.drive.active_mode == DriveMode.MECANUM
+    assert robot.primary.drive_mode == DriveMode.MECANUM
+
+
+def test_driver_override(control, fake_time, robot, robot_path, hal_data):
+    def on_step(tm):
+        # Reverse, partway off the hab
+        if tm > 2:
+            hal_data["joysticks"][0]["axes"][1] = 0.6
+
+    physics = run_routine(control, fake_time, robot_path, "Drive Off Hab", on_step)
+
+    follower = robot.trajectory_follower
+    assert follower.cancelled and not follower.is_following()
+    # The driver kept control, backing up from where the routine was
+    true_x, _, _ = ground_truth(physics)
+    assert true_x < 0
+
+
+def test_mecanum_override(control, fake_time, robot, robot_path, hal_data):
+    modes = []
+
+    def on_step(tm):
+        # Strafe away on the way to the ship
+        if tm > 2:
+            hal_data["joysticks"][0]["axes"][0] = 0.6
+            modes.append(robot.drive.active_mode)
+
+    run_routine(control, fake_time, robot_path, "Front Cargo Hatch", on_step)
+
+    assert robot.trajectory_follower.cancelled
+    # Taking over didn't shift into tank
+    assert robot.primary.drive_mode == DriveMode.MECANUM
+    assert set(modes) == {DriveMode.MECANUM}
@@ -0,0 +1,61 @@
+"""
+    Checks the boot timing report, that the climb motors are built off
+    the main loop and that they stop with the controls
+"""
+
+import threading
+
+import rev
+
+
+def test_boot_report(robot):
+    robot.robotInit()
+    for future in robot.boot.futures:
+        future.result()
+    steps = {name: background for name, _, background in robot.boot.summary()}
+
+    for name in ("logging", "drive", "lift", "intake", "components", "recorder"):
+        assert steps[name] is False
+    for name in ("navx", "camera server"):
+        assert steps[name] is True
+    assert robot.boot.total > 0
+    assert robot.navx is not None
+
+
+def test_climb_built_at_boot(control, robot, hal_data, monkeypatch):
+    # Thread each spark max was built on, by CAN id
+    threads = {}
+    spark_max = rev.CANSparkMax
+
+    def build(can_id, *args):
+        threads[can_id] = threading.current_thread().name
+        return spark_max(can_id, *args)
+
+    monkeypatch.setattr(rev, "CANSparkMax", build)
+    control.set_operator_control(enabled=True)
+
+    def on_step(tm):
+        # Lower the legs with the driver's right trigger
+        hal_data["joysticks"][0]["axes"][3] = 0.5
+        return tm < 0.5
+
+    control.run_test(on_step)
+    assert robot.leg1.motor.built and robot.leg_drive.motor.built
+    assert threads[12].startswith("boot")
+    assert threads[17].startswith("boot")
+    assert robot.leg1.writes > 0
+
+
+def test_climb_stops_with_control(control, robot, hal_data):
+    control.set_operator_control(enabled=True)
+    outputs = []
+
+    def on_step(tm):
+        # Lower the legs, then let go
+        hal_data["joysticks"][0]["axes"][3] = 0.5 if tm < 1.03 else 0
+        outputs.append((tm, robot.leg1.value))
+        return tm < 1.5
+
+    control.run_test(on_step)
+    # Stopped by the first loop after the trigger was released
+    assert all(value == (0,) for tm, value in outputs if tm > 1.05)
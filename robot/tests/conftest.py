@@ -0,0 +1,14 @@
+import gc
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def restore_gc():
+    """
+        The robot freezes objects and turns off collection while enabled,
+        which would otherwise carry over between tests
+    """
+    yield
+    gc.enable()
+    gc.unfreeze()
@@ -0,0 +1,112 @@
+"""
+    Checks the velocity estimate and the encoders' units and signs
+"""
+
+import random
+
+import pytest
+
+from common.encoder import CANTalonEncoder, CANTalonQuadEncoder, VelocityEstimator
+from helpers import run_with_physics
+
+
+class FakeTalon:
+    def __init__(self, position=0, velocity=0):
+        self.position = position
+        self.velocity = velocity
+
+    def getQuadraturePosition(self):
+        return self.position
+
+    def getQuadratureVelocity(self):
+        return self.velocity
+
+    def setQuadraturePosition(self, position):
+        self.position = position
+
+
+def test_estimator_ramp():
+    estimator = VelocityEstimator(8)
+    for n in range(20):
+        velocity = estimator.add(n * 0.02, 3.0 + 12.5 * n * 0.02)
+    assert velocity == pytest.approx(12.5)
+
+
+def test_estimator_smooths_noise():
+    rng = random.Random(2019)
+    estimator = VelocityEstimator(8)
+    worst_difference = worst_estimate = 0.0
+    last = 0.0
+    for n in range(200):
+        # 10 units per second, read to the nearest unit with jitter
+        position = round(10 * n * 0.02 + rng.uniform(-0.5, 0.5))
+        velocity = estimator.add(n * 0.02, position)
+        if n >= 8:
+            worst_difference = max(worst_difference, abs((position - last) / 0.02 - 10))
+            worst_estimate = max(worst_estimate, abs(velocity - 10))
+        last = position
+    assert worst_estimate < worst_difference / 5
+
+
+def test_estimator_repeated_timestamps():
+    estimator = VelocityEstimator(4)
+    estimator.add(1.0, 0.0)
+    assert estimator.add(1.0, 5.0) == 0.0
+    assert estimator.add(1.1, 1.0) != 0.0
+
+
+def test_zero_keeps_rate():
+    talon = FakeTalon()
+    encoder = CANTalonQuadEncoder(talon).set_units(2.0)
+    for n in range(10):
+        talon.position = 50 * n
+        encoder.update(n * 0.02)
+    assert encoder.rate == pytest.approx(2.0 * 50 / 0.02)
+
+    encoder.zero()
+    encoder.update(0.2)
+    assert encoder.distance == 0
+    assert encoder.rate == pytest.approx(2.0 * 50 / 0.02)
+    talon.position = 50
+    encoder.update(0.22)
+    assert encoder.rate == pytest.approx(2.0 * 50 / 0.02)
+
+
+def test_reversed_velocity():
+    talon = FakeTalon(position=100, velocity=40)
+    assert CANTalonQuadEncoder(talon).get_velocity() == 40
+    assert CANTalonQuadEncoder(talon, reversed=True).get_velocity() == -40
+    reversed_encoder = CANTalonQuadEncoder(talon, reversed=True)
+    assert reversed_encoder.get_position() == -100
+
+    # This class counts the other way, but velocity agrees with position
+    encoder = CANTalonEncoder(talon)
+    talon.position += 10
+    assert encoder.get_position() < 0
+    assert encoder.get_velocity() < 0
+
+
+def test_drive_speed_inches(control, fake_time, robot, robot_path, hal_data):
+    control.set_operator_control(enabled=True)
+    speeds = []
+    positions = []
+    xs = []
+
+    def on_step(tm):
+        # Full speed forward in tank
+        hal_data["joysticks"][0]["axes"][1] = -1
+        if 1.5 <= tm < 2.5:
+            speeds.append(robot.robot_state.fl_velocity)
+            positions.append(robot.robot_state.fl_position)
+            xs.append(robot.odometry.get_pose()[0])
+        return tm < 2.5
+
+    run_with_physics(control, fake_time, robot_path, on_step)
+    # The odometry is in feet
+    travelled = 12 * (xs[-1] - xs[0]) / (0.02 * (len(xs) - 1))
+    assert travelled > 30
+    assert sum(speeds) / len(speeds) == pytest.approx(travelled, rel=0.05)
+    # Positions are in inches too
+    assert positions[-1] - positions[0] == pytest.approx(
+        12 * (xs[-1] - xs[0]), rel=0.05
+    )
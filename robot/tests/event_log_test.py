@@ -0,0 +1,37 @@
+"""
+    Checks the event log writes records out and drops repeats
+"""
+
+import json
+import logging
+
+from common.event_log import EventLog
+
+
+def test_event_log(tmpdir):
+    log = EventLog(str(tmpdir), repeat_interval=10)
+    logger = logging.getLogger("event_log_test")
+    logger.addHandler(log)
+    logger.propagate = False
+    try:
+        for _ in range(50):
+            logger.warning("seek")
+        logger.warning("charge")
+        logger.warning("charge")
+    finally:
+        logger.removeHandler(log)
+        log.close()
+
+    (path,) = tmpdir.listdir()
+    events = [json.loads(line) for line in path.readlines()]
+    assert [event["message"] for event in events] == [
+        "seek",
+        "Previous message repeated 49 times",
+        "charge",
+        # Still pending when the log closed
+        "Previous message repeated 1 times",
+    ]
+    assert events[1]["repeats"] == 49
+    assert "repeats" not in events[2]
+    assert events[3]["repeats"] == 1
+    assert events[0]["logger"] == "event_log_test"
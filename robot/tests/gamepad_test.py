@@ -0,0 +1,72 @@
+"""
+    Checks the gamepad snapshot's edges, that the driver's left bumper only
+    switches drive modes, and that the README's controls table is current
+"""
+
+import os
+
+from common.gamepad import Button, Gamepads
+from components.drive import DriveMode
+from controls.primary import BINDINGS, DRIVER, TOGGLE_MODE
+
+
+class FakeDriverStation:
+    def __init__(self):
+        self.buttons = 0
+
+    def getStickAxis(self, port, axis):
+        return 0.0
+
+    def getStickButtons(self, port):
+        return self.buttons
+
+    def getStickPOV(self, port, pov):
+        return -1
+
+
+def test_edges_shared():
+    pads = Gamepads((0,))
+    pads.ds = ds = FakeDriverStation()
+
+    ds.buttons = 1 << (Button.LEFT_BUMPER - 1)
+    pads.update()
+    # Every reader in the loop sees the press
+    assert pads.pressed(TOGGLE_MODE)
+    assert pads.pressed(TOGGLE_MODE)
+    assert pads.held(TOGGLE_MODE)
+
+    pads.update()
+    assert not pads.pressed(TOGGLE_MODE)
+    assert pads.held(TOGGLE_MODE)
+
+    ds.buttons = 0
+    pads.update()
+    assert pads.released(TOGGLE_MODE)
+    assert not pads.held(TOGGLE_MODE)
+
+
+def test_left_bumper(control, robot, hal_data):
+    control.set_operator_control(enabled=True)
+    driver, operator = hal_data["joysticks"][0], hal_data["joysticks"][1]
+    grabs = []
+
+    def on_step(tm):
+        driver["buttons"][5] = 0.5 <= tm < 0.6
+        operator["buttons"][5] = 1.0 <= tm < 1.1
+        grabs.append(robot.intake.grab)
+        return tm < 1.5
+
+    control.run_test(on_step)
+    assert robot.primary.drive_mode == DriveMode.MECANUM
+    # Only the operator's bumper toggled the hatch intake
+    assert len(set(grabs[: int(0.9 / 0.02)])) == 1
+    assert grabs[-1] != grabs[0]
+
+
+def test_readme_controls(robot_path):
+    with open(os.path.join(robot_path, "..", "README.md")) as f:
+        readme = f.read()
+    assert BINDINGS.table() in readme
+    assert any(
+        b.port == DRIVER and b.control == Button.LEFT_BUMPER for b in BINDINGS.bindings
+    )
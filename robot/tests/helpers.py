@@ -0,0 +1,25 @@
+"""
+    Shared simulator helpers for the tests
+"""
+
+import math
+
+from pyfrc import config
+from pyfrc.physics.core import PhysicsInterface
+
+
+def run_with_physics(control, fake_time, robot_path, on_step):
+    physics = PhysicsInterface(robot_path, fake_time, config.config_obj)
+    physics._set_robot_enabled(True)
+
+    def step(tm):
+        physics._on_increment_time(tm)
+        return on_step(tm)
+
+    control.run_test(step)
+    return physics
+
+
+def ground_truth(physics):
+    x, y, angle = physics.get_position()
+    return x - physics.start_x, y - physics.start_y, math.degrees(angle)
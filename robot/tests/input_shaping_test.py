@@ -0,0 +1,63 @@
+"""
+    Checks the response curves, deadband, slew limits and profiles
+"""
+
+import math
+
+from common.input_shaping import (
+    InputShaper,
+    Profile,
+    ResponseCurve,
+    MECANUM_TURN,
+    TANK_FORWARD,
+)
+
+
+def test_curve():
+    curve = ResponseCurve(scale=0.85, power=2)
+    for k in range(-100, 101):
+        value = k / 100
+        expected = 0.85 * value * abs(0.85 * value)
+        assert abs(curve(value) - expected) < 1e-4
+    # Clamped outside the stick's range
+    assert curve(1.5) == curve(1)
+
+    deadband = ResponseCurve(deadband=0.1)
+    assert deadband(0.05) == 0
+    assert deadband(-0.095) == 0
+    assert abs(deadband(0.55) - 0.5) < 1e-4
+    assert deadband(1) == 1
+
+    # Calculated rather than interpolated, the same as the old math.pow
+    exact = ResponseCurve(power=3, exact=True)
+    for k in range(-100, 100):
+        value = k / 100 + 0.003
+        assert abs(exact(value) - math.pow(value, 3)) < 1e-15
+
+
+def test_slew():
+    shaper = InputShaper([Profile("ramp", {"tank_forward": {"slew": 2}})], 0.02)
+    outputs = [shaper.shape(TANK_FORWARD, 1) for _ in range(30)]
+    # 2 per second is 0.04 per loop
+    assert abs(outputs[0] - 0.04) < 1e-9
+    assert abs(outputs[24] - 1) < 1e-9
+    assert shaper.shape(TANK_FORWARD, -1) > 0.95
+
+    shaper.reset()
+    assert abs(shaper.shape(TANK_FORWARD, -1) + 0.04) < 1e-9
+
+
+def test_profiles(robot):
+    robot.robotInit()
+    shaper = robot.input_shaper
+    assert shaper.active.name == "competition"
+    assert abs(shaper.shape(MECANUM_TURN, 1) - (0.75 * 0.85) ** 2) < 1e-6
+
+    # Slow mode overrides the selected profile until released
+    shaper.hold("slow")
+    assert abs(shaper.shape(TANK_FORWARD, 1) - 0.75 ** 3) < 1e-6
+    shaper.hold(None)
+    shaper.select("smooth")
+    assert shaper.active.name == "smooth"
+    shaper.reset()
+    assert shaper.shape(TANK_FORWARD, 0.04) == 0
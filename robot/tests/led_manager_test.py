@@ -0,0 +1,97 @@
+"""
+    Checks the LED writer thread against a fake serial port
+"""
+
+import time
+
+from common.led_manager import LEDManager, LedPattern
+
+
+class FakePort:
+    def __init__(self):
+        self.writes = []
+        self.unplugged = False
+
+    def write(self, data):
+        if self.unplugged:
+            raise OSError("unplugged")
+        self.writes.append((time.monotonic(), data[0]))
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_coalesce_and_rate_limit():
+    port = FakePort()
+    leds = LEDManager(open_port=lambda: port, min_interval=0.02)
+    try:
+        # Faster than the port is written to
+        for _ in range(20):
+            leds.write_pattern(LedPattern.RedFader)
+            leds.write_pattern(LedPattern.BlueFader)
+            time.sleep(0.005)
+        leds.write_pattern(LedPattern.Rainbow1)
+        wait_for(lambda: port.writes and port.writes[-1][1] == 7)
+
+        assert leds.coalesced > 0
+        assert 2 < len(port.writes) < 41
+        times = [tm for tm, _ in port.writes]
+        assert min(b - a for a, b in zip(times, times[1:])) >= 0.019
+    finally:
+        leds.stop()
+
+
+def test_reconnect():
+    ports = []
+
+    def open_port():
+        if len(ports) == 1:
+            # Still unplugged the first time it retries
+            ports.append(None)
+            raise OSError("no device")
+        port = FakePort()
+        ports.append(port)
+        return port
+
+    leds = LEDManager(open_port=open_port, min_interval=0, reconnect_period=0.01)
+    try:
+        leds.write_pattern(LedPattern.RedFader)
+        wait_for(lambda: ports and ports[0].writes)
+
+        ports[0].unplugged = True
+        leds.write_byte(3)
+        wait_for(lambda: len(ports) == 3 and len(ports[2].writes) == 2)
+
+        # The pattern is restored before the byte that failed is resent
+        assert [byte for _, byte in ports[2].writes] == [1, 3]
+        assert leds.failed_opens == 1
+    finally:
+        leds.stop()
+
+
+def test_reconnect_backoff():
+    opens = []
+
+    def open_port():
+        opens.append(time.monotonic())
+        raise OSError("no device")
+
+    leds = LEDManager(open_port=open_port, reconnect_period=0.1)
+    try:
+        # Writes while unplugged don't hurry the next attempt
+        for _ in range(30):
+            leds.write_pattern(LedPattern.RedFader)
+            leds.write_pattern(LedPattern.BlueFader)
+            time.sleep(0.005)
+        assert 1 <= len(opens) <= 3
+        assert all(b - a >= 0.09 for a, b in zip(opens, opens[1:]))
+    finally:
+        leds.stop()
@@ -0,0 +1,69 @@
+"""
+    Checks the lift's motion profiles
+"""
+
+from common.motion_profile import trapezoidal
+from components.lift import (
+    LIFT_MAX_ACCELERATION,
+    LIFT_MAX_VELOCITY,
+)
+from helpers import run_with_physics
+
+
+def test_profile_limits():
+    profile = trapezoidal(
+        500, 100, LIFT_MAX_VELOCITY, LIFT_MAX_ACCELERATION, 0.02, velocity=800
+    )
+    assert profile[-1] == 100
+    assert min(profile) >= 100
+
+    velocities = [(b - a) / 0.02 for a, b in zip(profile, profile[1:])]
+    assert max(abs(v) for v in velocities) <= LIFT_MAX_VELOCITY + 1e-6
+    # The last step snaps onto the end, allow it a little extra
+    for a, b in zip(velocities, velocities[1:]):
+        assert abs(b - a) <= LIFT_MAX_ACCELERATION * 0.02 * 1.1
+
+
+def test_preset(control, fake_time, robot, robot_path, hal_data):
+    control.set_operator_control(enabled=True)
+    positions = []
+
+    def on_step(tm):
+        # Tap up on the dpad for the 1180 preset
+        hal_data["joysticks"][1]["povs"][0] = 0 if tm < 0.1 else -1
+        positions.append(robot.robot_state.lift_position)
+        return tm < 3
+
+    run_with_physics(control, fake_time, robot_path, on_step)
+
+    lift = robot.lift
+    assert lift.get_setpoint() == 1180
+    # The move came from the cache
+    assert lift.profiles.get(0, 1180) is not None
+    assert lift.get_command() == 1180
+    assert abs(positions[-1] - 1180) < 20
+    assert max(positions) < 1180 + 20
+
+
+def test_trigger_nudge(control, fake_time, robot, robot_path, hal_data):
+    control.set_operator_control(enabled=True)
+    commands = []
+    velocities = []
+
+    def on_step(tm):
+        # Hold the right trigger for a second, then let go
+        hal_data["joysticks"][1]["axes"][3] = 1 if tm < 1 else 0
+        commands.append(robot.lift.get_command())
+        velocities.append(robot.lift.command_velocity)
+        return tm < 2
+
+    run_with_physics(control, fake_time, robot_path, on_step)
+
+    lift = robot.lift
+    assert 0 <= min(velocities)
+    assert max(velocities) <= LIFT_MAX_VELOCITY + 1e-6
+    assert commands[-1] > 0
+    # Stopped as soon as the trigger was released
+    assert commands[-1] == commands[-int(0.9 / 0.02)]
+    assert lift.get_setpoint() == lift.get_command()
+    assert lift.profile is None
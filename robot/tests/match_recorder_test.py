@@ -0,0 +1,47 @@
+"""
+    Checks match recordings can be read back, and old ones are pruned
+"""
+
+import json
+import struct
+
+from common.match_recorder import HEADER_LENGTH, MAGIC, MatchRecorder, prune_logs
+
+
+def test_match_recorder(tmpdir):
+    recorder = MatchRecorder(str(tmpdir), buffer_records=4, buffers=4)
+    values = iter(range(10))
+    recorder.add("loop", "H", lambda: next(values))
+    recorder.add("enabled", "?", lambda: True)
+    recorder.add("mode", "B", lambda: 2, labels={2: "TANK"})
+    recorder.start()
+    for _ in range(10):
+        recorder.record()
+    recorder.stop()
+
+    data = open(recorder.path, "rb").read()
+    assert data.startswith(MAGIC)
+    (length,) = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+    start = len(MAGIC) + HEADER_LENGTH.size
+    header = json.loads(data[start : start + length].decode())
+    assert header["fields"] == [["loop", "H"], ["enabled", "?"], ["mode", "B"]]
+    assert header["labels"] == {"mode": {"2": "TANK"}}
+
+    records = list(struct.iter_unpack("<H?B", data[start + length :]))
+    assert records == [(i, True, 2) for i in range(10)]
+
+
+def test_prune_logs(tmpdir):
+    for n in range(5):
+        tmpdir.join("2019030%d-120000.mrec" % n).write("")
+        tmpdir.join("2019030%d-120000.jsonl" % n).write("")
+
+    assert prune_logs(str(tmpdir), ".mrec", 2) == 3
+    names = sorted(path.basename for path in tmpdir.listdir())
+    assert [name for name in names if name.endswith(".mrec")] == [
+        "20190303-120000.mrec",
+        "20190304-120000.mrec",
+    ]
+    # Other kinds of log are left alone
+    assert len([name for name in names if name.endswith(".jsonl")]) == 5
+    assert prune_logs(str(tmpdir.join("missing")), ".mrec", 2) == 0
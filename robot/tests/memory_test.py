@@ -0,0 +1,54 @@
+"""
+    Checks collection is held off while enabled and caught up while disabled
+"""
+
+import gc
+
+from common.memory import MemoryManager
+
+
+def test_collects_between_loops():
+    memory = MemoryManager()
+    memory.freeze()
+    assert memory.frozen > 0
+
+    memory.enable()
+    assert not gc.isenabled()
+
+    threshold = gc.get_threshold()[0]
+    kept = []
+    for _ in range(10):
+        kept.extend([] for _ in range(threshold // 4))
+        memory.end_loop()
+        assert gc.get_count()[0] < threshold
+
+    assert memory.collections > 0
+    assert memory.allocations.count == 10
+    assert memory.allocations.summary()[3] >= threshold // 4
+
+    memory.disable()
+    assert gc.isenabled()
+    assert memory.collections == 0
+
+
+def test_idle_while_disabled():
+    memory = MemoryManager()
+    memory.end_loop()
+    assert memory.allocations.count == 0
+    assert gc.isenabled()
+
+
+def test_robot_enable_disable(control, robot):
+    control.set_operator_control(enabled=True)
+
+    def on_step(tm):
+        if tm > 0.5:
+            assert not gc.isenabled()
+        return tm < 1
+
+    control.run_test(on_step)
+    assert robot.memory.frozen > 0
+    assert robot.memory.allocations.count > 0
+
+    robot.disabledInit()
+    assert gc.isenabled()
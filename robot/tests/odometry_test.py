@@ -0,0 +1,66 @@
+"""
+    Checks the odometry against the simulator's ground truth
+"""
+
+import math
+
+from helpers import ground_truth, run_with_physics
+
+
+def test_tank_odometry(control, fake_time, robot, robot_path, hal_data):
+    control.set_operator_control(enabled=True)
+
+    def on_step(tm):
+        # Drive forward while turning right
+        hal_data["joysticks"][0]["axes"][1] = -0.8
+        hal_data["joysticks"][0]["axes"][4] = 0.4
+        return tm < 4
+
+    physics = run_with_physics(control, fake_time, robot_path, on_step)
+
+    x, y, heading = robot.odometry.get_pose()
+    true_x, true_y, true_heading = ground_truth(physics)
+    assert math.hypot(true_x, true_y) > 3
+    assert abs(heading - true_heading) < 1
+    assert math.hypot(x - true_x, y - true_y) < 0.5
+
+
+def test_mecanum_odometry(control, fake_time, robot, robot_path, hal_data):
+    control.set_operator_control(enabled=True)
+
+    def on_step(tm):
+        joystick = hal_data["joysticks"][0]
+        # Tap the left bumper to switch to mecanum
+        joystick["buttons"][5] = tm < 0.5
+        if tm > 1:
+            # Strafe right while driving forward
+            joystick["axes"][0] = 0.9
+            joystick["axes"][1] = -0.6
+        return tm < 4
+
+    physics = run_with_physics(control, fake_time, robot_path, on_step)
+
+    x, y, heading = robot.odometry.get_pose()
+    true_x, true_y, true_heading = ground_truth(physics)
+    assert true_y > 1
+    assert abs(heading - true_heading) < 1
+    assert math.hypot(x - true_x, y - true_y) < 0.5
+
+
+def test_pose_history(control, fake_time, robot, robot_path, hal_data):
+    control.set_operator_control(enabled=True)
+
+    def on_step(tm):
+        hal_data["joysticks"][0]["axes"][1] = -1
+        return tm < 2
+
+    run_with_physics(control, fake_time, robot_path, on_step)
+
+    history = robot.odometry.history
+    now = fake_time.get()
+    x_now = robot.odometry.get_pose()[0]
+    x_before = robot.odometry.pose_at(now - 0.5)[0]
+    assert 0 < x_before < x_now
+    # Queries older than the history are clamped to the oldest pose
+    oldest = robot.odometry.pose_at(0)
+    assert oldest == history.at(now - 100)
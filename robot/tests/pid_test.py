@@ -0,0 +1,65 @@
+"""
+    Checks the PID loops match wpilib.PIDController and run at their rates
+"""
+
+import wpilib
+
+from common.pid import PIDScheduler
+
+
+def test_matches_wpilib(robot):
+    inputs = [0, 3, 8, 12, 14, 15, 15.5, 15, 14.5, 15]
+    ours, theirs = [], []
+
+    scheduler = PIDScheduler()
+    source = iter(inputs)
+    loop = scheduler.add(
+        "test",
+        0.1,
+        0.01,
+        0.05,
+        lambda: next(source),
+        ours.append,
+        output_range=(-1, 0.5),
+    )
+    loop.set_setpoint(15)
+    loop.set_enabled(True)
+
+    wpilib_source = iter(inputs)
+    pid = wpilib.PIDController(
+        0.1, 0.01, 0.05, lambda: next(wpilib_source), theirs.append
+    )
+    pid.setOutputRange(-1, 0.5)
+    pid.setSetpoint(15)
+    # Its notifier doesn't run unless the time moves
+    pid.enable()
+
+    for _ in inputs:
+        scheduler.update()
+        pid._calculate()
+
+    assert ours == theirs
+    assert loop.get_error() == 0
+
+
+def test_rates(robot):
+    scheduler = PIDScheduler(0.02)
+    outputs = {"fast": [], "slow": []}
+    for name, period in (("fast", 0.02), ("slow", 0.06)):
+        loop = scheduler.add(name, 1, 0, 0, lambda: 0, outputs[name].append, period)
+        loop.set_enabled(True)
+    for _ in range(9):
+        scheduler.update()
+    assert len(outputs["fast"]) == 9
+    assert len(outputs["slow"]) == 3
+
+    # Disabling lets go of the output
+    scheduler.loops[0].set_setpoint(1)
+    scheduler.loops[0].set_enabled(False)
+    scheduler.update()
+    assert outputs["fast"][-1] == 0
+
+
+def test_robot_loops(robot):
+    robot.robotInit()
+    assert [loop.getName() for loop in robot.pids.loops] == ["lift", "wrist", "tape"]
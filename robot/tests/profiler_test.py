@@ -0,0 +1,40 @@
+"""
+    Checks the profiler's allocation tracing used by tools/benchmark.py
+"""
+
+import tracemalloc
+
+from common.profiler import LoopProfiler
+
+
+class Allocator:
+    def __init__(self):
+        self.kept = []
+
+    def execute(self):
+        self.kept.append(bytearray(10000))
+
+
+def test_trace_allocations(monkeypatch):
+    monkeypatch.setattr(LoopProfiler, "trace_allocations", True)
+    profiler = LoopProfiler()
+    allocator = Allocator()
+    profiler.instrument("allocator", allocator)
+
+    tracemalloc.start()
+    try:
+        for _ in range(3):
+            allocator.execute()
+    finally:
+        tracemalloc.stop()
+
+    assert profiler.buffers["allocator"].count == 3
+    buffer = profiler.allocations["allocator"]
+    assert buffer.count == 3
+    assert all(10000 <= size < 20000 for size in buffer.samples[:3])
+
+
+def test_no_tracing_by_default():
+    profiler = LoopProfiler()
+    profiler.instrument("allocator", Allocator())
+    assert profiler.allocations == {}
@@ -0,0 +1,51 @@
+"""
+    Replays a recorded drive through the simulator and checks the robot
+    responds the same way it did when it was recorded
+
+    After an intentional change in behaviour, rerun with
+    UPDATE_BASELINES=1 to record a new baseline
+"""
+
+import os
+import shutil
+
+from common.match_recorder import Recording
+from common.replay import InputReplay
+from helpers import run_with_physics
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "drive.mrec")
+
+# Outputs that must match the baseline
+COMPARED = (
+    "drive_mode",
+    "drive_y",
+    "drive_x",
+    "drive_rotation",
+    "lift_setpoint",
+    "wrist_setpoint",
+)
+TOLERANCE = 1e-3
+
+
+def test_replay(control, fake_time, robot, robot_path, hal_data):
+    baseline = Recording(BASELINE)
+    replay = InputReplay(baseline)
+    control.set_operator_control(enabled=True)
+
+    def on_step(tm):
+        return replay.apply(hal_data, tm)
+
+    run_with_physics(control, fake_time, robot_path, on_step)
+    robot.recorder.stop()
+
+    if os.environ.get("UPDATE_BASELINES"):
+        shutil.copy(robot.recorder.path, BASELINE)
+        return
+
+    replayed = Recording(robot.recorder.path)
+    assert len(replayed) >= len(baseline)
+    for name in COMPARED:
+        expected = baseline.column(name)
+        actual = replayed.column(name)[: len(expected)]
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            assert abs(a - b) <= TOLERANCE, "%s differs at loop %d" % (name, i)
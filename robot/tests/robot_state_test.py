@@ -0,0 +1,23 @@
+"""
+    Checks that the controls see the sensors from the loop they run in
+"""
+
+import wpilib
+
+
+def test_snapshot_before_controls(control, robot):
+    ages = []
+
+    def drive_tank(*args, **kwargs):
+        # Called by the controls, before the components execute
+        ages.append(wpilib.Timer.getFPGATimestamp() - robot.robot_state.timestamp)
+
+    def on_step(tm):
+        robot.drive.drive_tank = drive_tank
+        return tm < 1
+
+    control.set_operator_control(enabled=True)
+    control.run_test(on_step)
+
+    assert len(ages) > 10
+    assert max(ages) < 0.001
@@ -0,0 +1,59 @@
+"""
+    Checks components run at their declared rates, and the drive stops
+    when the main loop stops handing it commands
+"""
+
+import pytest
+
+from common.scheduler import Scheduler
+from components.drive import DriveCommand, DriveMode
+
+
+class Counter:
+    def __init__(self, rate=None):
+        if rate is not None:
+            self.RATE = rate
+        self.executes = 0
+        self.updates = 0
+
+    def execute(self):
+        self.executes += 1
+
+    def update(self):
+        self.updates += 1
+
+
+def test_rates(fake_time):
+    scheduler = Scheduler(0.02)
+    fast, loop, normal = Counter(200), Counter(50), Counter()
+    for name, component in (("fast", fast), ("loop", loop), ("normal", normal)):
+        scheduler.add(name, component)
+    scheduler.start()
+
+    # One second of main loops
+    for _ in range(50):
+        for component in (fast, loop, normal):
+            component.execute()
+        fake_time.increment_time_by(0.02)
+    scheduler.stop()
+
+    assert normal.executes == loop.executes == fast.executes == 50
+    assert 195 <= fast.updates <= 205
+    assert loop.updates == normal.updates == 0
+
+    # Skipping executes would skip their will_reset_to resets too
+    with pytest.raises(ValueError):
+        scheduler.add("slow", Counter(10))
+
+
+def test_drive_timeout(robot, fake_time):
+    robot.robotInit()
+    drive = robot.drive
+    drive.commands.put(DriveCommand(DriveMode.MECANUM, 1, 0, 0, False, False))
+    drive.update()
+    assert drive.output_y == 1
+
+    # The main loop has stalled
+    fake_time.increment_time_by(0.2)
+    assert drive.output_y == 0
+    assert drive.active_mode == DriveMode.MECANUM
@@ -0,0 +1,99 @@
+"""
+    Checks vision updates are timestamped as they arrive, go stale, and
+    are counted by frame, or by value on older coprocessor code
+"""
+
+from networktables import NetworkTables
+
+from common.vision import STALE_AGE
+
+
+def publish(table, yaw, detected, frames=1):
+    table.putNumber("tapeYaw", yaw)
+    table.putBoolean("tapeDetected", detected)
+    table.putNumber("tapeFrame", table.getNumber("tapeFrame", 0) + frames)
+    NetworkTables.waitForEntryListenerQueue(1)
+
+
+def test_latest_valid(robot, fake_time):
+    robot.robotInit()
+    vision = robot.vision
+    table = vision.table
+    received = []
+    vision.tape.subscribe(received.append)
+
+    publish(table, 12.5, True)
+    target, age = vision.tape.latest_valid()
+    assert target.yaw == 12.5
+    assert age < STALE_AGE
+    assert received[-1] == target
+
+    robot.robot_state.update()
+    assert robot.robot_state.tape_detected
+    assert robot.robot_state.tape_yaw == 12.5
+
+    # The coprocessor stopped sending
+    fake_time.increment_time_by(STALE_AGE * 2)
+    assert vision.tape.is_stale()
+    assert vision.tape.latest_valid() is None
+    robot.robot_state.update()
+    assert not robot.robot_state.tape_detected
+    assert vision.tape.dropouts == 0
+
+    # Lost the target
+    publish(table, 3.0, False)
+    assert vision.tape.latest_valid() is None
+    assert vision.tape.latest().yaw == 3.0
+
+
+def test_still_target(robot, fake_time):
+    robot.robotInit()
+    tape = robot.vision.tape
+    table = robot.vision.table
+
+    # Aligned and not moving, only the frame count changes
+    for _ in range(20):
+        publish(table, 0.0, True)
+        fake_time.increment_time_by(1 / 30)
+    assert tape.latest_valid() is not None
+    assert tape.dropouts == 0
+
+    count = tape.count
+    publish(table, 2.0, True)
+    # One update per frame, with this frame's values
+    assert tape.count == count + 1
+    assert tape.latest()[1:] == (2.0, True)
+
+    # Two frames lost on the way
+    publish(table, 2.0, True, frames=3)
+    assert tape.dropouts == 2
+
+
+def test_tape_mode(robot):
+    robot.robotInit()
+    align = robot.tape_align_ctrl
+    entry = robot.vision.tape_mode
+
+    align.set_enabled(True)
+    assert entry.getBoolean(False)
+
+    # The coprocessor restarted in cargo mode
+    robot.vision.table.putBoolean("tape", False)
+    publish(robot.vision.table, 1.0, True)
+    assert entry.getBoolean(False)
+
+
+def test_no_frame_count(robot, fake_time, caplog):
+    robot.robotInit()
+    tape = robot.vision.tape
+    table = robot.vision.table
+
+    # Older coprocessor code only sends the yaw and detected
+    for n in range(20):
+        table.putNumber("tapeYaw", n)
+        table.putBoolean("tapeDetected", True)
+        NetworkTables.waitForEntryListenerQueue(1)
+        fake_time.increment_time_by(1 / 30)
+    target, _ = tape.latest_valid()
+    assert target.yaw == 19
+    assert "tapeFrame isn't being sent" in caplog.text
@@ -0,0 +1,43 @@
+"""
+    Checks the wrist encoder filtering and the wrist PID in the simulator
+"""
+
+from helpers import run_with_physics
+
+
+def test_encoder_filter(robot, hal_data):
+    robot.robotInit()
+    encoder = robot.wrist_encoder
+    counter = next(c for c in hal_data["counter"] if c["up_source_channel"] == 2)
+
+    assert not encoder.is_ready()
+    for period in (2048e-6, 2050e-6, 2046e-6, 4095e-6, 2049e-6, 2047e-6, 2048e-6):
+        counter["period"] = period
+        encoder.sample()
+    # A glitched pulse and a dropped one
+    counter["period"] = 1e-3
+    encoder.sample()
+    counter["period"] = float("inf")
+    encoder.sample()
+
+    assert abs(encoder.get_raw() - 2048e-6) < 1e-9
+    assert encoder.rejected == 1
+
+
+def test_wrist(control, fake_time, robot, robot_path, hal_data):
+    control.set_operator_control(enabled=True)
+    ready = []
+
+    def on_step(tm):
+        ready.append(robot.robot_state.wrist_ready)
+        # Push the wrist down to its lowest setpoint
+        hal_data["joysticks"][1]["axes"][5] = 1 if 1 < tm < 2 else 0
+        return tm < 4
+
+    run_with_physics(control, fake_time, robot_path, on_step)
+
+    # The PID waited for the encoder to settle
+    assert not ready[0]
+    assert ready[-1]
+    assert robot.intake.get_wrist_setpoint() == 208
+    assert abs(robot.robot_state.wrist_angle - 208) < 2
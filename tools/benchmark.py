@@ -0,0 +1,410 @@
+"""
+    Loop time benchmarks for the robot in the simulator
+
+    Each script drives the robot for a number of loops, first timing every
+    instrumented component, then again with tracemalloc to count the bytes
+    each one allocates. Times are compared against the baseline after
+    scaling by a fixed pure Python workload timed on both machines, so a
+    baseline taken on one computer is still useful on another.
+
+    The results are written as JSON for tracking across commits, and the
+    exit status is 1 if anything got slower or allocates more than the
+    baseline's tolerances allow.
+
+    Usage:
+        python tools/benchmark.py [script ...] [--loops N] [--json FILE]
+        python tools/benchmark.py --update-baseline
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import simulate
+from networktables import NetworkTables
+from pyfrc import configloader
+
+from common.profiler import LoopProfiler  # noqa: E402
+
+BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json"
+)
+
+# Allowed increase over the baseline, as a fraction of it
+TIME_TOLERANCE = 0.5
+ALLOCATION_TOLERANCE = 0.25
+# Differences smaller than these are noise, in ms and bytes. Components
+# allocate tens to hundreds of bytes a loop, so the allocation slack is
+# kept well under that
+TIME_SLACK = 0.01
+ALLOCATION_SLACK = 16
+
+SETTLE = 0.5
+LOOP_PERIOD = 0.02
+
+
+def tap(tm, at, length=0.1):
+    return at <= tm < at + length
+
+
+class MecanumFODScript:
+    """
+        Switches to mecanum and field oriented drive, then drives in circles
+        while spinning
+    """
+
+    def apply(self, hal_data, tm):
+        driver = hal_data["joysticks"][0]
+        driver["buttons"][5] = tap(tm, 0.1)  # Left bumper, mecanum
+        driver["buttons"][9] = tap(tm, 0.3)  # Left stick, field oriented
+        driver["axes"][0] = 0.7 * math.cos(tm)
+        driver["axes"][1] = 0.7 * math.sin(tm)
+        driver["axes"][4] = 0.4 * math.sin(tm / 3)
+
+
+class TankScript:
+    """
+        Weaves forward and back in tank
+    """
+
+    def apply(self, hal_data, tm):
+        driver = hal_data["joysticks"][0]
+        driver["axes"][1] = -0.9 * math.sin(tm / 4)
+        driver["axes"][4] = 0.6 * math.sin(tm)
+        # Slow mode now and then
+        driver["buttons"][1] = tm % 10 > 8
+
+
+class AutoAlignScript:
+    """
+        Holds tape alignment with the coprocessor sending a moving target
+        at 30fps
+    """
+
+    def __init__(self):
+        self.vision = NetworkTables.getTable("Vision")
+        self.next_frame = 0.0
+        self.frame = 0
+
+    def apply(self, hal_data, tm):
+        hal_data["joysticks"][0]["buttons"][2] = True
+        if tm >= self.next_frame:
+            self.next_frame = tm + 1 / 30
+            self.vision.putNumber("tapeYaw", 15 * math.sin(tm / 2) + 0.1 * (tm % 0.7))
+            self.vision.putBoolean("tapeDetected", tm % 8 < 7)
+            self.frame += 1
+            self.vision.putNumber("tapeFrame", self.frame)
+
+
+class LiftSweepScript:
+    """
+        Sweeps the lift up and down on the triggers, with presets in between
+    """
+
+    presets = (180, 270, 0, 90)
+
+    def apply(self, hal_data, tm):
+        operator = hal_data["joysticks"][1]
+        t = tm % 8
+        operator["axes"][3] = t / 2 if t < 2 else 0
+        operator["axes"][2] = (t - 4) / 2 if 4 < t < 6 else 0
+        if 2 < t < 4 or t > 6:
+            operator["povs"][0] = self.presets[int(tm / 8) % len(self.presets)]
+        else:
+            operator["povs"][0] = -1
+        operator["axes"][5] = 0.5 * math.sin(tm)
+
+
+SCRIPTS = {
+    "mecanum_fod": MecanumFODScript,
+    "tank": TankScript,
+    "auto_align": AutoAlignScript,
+    "lift_sweep": LiftSweepScript,
+}
+
+
+class Collector:
+    """
+        Copies each loop's newest profiler samples, the profiler's own
+        buffers only hold the last few seconds
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.indexes = {}
+
+    def __call__(self, robot):
+        profiler = robot.profiler
+        buffers = (
+            profiler.allocations if profiler.trace_allocations else profiler.buffers
+        )
+        for name, buffer in buffers.items():
+            if buffer.index != self.indexes.get(name, 0):
+                self.indexes[name] = buffer.index
+                sample = buffer.samples[(buffer.index - 1) % len(buffer.samples)]
+                self.samples.setdefault(name, []).append(sample)
+
+
+def run(script, loops, allocations):
+    collector = Collector()
+    LoopProfiler.trace_allocations = allocations
+    if allocations:
+        tracemalloc.start()
+    try:
+        _, match = simulate.run_match(
+            SCRIPTS[script](),
+            periods=(SETTLE, 0, loops * LOOP_PERIOD),
+            on_loop=collector,
+        )
+    finally:
+        LoopProfiler.trace_allocations = False
+        if allocations:
+            tracemalloc.stop()
+    # Only the teleop loops
+    return collector.samples, match.loop_times[round(SETTLE / LOOP_PERIOD) :]
+
+
+def percentile(ordered, fraction):
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples, scale):
+    ordered = sorted(samples)
+    return {
+        "mean": scale * sum(ordered) / len(ordered),
+        "p50": scale * percentile(ordered, 0.5),
+        "p99": scale * percentile(ordered, 0.99),
+        "max": scale * ordered[-1],
+    }
+
+
+def benchmark(script, loops):
+    times, loop_times = run(script, loops, allocations=False)
+    allocations, _ = run(script, loops, allocations=True)
+    components = {}
+    for name in sorted(times):
+        components[name] = {
+            "ms": summarize(times[name], 1000),
+            "bytes": summarize(allocations.get(name, [0]), 1),
+        }
+    return {
+        "loops": len(loop_times),
+        "loop_ms": summarize(loop_times, 1000),
+        "components": components,
+    }
+
+
+def calibrate():
+    """
+        :return: seconds for a fixed pure Python workload, the best of 5
+    """
+    best = math.inf
+    for _ in range(5):
+        start = time.perf_counter()
+        total = 0.0
+        for i in range(200000):
+            total += i * 0.5
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, time_tolerance, allocation_tolerance):
+    """
+        :return: a list of regressions, each a dict describing the metric
+    """
+    # Express the baseline's times on this machine
+    speed = results["calibration"] / baseline["calibration"]
+    regressions = []
+
+    def check(script, metric, value, base, tolerance, slack):
+        limit = base * (1 + tolerance) + slack
+        if value > limit:
+            regressions.append(
+                {
+                    "script": script,
+                    "metric": metric,
+                    "value": value,
+                    "baseline": base,
+                    "limit": limit,
+                }
+            )
+
+    def missing(script, metric):
+        # Anything new has to be added to the baseline before it's checked
+        regressions.append(
+            {"script": script, "metric": metric, "value": None, "baseline": None}
+        )
+
+    for script, result in results["scripts"].items():
+        base = baseline["scripts"].get(script)
+        if base is None:
+            missing(script, "loop_ms.mean")
+            continue
+        check(
+            script,
+            "loop_ms.mean",
+            result["loop_ms"]["mean"],
+            base["loop_ms"]["mean"] * speed,
+            time_tolerance,
+            TIME_SLACK,
+        )
+        for name, component in result["components"].items():
+            base_component = base["components"].get(name)
+            if base_component is None:
+                missing(script, name)
+                continue
+            check(
+                script,
+                name + ".ms.mean",
+                component["ms"]["mean"],
+                base_component["ms"]["mean"] * speed,
+                time_tolerance,
+                TIME_SLACK,
+            )
+            check(
+                script,
+                name + ".bytes.mean",
+                component["bytes"]["mean"],
+                base_component["bytes"]["mean"],
+                allocation_tolerance,
+                ALLOCATION_SLACK,
+            )
+    return regressions
+
+
+def report(results, out):
+    for script, result in results["scripts"].items():
+        loop = result["loop_ms"]
+        print(
+            "== %s, %d loops: mean %.3fms  p99 %.3fms  max %.3fms"
+            % (script, result["loops"], loop["mean"], loop["p99"], loop["max"]),
+            file=out,
+        )
+        for name, component in result["components"].items():
+            print(
+                "  %-16s mean %.3fms  p99 %.3fms  %6.0f bytes"
+                % (
+                    name,
+                    component["ms"]["mean"],
+                    component["ms"]["p99"],
+                    component["bytes"]["mean"],
+                ),
+                file=out,
+            )
+    for regression in results.get("regressions", []):
+        if regression["baseline"] is None:
+            print(
+                "REGRESSION %(script)s %(metric)s: not in the baseline, "
+                "rerun with --update-baseline" % regression,
+                file=out,
+            )
+            continue
+        print(
+            "REGRESSION %(script)s %(metric)s: %(value).4g over %(limit).4g "
+            "(baseline %(baseline).4g)" % regression,
+            file=out,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "scripts", nargs="*", help="any of %s" % ", ".join(sorted(SCRIPTS))
+    )
+    parser.add_argument("--loops", type=int, default=3000)
+    parser.add_argument(
+        "--json", metavar="FILE", help="write the results, - for stdout"
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float)
+    parser.add_argument("--allocation-tolerance", type=float)
+    args = parser.parse_args()
+    scripts = args.scripts or sorted(SCRIPTS)
+    for script in scripts:
+        if script not in SCRIPTS:
+            parser.error("unknown script %r" % script)
+
+    # Components set their own logger levels, so filter on the handler
+    console = logging.StreamHandler()
+    console.setLevel(logging.WARNING)
+    logging.root.addHandler(console)
+    configloader._load_config(simulate.ROBOT_PATH)
+
+    # Keep stdout for the JSON
+    out = sys.stderr if args.json == "-" else sys.stdout
+    with contextlib.redirect_stdout(out):
+        results = {
+            "commit": commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "calibration": calibrate(),
+            "scripts": {script: benchmark(script, args.loops) for script in scripts},
+        }
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        tolerances = baseline.get("tolerances", {})
+        time_tolerance = args.time_tolerance
+        if time_tolerance is None:
+            time_tolerance = tolerances.get("time", TIME_TOLERANCE)
+        allocation_tolerance = args.allocation_tolerance
+        if allocation_tolerance is None:
+            allocation_tolerance = tolerances.get("allocations", ALLOCATION_TOLERANCE)
+        results["regressions"] = compare(
+            results, baseline, time_tolerance, allocation_tolerance
+        )
+
+    if args.update_baseline:
+        results["tolerances"] = {
+            "time": TIME_TOLERANCE
+            if args.time_tolerance is None
+            else args.time_tolerance,
+            "allocations": ALLOCATION_TOLERANCE
+            if args.allocation_tolerance is None
+            else args.allocation_tolerance,
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+    report(results, out)
+
+    if results.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
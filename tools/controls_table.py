@@ -0,0 +1,57 @@
+"""
+    Writes the controls table in README.md from the bindings in
+    robot/controls/primary.py
+
+    Usage: python tools/controls_table.py [--check]
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "robot"))
+
+from controls.primary import BINDINGS  # noqa: E402
+
+README = os.path.join(ROOT, "README.md")
+HEADING = "## Controls\n"
+
+
+def replace_table(readme: str, table: str) -> str:
+    """
+        :return: the readme with the table after the controls heading
+            replaced by ``table``
+    """
+    start = readme.index(HEADING) + len(HEADING)
+    end = start
+    for line in readme[start:].splitlines(keepends=True):
+        if not line.startswith("|"):
+            break
+        end += len(line)
+    return readme[:start] + table + readme[end:]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="exit 1 if the README is out of date"
+    )
+    args = parser.parse_args()
+
+    with open(README) as f:
+        readme = f.read()
+    updated = replace_table(readme, BINDINGS.table())
+    if updated == readme:
+        return
+    if args.check:
+        print("README.md controls table is out of date")
+        sys.exit(1)
+    with open(README, "w") as f:
+        f.write(updated)
+
+
+if __name__ == "__main__":
+    main()
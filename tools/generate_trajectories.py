@@ -0,0 +1,169 @@
+"""
+    Generates the autonomous trajectories into robot/trajectories.bin
+
+    Each path is a spline through its waypoints, followed at a velocity and
+    acceleration limited speed, then sampled every robot loop. Tank paths
+    face along the spline, mecanum paths turn smoothly from one waypoint's
+    heading to the next. The robot only looks samples up, so none of this
+    runs on it.
+
+    Waypoints are (x, y, heading) in feet and degrees relative to where the
+    path starts: x forward, y right and heading clockwise, like odometry.
+
+    Usage: python tools/generate_trajectories.py
+"""
+
+import bisect
+import math
+import os
+import sys
+
+ROBOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "robot"))
+sys.path.insert(0, ROBOT_PATH)
+
+from common.motion_profile import trapezoidal  # noqa: E402
+from common.trajectory import Path, write_trajectories  # noqa: E402
+
+OUTPUT = os.path.join(ROBOT_PATH, "trajectories.bin")
+
+# The robot's main loop
+PERIOD = 0.02
+# Spline points per segment, before resampling by distance
+STEPS = 400
+
+PATHS = {
+    # Off the hab in tank, curving right towards the side of the cargo ship
+    "drive_off_hab": ("TANK", [(0, 0, 0), (6, 0, 0), (10, 2.5, 45)], 3.5, 3.0,),
+    # From the middle of the hab to the right front cargo ship hatch
+    "hab_to_front_cargo": (
+        "MECANUM",
+        [(0, 0, 0), (6, 0, 0), (10.5, 1.75, 0)],
+        3.5,
+        3.0,
+    ),
+    "front_cargo_back_off": ("MECANUM", [(0, 0, 0), (-2, 0, 0)], 2.0, 3.0),
+}
+
+
+def hermite(p0, p1, m0, m1, u):
+    u2 = u * u
+    u3 = u2 * u
+    return (
+        (2 * u3 - 3 * u2 + 1) * p0
+        + (u3 - 2 * u2 + u) * m0
+        + (-2 * u3 + 3 * u2) * p1
+        + (u3 - u2) * m1
+    )
+
+
+def tangents(waypoints, tank):
+    """
+        :return: the spline's (dx, dy) at each waypoint
+    """
+    result = []
+    n = len(waypoints)
+    for k, (x, y, heading) in enumerate(waypoints):
+        before = waypoints[max(k - 1, 0)]
+        after = waypoints[min(k + 1, n - 1)]
+        length = math.hypot(after[0] - before[0], after[1] - before[1])
+        if k not in (0, n - 1):
+            length /= 2
+        if tank:
+            # The robot can only drive the way it faces
+            theta = math.radians(heading)
+            result.append((length * math.cos(theta), length * math.sin(theta)))
+        else:
+            # Catmull-Rom, straight at the ends
+            span = math.hypot(after[0] - before[0], after[1] - before[1]) or 1
+            result.append(
+                (
+                    (after[0] - before[0]) / span * length,
+                    (after[1] - before[1]) / span * length,
+                )
+            )
+    return result
+
+
+def spline(waypoints, tank):
+    """
+        :return: points (x, y, distance along the path, waypoint index + u)
+    """
+    ts = tangents(waypoints, tank)
+    points = []
+    distance = 0.0
+    last = None
+    for k in range(len(waypoints) - 1):
+        (x0, y0, _), (x1, y1, _) = waypoints[k], waypoints[k + 1]
+        (mx0, my0), (mx1, my1) = ts[k], ts[k + 1]
+        for step in range(STEPS + 1 if k == len(waypoints) - 2 else STEPS):
+            u = step / STEPS
+            x = hermite(x0, x1, mx0, mx1, u)
+            y = hermite(y0, y1, my0, my1, u)
+            if last is not None:
+                distance += math.hypot(x - last[0], y - last[1])
+            points.append((x, y, distance, k + u))
+            last = (x, y)
+    return points
+
+
+def generate(mode, waypoints, max_velocity, max_acceleration):
+    tank = mode == "TANK"
+    points = spline(waypoints, tank)
+    distances = [p[2] for p in points]
+    total = distances[-1]
+
+    poses = []
+    for s in [0.0] + list(
+        trapezoidal(0.0, total, max_velocity, max_acceleration, PERIOD)
+    ):
+        i = min(max(bisect.bisect_left(distances, s), 1), len(points) - 1)
+        a, b = points[i - 1], points[i]
+        span = b[2] - a[2]
+        f = (s - a[2]) / span if span else 0.0
+        x = a[0] + (b[0] - a[0]) * f
+        y = a[1] + (b[1] - a[1]) * f
+        if tank:
+            heading = math.degrees(math.atan2(b[1] - a[1], b[0] - a[0]))
+        else:
+            segment = a[3] + (b[3] - a[3]) * f
+            k = min(int(segment), len(waypoints) - 2)
+            u = segment - k
+            # Ease between headings so the turn starts and stops smoothly
+            u = u * u * (3 - 2 * u)
+            heading = waypoints[k][2] + (waypoints[k + 1][2] - waypoints[k][2]) * u
+        poses.append((x, y, heading))
+    # The ends have no direction of travel of their own
+    if tank:
+        poses[0] = poses[0][:2] + (waypoints[0][2],)
+        poses[-1] = poses[-1][:2] + (waypoints[-1][2],)
+
+    samples = []
+    for n, (x, y, heading) in enumerate(poses):
+        before = poses[max(n - 1, 0)]
+        after = poses[min(n + 1, len(poses) - 1)]
+        dt = PERIOD * (min(n + 1, len(poses) - 1) - max(n - 1, 0))
+        if n == len(poses) - 1:
+            vx = vy = omega = 0.0
+        else:
+            vx = (after[0] - before[0]) / dt
+            vy = (after[1] - before[1]) / dt
+            omega = (after[2] - before[2]) / dt
+        samples.append((x, y, heading, vx, vy, omega))
+    return Path(mode, samples)
+
+
+def main():
+    trajectories = {}
+    for name, (mode, waypoints, max_velocity, max_acceleration) in PATHS.items():
+        path = generate(mode, waypoints, max_velocity, max_acceleration)
+        trajectories[name] = path
+        print(
+            "%-24s %-8s %4d samples, %.2fs"
+            % (name, mode, len(path.samples), (len(path.samples) - 1) * PERIOD)
+        )
+    write_trajectories(OUTPUT, PERIOD, trajectories)
+    print("Wrote %s" % os.path.relpath(OUTPUT))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+    Loads and summarizes match recordings from robot/common/match_recorder.py
+
+    Needs numpy, from tools/requirements.txt
+
+    Usage: python tools/match_report.py <recording.mrec>...
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "robot"))
+
+from common.match_recorder import CODES, read_header  # noqa: E402
+
+# Struct codes to numpy types, records are little endian with no padding
+DTYPES = {code: np.dtype("<" + code) for code in CODES}
+
+# The robot loop period, in seconds
+LOOP_PERIOD = 0.02
+# Gaps longer than this are the robot being disabled, not jitter
+MAX_LOOP_GAP = 1.0
+
+
+def load(path):
+    """
+        Memory map a recording
+
+        :return: (records as a numpy structured array, the header)
+    """
+    with open(path, "rb") as f:
+        header, offset = read_header(f)
+    dtype = np.dtype([(name, DTYPES[code]) for name, code in header["fields"]])
+    # Ignore a partly written record at the end, eg. after a brownout
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype), header
+    records = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+    return records, header
+
+
+def loop_times(records):
+    dt = np.diff(records["time"])
+    return dt[dt < MAX_LOOP_GAP]
+
+
+def report_jitter(records):
+    dt = loop_times(records) * 1000
+    if len(dt) == 0:
+        print("Loop timing: not enough loops")
+        return
+    late = np.count_nonzero(dt > LOOP_PERIOD * 1000 * 1.25)
+    print("Loop timing (ms), %d loops" % (len(dt) + 1))
+    print(
+        "  mean %.2f  std %.2f  min %.2f  p99 %.2f  max %.2f  late %d"
+        % (dt.mean(), dt.std(), dt.min(), np.percentile(dt, 99), dt.max(), late)
+    )
+
+
+def report_tracking(records, name, setpoint, position):
+    error = records[setpoint].astype(float) - records[position]
+    # An unplugged encoder reads as inf or nan
+    error = error[np.isfinite(error)]
+    print("%s tracking error" % name)
+    if len(error) == 0:
+        print("  no valid readings")
+        return
+    print(
+        "  rms %.2f  mean abs %.2f  max abs %.2f"
+        % (np.sqrt(np.mean(error ** 2)), np.mean(np.abs(error)), np.max(np.abs(error)))
+    )
+
+
+def report_drive_modes(records, header):
+    labels = header["labels"].get("drive_mode", {})
+    dt = np.diff(records["time"])
+    dt[dt >= MAX_LOOP_GAP] = LOOP_PERIOD
+    modes = records["drive_mode"][:-1]
+    total = dt.sum()
+    print("Time in each drive mode")
+    for mode in np.unique(modes):
+        seconds = dt[modes == mode].sum()
+        print(
+            "  %-10s %7.2fs %5.1f%%"
+            % (labels.get(str(mode), mode), seconds, 100 * seconds / total)
+        )
+
+
+def report(path):
+    records, header = load(path)
+    print("== %s: %d records" % (path, len(records)))
+    if len(records) < 2:
+        return
+    report_jitter(records)
+    # The lift tracks a motion profile towards its setpoint
+    lift_command = (
+        "lift_command" if "lift_command" in records.dtype.names else "lift_setpoint"
+    )
+    report_tracking(records, "Lift", lift_command, "lift_position")
+    report_tracking(records, "Intake wrist", "wrist_setpoint", "wrist_angle")
+    report_drive_modes(records, header)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recordings", nargs="+")
+    args = parser.parse_args()
+    for path in args.recordings:
+        report(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+    Plays full matches against the simulator as fast as possible
+
+    Each match is 2 seconds disabled, 15 seconds of sandstorm and 135 seconds
+    of teleop on a simulated clock, with physics and no GUI. The gamepads are
+    driven by a built in script or by replaying match recordings.
+
+    Usage:
+        python tools/simulate.py --script drive
+        python tools/simulate.py --replay a.mrec b.mrec
+        python tools/simulate.py --trace-memory
+"""
+
+import argparse
+import logging
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+ROBOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "robot"))
+sys.path.insert(0, ROBOT_PATH)
+
+import hal_impl  # noqa: E402
+import networktables  # noqa: E402
+from pyfrc import config, configloader  # noqa: E402
+from pyfrc.physics.core import PhysicsInterface  # noqa: E402
+from pyfrc.test_support import fake_time, pyfrc_fake_hooks  # noqa: E402
+from pyfrc.test_support.controller import TestController  # noqa: E402
+
+DISABLED_PERIOD = 2
+AUTONOMOUS_PERIOD = 15
+TELEOP_PERIOD = 135
+
+
+class IdleScript:
+    """
+        Leaves the gamepads untouched
+    """
+
+    def apply(self, hal_data, tm):
+        return True
+
+
+class DriveScript:
+    """
+        Loops through driving in both drive modes and using the lift and wrist
+    """
+
+    period = 12
+
+    def apply(self, hal_data, tm):
+        t = tm % self.period
+        driver = hal_data["joysticks"][0]
+        operator = hal_data["joysticks"][1]
+
+        # Tank drive in a weave, then strafe in mecanum
+        driver["axes"][1] = -0.8 if t < 9 else 0
+        driver["axes"][4] = 0.5 * math.sin(tm) if t < 4 else 0
+        driver["axes"][0] = 0.6 if 5 < t < 9 else 0
+        # Tap the left bumper to switch modes on the way in and out
+        driver["buttons"][5] = 4 <= t < 4.2 or 9 <= t < 9.2
+
+        # Raise then lower the lift, and work the wrist
+        operator["axes"][3] = 0.6 if 1 < t < 3 else 0
+        operator["axes"][2] = 0.6 if 7 < t < 9 else 0
+        operator["axes"][5] = 0.8 * math.sin(tm / 2)
+        return True
+
+
+SCRIPTS = {"idle": IdleScript, "drive": DriveScript}
+
+
+class MemorySampler:
+    """
+        Records the most memory each enabled loop allocated above what was
+        in use at its start, with tracemalloc
+    """
+
+    def __init__(self):
+        self.loop_bytes = []
+        self.start = None
+        # Python 3.9+, otherwise only memory kept at the end of the loop
+        # is counted
+        self.reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+    def __call__(self, robot):
+        current, peak = tracemalloc.get_traced_memory()
+        if robot.isEnabled() and self.start is not None:
+            used = peak if self.reset_peak is not None else current
+            self.loop_bytes.append(used - self.start)
+        if self.reset_peak is not None:
+            self.reset_peak()
+        self.start = current
+
+
+class Match:
+    """
+        Sets the driver station mode for each phase of a match, and runs
+        physics and the input source each step
+    """
+
+    def __init__(
+        self,
+        controller,
+        physics,
+        source,
+        hal_data,
+        periods=(DISABLED_PERIOD, AUTONOMOUS_PERIOD, TELEOP_PERIOD),
+    ):
+        """
+            :param periods: seconds disabled, in sandstorm and in teleop
+        """
+        self.controller = controller
+        self.physics = physics
+        self.source = source
+        self.hal_data = hal_data
+        self.disabled, self.autonomous, self.teleop = periods
+        self.on_loop = None
+        self.loop_times = []
+        self.step_end = None
+
+    def on_step(self, tm):
+        start = time.perf_counter()
+        # Everything between steps is the robot's loop
+        if self.step_end is not None:
+            self.loop_times.append(start - self.step_end)
+
+        if self.on_loop is not None and self.step_end is not None:
+            self.on_loop()
+
+        enabled = True
+        if tm < self.disabled:
+            self.controller.set_autonomous(False)
+            enabled = False
+        elif tm < self.disabled + self.autonomous:
+            self.controller.set_autonomous(True)
+        elif tm < self.disabled + self.autonomous + self.teleop:
+            self.controller.set_operator_control(True)
+        else:
+            return False
+
+        self.physics._set_robot_enabled(enabled)
+        self.physics._on_increment_time(tm)
+        if enabled:
+            self.source.apply(self.hal_data, tm - self.disabled)
+
+        self.step_end = time.perf_counter()
+        return True
+
+
+def run_match(source, periods=None, on_loop=None):
+    """
+        Play one match, setting up and tearing down wpilib the same way the
+        pyfrc test plugin does
+
+        :param periods: the Match's periods, a full match by default
+        :param on_loop: called with the robot after every loop
+        :return: (the robot, the Match)
+    """
+    hal_data = hal_impl.data.hal_data
+    clock = fake_time.FakeTime()
+    hal_impl.functions.hooks = pyfrc_fake_hooks.PyFrcFakeHooks(clock)
+    networktables.NetworkTables.startTestMode()
+    clock.initialize()
+    controller = TestController(clock)
+    hal_impl.functions.reset_hal()
+
+    import wpilib
+    import wpilib._impl.utils
+
+    from robot import Kevin
+
+    robot = Kevin()
+    controller._robot = robot
+    physics = PhysicsInterface(ROBOT_PATH, clock, config.config_obj)
+    if periods is None:
+        match = Match(controller, physics, source, hal_data)
+    else:
+        match = Match(controller, physics, source, hal_data, periods)
+    if on_loop is not None:
+        match.on_loop = lambda: on_loop(robot)
+    try:
+        controller.run_test(match.on_step)
+    finally:
+        robot.recorder.stop()
+        robot.led_manager.stop()
+        clock.teardown()
+        wpilib._impl.utils.reset_wpilib()
+        networktables.NetworkTables.shutdown()
+    return robot, match
+
+
+def summarize(times):
+    ordered = sorted(times)
+    n = len(ordered)
+    if n == 0:
+        return "no loops"
+    return "mean %.3f  p50 %.3f  p99 %.3f  max %.3f" % (
+        1000 * sum(ordered) / n,
+        1000 * ordered[n // 2],
+        1000 * ordered[max(0, math.ceil(0.99 * n) - 1)],
+        1000 * ordered[-1],
+    )
+
+
+def report_memory(sampler, snapshot):
+    ordered = sorted(sampler.loop_bytes)
+    n = len(ordered)
+    if n:
+        print(
+            "Bytes allocated per enabled loop: mean %.0f  p50 %d  p99 %d  max %d"
+            % (
+                sum(ordered) / n,
+                ordered[n // 2],
+                ordered[max(0, math.ceil(0.99 * n) - 1)],
+                ordered[-1],
+            )
+        )
+    print("Largest allocation sites still alive:")
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(True, ROBOT_PATH + "*")])
+    for stat in snapshot.statistics("lineno")[:10]:
+        frame = stat.traceback[0]
+        print(
+            "  %8.1fKiB %6d blocks  %s:%d"
+            % (
+                stat.size / 1024,
+                stat.count,
+                os.path.relpath(frame.filename, ROBOT_PATH),
+                frame.lineno,
+            )
+        )
+
+
+def report(name, robot, match, elapsed):
+    print("== %s: %.2fs of wall time" % (name, elapsed))
+    print("Boot time %.1fms" % (1000 * robot.boot.total))
+    for step, seconds, background in robot.boot.summary():
+        print(
+            "  %-16s %7.1f%s"
+            % (step, 1000 * seconds, " (background)" if background else "")
+        )
+    print("Loop compute time (ms), %d loops" % len(match.loop_times))
+    print("  " + summarize(match.loop_times))
+    print("Sections, last %d loops (ms)" % robot.profiler.window)
+    for section, buffer in robot.profiler.buffers.items():
+        print(
+            "  %-16s min %.3f  mean %.3f  p99 %.3f  max %.3f"
+            % (section, *(1000 * t for t in buffer.summary()))
+        )
+    print("Overruns: %d" % robot.profiler.overruns)
+    print(
+        "Tracked objects per enabled loop, last %d loops: "
+        "min %.0f  mean %.0f  p99 %.0f  max %.0f"
+        % (robot.memory.allocations.count, *robot.memory.allocations.summary())
+    )
+    print("Recording: %s" % robot.recorder.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sources = parser.add_mutually_exclusive_group()
+    sources.add_argument("--script", choices=sorted(SCRIPTS), default="drive")
+    sources.add_argument("--replay", nargs="+", metavar="RECORDING")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="sample each loop's allocations with tracemalloc, which is slow",
+    )
+    args = parser.parse_args()
+
+    # Components set their own logger levels, so filter on the handler
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logging.root.addHandler(console)
+    configloader._load_config(ROBOT_PATH)
+
+    if args.replay:
+        from common.match_recorder import Recording
+        from common.replay import InputReplay
+
+        runs = [
+            (path, lambda path=path: InputReplay(Recording(path)))
+            for path in args.replay
+        ]
+    else:
+        runs = [(args.script, SCRIPTS[args.script])]
+
+    for name, make_source in runs:
+        sampler = None
+        if args.trace_memory:
+            sampler = MemorySampler()
+            tracemalloc.start()
+        start = time.perf_counter()
+        robot, match = run_match(make_source(), on_loop=sampler)
+        report(name, robot, match, time.perf_counter() - start)
+        if sampler is not None:
+            report_memory(sampler, tracemalloc.take_snapshot())
+            tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
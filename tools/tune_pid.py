@@ -0,0 +1,320 @@
+"""
+    Searches for PID gains for the lift, the intake wrist and tape alignment
+    against the simulator's models of them
+
+    Each candidate is a step response simulated with the same PID update as
+    the robot's PIDLoop, scored on rise time, overshoot and settle time.
+    Candidates run in parallel across processes, and every result is kept in
+    a CSV table so re-runs only evaluate new combinations.
+
+    Usage: python tools/tune_pid.py [lift] [wrist] [tape] [--cache FILE]
+"""
+
+import argparse
+import csv
+import itertools
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+ROBOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "robot"))
+sys.path.insert(0, ROBOT_PATH)
+
+from pyfrc.physics import drivetrains, motion  # noqa: E402
+
+import physics  # noqa: E402
+from common.pid import LOOP_PERIOD  # noqa: E402
+from components.drive import ADJUSTED_MOVE  # noqa: E402
+from components.lift import LIFT_OUTPUT_MAX, LIFT_OUTPUT_MIN  # noqa: E402
+from controllers.align_tape import PID_PERIOD, VISION_LATENCY  # noqa: E402
+
+# Simulation step, the models are integrated at this rate
+SIM_PERIOD = 0.005
+
+# Overshoot, as a fraction of the step, costs this many seconds
+OVERSHOOT_WEIGHT = 2.0
+# Settled means staying within this fraction of the step from the target
+SETTLE_BAND = 0.02
+
+FIELDS = ("loop", "p", "i", "d", "rise", "overshoot", "settle", "cost")
+
+
+class LiftModel:
+    def __init__(self):
+        self.motion = motion.LinearMotion(
+            "Lift", physics.LIFT_SPEED, physics.LIFT_TICKS_PER_FOOT
+        )
+
+    def step(self, output, dt):
+        return self.motion.compute(output, dt)
+
+
+class WristModel:
+    def __init__(self):
+        self.position = 0.0
+
+    def step(self, output, dt):
+        self.position += output * dt * physics.WRIST_DEGREES_PER_SECOND
+        return self.position
+
+
+class StrafeModel:
+    """
+        Yaw to the tape, in degrees, while strafing across it in mecanum
+
+        AlignTape strafes with adjusted commands, so its output goes through
+        the drive's response curve before reaching the wheels
+    """
+
+    # Distance from the tape while lining up, in feet
+    DISTANCE = 6
+
+    def __init__(self):
+        drivetrain = drivetrains.MecanumDrivetrain(
+            x_wheelbase=physics.DRIVE_WHEELBASE,
+            y_wheelbase=physics.DRIVE_WHEELBASE,
+            speed=physics.DRIVE_SPEED,
+        )
+        # Sideways feet per second at full output
+        self.strafe_speed = abs(drivetrain.get_vector(-1, 1, 1, -1)[0])
+        self.offset = 0.0
+
+    def step(self, output, dt):
+        self.offset += ADJUSTED_MOVE(output) * dt * self.strafe_speed
+        return math.degrees(math.atan2(self.offset, self.DISTANCE))
+
+
+class Loop:
+    """
+        A PID loop on the robot and the step it is tuned against
+    """
+
+    def __init__(
+        self,
+        model,
+        gains,
+        output_range,
+        setpoint,
+        duration,
+        pid_period=LOOP_PERIOD,
+        sensor_period=0.02,
+        sensor_latency=0.0,
+        grid=None,
+    ):
+        """
+            :param gains: the gains the robot currently uses
+            :param sensor_period: how often the PID's input is refreshed
+            :param sensor_latency: how old the input is when it arrives
+            :param grid: (p values, i values, d values) to search
+        """
+        self.model = model
+        self.gains = gains
+        self.output_range = output_range
+        self.setpoint = setpoint
+        self.duration = duration
+        self.pid_period = pid_period
+        self.sensor_period = sensor_period
+        self.sensor_latency = sensor_latency
+        self.grid = grid
+
+
+def scaled(base, factors):
+    return [base * f for f in factors]
+
+
+LOOPS = {
+    "lift": Loop(
+        LiftModel,
+        (0.00255, 0.0, 0.0),
+        (LIFT_OUTPUT_MIN, LIFT_OUTPUT_MAX),
+        setpoint=1180,
+        duration=4,
+        grid=(
+            scaled(0.00255, (0.5, 0.75, 1, 1.5, 2, 3, 4, 6)),
+            [0.0, 1e-5, 5e-5, 1e-4],
+            [0.0, 0.001, 0.005, 0.01],
+        ),
+    ),
+    "wrist": Loop(
+        WristModel,
+        (0.0256, 0.0, 0.0),
+        (-1, 1),
+        setpoint=65,
+        duration=2,
+        grid=(
+            scaled(0.0256, (0.5, 0.75, 1, 1.5, 2, 3, 4, 6)),
+            [0.0, 1e-4, 5e-4, 1e-3],
+            [0.0, 0.01, 0.05, 0.1],
+        ),
+    ),
+    "tape": Loop(
+        StrafeModel,
+        (0.078, 0.002, 0.1),
+        (-0.7, 0.7),
+        setpoint=20,
+        duration=4,
+        pid_period=PID_PERIOD,
+        # Strafing doesn't turn the robot, so the yaw only changes with
+        # each vision frame
+        sensor_period=0.035,
+        sensor_latency=VISION_LATENCY,
+        grid=(
+            scaled(0.078, (0.5, 0.75, 1, 1.5, 2, 3, 4)),
+            [0.0, 0.001, 0.002, 0.005, 0.01],
+            [0.0, 0.02, 0.05, 0.1, 0.2],
+        ),
+    ),
+}
+
+
+def simulate(loop, p, i, d):
+    """
+        Run a step response through the same update as PIDLoop
+
+        :return: list of (time, position)
+    """
+    model = loop.model()
+    minimum, maximum = loop.output_range
+    pid_every = round(loop.pid_period / SIM_PERIOD)
+    sensor_every = round(loop.sensor_period / SIM_PERIOD)
+    sensor_delay = round(loop.sensor_latency / SIM_PERIOD)
+
+    # Position at the start of each step
+    positions = [0.0]
+    measured = 0.0
+    output = total_error = prev_error = 0.0
+    response = []
+    for n in range(round(loop.duration / SIM_PERIOD)):
+        if n % sensor_every == 0:
+            measured = positions[max(0, n - sensor_delay)]
+        if n % pid_every == 0:
+            error = loop.setpoint - measured
+            if i != 0:
+                total_error = min(max(total_error + error, minimum / i), maximum / i)
+            output = p * error + i * total_error + d * (error - prev_error)
+            output = min(max(output, minimum), maximum)
+            prev_error = error
+        position = model.step(output, SIM_PERIOD)
+        positions.append(position)
+        response.append(((n + 1) * SIM_PERIOD, position))
+    return response
+
+
+def score(loop, response):
+    """
+        :return: (rise time, overshoot fraction, settle time, cost)
+    """
+    target = loop.setpoint
+    rise_start = rise_end = None
+    peak = 0.0
+    settle = 0.0
+    for tm, position in response:
+        fraction = position / target
+        if rise_start is None and fraction >= 0.1:
+            rise_start = tm
+        if rise_end is None and fraction >= 0.9:
+            rise_end = tm
+        peak = max(peak, fraction)
+        if abs(1 - fraction) > SETTLE_BAND:
+            settle = tm
+
+    # Never reaching the target costs the whole run
+    if rise_start is None or rise_end is None:
+        rise = loop.duration
+    else:
+        rise = rise_end - rise_start
+    overshoot = max(0.0, peak - 1)
+    cost = settle + 0.5 * rise + OVERSHOOT_WEIGHT * overshoot
+    return rise, overshoot, settle, cost
+
+
+def evaluate(candidate):
+    name, p, i, d = candidate
+    loop = LOOPS[name]
+    return (name, p, i, d) + score(loop, simulate(loop, p, i, d))
+
+
+def key(name, p, i, d):
+    return (name, "%.6g" % p, "%.6g" % i, "%.6g" % d)
+
+
+def load_cache(path):
+    results = {}
+    if os.path.exists(path):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                values = tuple(float(row[field]) for field in FIELDS[1:])
+                results[key(row["loop"], *values[:3])] = (row["loop"],) + values
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("loops", nargs="*", help="any of %s" % ", ".join(sorted(LOOPS)))
+    parser.add_argument("--cache", default="pid_results.csv")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    names = args.loops or sorted(LOOPS)
+    for name in names:
+        if name not in LOOPS:
+            parser.error("unknown loop %r" % name)
+
+    results = load_cache(args.cache)
+    candidates = []
+    for name in names:
+        loop = LOOPS[name]
+        for p, i, d in [loop.gains] + list(itertools.product(*loop.grid)):
+            if key(name, p, i, d) not in results:
+                candidates.append((name, p, i, d))
+                # The current gains may also be in the grid
+                results[key(name, p, i, d)] = None
+
+    print(
+        "%d cached, %d to evaluate" % (len(results) - len(candidates), len(candidates))
+    )
+    if candidates:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for result in pool.map(evaluate, candidates, chunksize=16):
+                results[key(*result[:4])] = result
+
+        with open(args.cache, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for row in sorted(results.values()):
+                writer.writerow(row)
+
+    for name in names:
+        loop = LOOPS[name]
+        rows = sorted(
+            (row for row in results.values() if row[0] == name), key=lambda r: r[-1]
+        )
+        current = results[key(name, *loop.gains)]
+        print()
+        print("== %s" % name)
+        print(
+            "  %-26s %7s %9s %7s %7s"
+            % ("p, i, d", "rise", "overshoot", "settle", "cost")
+        )
+        for label, row in [("current", current)] + [
+            ("", row) for row in rows[: args.top]
+        ]:
+            _, p, i, d, rise, overshoot, settle, cost = row
+            print(
+                "  %-26s %7.3f %8.1f%% %7.3f %7.3f %s"
+                % (
+                    "%.4g, %.4g, %.4g" % (p, i, d),
+                    rise,
+                    100 * overshoot,
+                    settle,
+                    cost,
+                    label,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()